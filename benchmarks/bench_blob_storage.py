@@ -0,0 +1,140 @@
+# coding: utf-8
+"""
+Benchmark: inline JSON outputs vs compressed, deduplicated blob storage.
+
+Builds a database in the pre-blob layout (inline `agent_runs.output` and
+`decisions.final_report`), measures file size and scan times, runs the
+`migrate-storage` migration, and measures again.
+
+    python benchmarks/bench_blob_storage.py --decisions 5000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+from sqlalchemy import text
+
+from decision_copilot.database import DatabaseConfig, init_db, make_engine
+from decision_copilot.services.storage_service import migrate_inline_storage
+
+AGENTS = ("planner", "facts", "pro", "con", "risk", "synth")
+
+SCANS = {
+    "status scan": "SELECT agent_name, status, latency_ms FROM agent_runs",
+    "latency by agent": "SELECT agent_name, avg(latency_ms) FROM agent_runs GROUP BY agent_name",
+    "decision list": "SELECT id, status, question FROM decisions ORDER BY created_at DESC",
+}
+
+
+def _sentence(rng: random.Random) -> str:
+    words = ["latency", "queue", "worker", "risk", "cost", "migration", "SQLite", "Redis", "throughput",
+             "operational", "complexity", "team", "budget", "deadline", "vendor", "contract"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(10, 18))).capitalize() + "."
+
+
+def _output(rng: random.Random, agent: str) -> dict:
+    if agent == "planner":
+        return {"required_agents": ["facts", "pro", "con", "risk"], "rationale": _sentence(rng)}
+    if agent == "synth":
+        return {
+            "recommendation": rng.choice(["go", "no_go", "conditional_go"]),
+            "confidence": rng.choice(["low", "medium", "high"]),
+            "rationale": " ".join(_sentence(rng) for _ in range(4)),
+            "key_tradeoffs": [_sentence(rng) for _ in range(4)],
+            "next_steps": [_sentence(rng) for _ in range(4)],
+            "open_questions": [_sentence(rng) for _ in range(2)],
+        }
+    return {"items": [_sentence(rng) for _ in range(rng.randint(5, 9))]}
+
+
+def build_legacy_db(path: Path, decisions: int, runs_per_decision: int, seed: int = 7) -> None:
+    engine = make_engine(DatabaseConfig(sqlite_path=path))
+    init_db(engine)
+    rng = random.Random(seed)
+
+    with engine.begin() as conn:
+        # Recreate the pre-blob layout.
+        conn.exec_driver_sql("ALTER TABLE agent_runs ADD COLUMN output JSON")
+        conn.exec_driver_sql("ALTER TABLE decisions ADD COLUMN final_report JSON")
+
+        run_id = 0
+        for d in range(1, decisions + 1):
+            outputs = {a: _output(rng, a) for a in AGENTS}
+            conn.execute(
+                text("INSERT INTO decisions (id, question, context, status, final_report) "
+                     "VALUES (:id, :q, :c, 'DONE', :r)"),
+                {"id": d, "q": _sentence(rng), "c": " ".join(_sentence(rng) for _ in range(6)),
+                 "r": orjson.dumps(outputs["synth"]).decode()},
+            )
+            for _ in range(runs_per_decision):
+                run_id += 1
+                conn.execute(
+                    text("INSERT INTO decision_runs (id, decision_id, status) VALUES (:id, :d, 'DONE')"),
+                    {"id": run_id, "d": d},
+                )
+                # Reruns usually reproduce most agents unchanged; regenerate one at random.
+                outputs[rng.choice(AGENTS)] = _output(rng, "facts")
+                conn.execute(
+                    text("INSERT INTO agent_runs (decision_id, decision_run_id, agent_name, status, latency_ms, output) "
+                         "VALUES (:d, :r, :a, 'DONE', :l, :o)"),
+                    [
+                        {"d": d, "r": run_id, "a": a, "l": rng.randint(300, 9000),
+                         "o": orjson.dumps(outputs[a]).decode()}
+                        for a in AGENTS
+                    ],
+                )
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+    engine.dispose()
+
+
+def measure_scans(path: Path, repeat: int) -> dict[str, float]:
+    engine = make_engine(DatabaseConfig(sqlite_path=path))
+    out = {}
+    with engine.connect() as conn:
+        for name, sql in SCANS.items():
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.exec_driver_sql(sql).all()
+                best = min(best, time.perf_counter() - t0)
+            out[name] = best * 1000
+    engine.dispose()
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decisions", type=int, default=2000)
+    parser.add_argument("--runs-per-decision", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.sqlite3"
+        build_legacy_db(path, args.decisions, args.runs_per_decision)
+        before = measure_scans(path, args.repeat)
+
+        engine = make_engine(DatabaseConfig(sqlite_path=path))
+        t0 = time.perf_counter()
+        res = migrate_inline_storage(engine, path)
+        migrate_s = time.perf_counter() - t0
+        engine.dispose()
+
+        after = measure_scans(path, args.repeat)
+
+        print(f"decisions={args.decisions} agent_runs={args.decisions * args.runs_per_decision * len(AGENTS)}")
+        print(f"migration: {migrate_s:.2f}s, rows={res.rows_migrated}")
+        print(f"db size: {res.size_before / 1e6:.2f} MB -> {res.size_after / 1e6:.2f} MB "
+              f"({100 * (1 - res.size_after / res.size_before):.1f}% smaller)")
+        print(f"{'scan':<20}{'inline ms':>12}{'blob ms':>12}{'speedup':>10}")
+        for name in SCANS:
+            print(f"{name:<20}{before[name]:>12.2f}{after[name]:>12.2f}{before[name] / after[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# coding: utf-8
+"""
+Benchmark: CLI import cost per command, measured with `python -X importtime`.
+
+For each subcommand, builds the parser exactly as `decision-copilot <cmd>` would
+(importing only that command's module) and sums the per-module self times.
+Budgets live in `cli_import_budget.json`:
+
+- `budgets_ms`: max total import time per command (machine-dependent, kept generous).
+- `forbidden`: top-level packages a command must never import (machine-independent).
+
+    python benchmarks/bench_cli_import.py            # report
+    python benchmarks/bench_cli_import.py --check    # exit 1 on regression
+    python benchmarks/bench_cli_import.py --update   # rewrite budgets (measured x headroom)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from decision_copilot.cli import COMMANDS
+
+BUDGET_FILE = Path(__file__).with_name("cli_import_budget.json")
+HEADROOM = 1.5
+
+
+def measure(command: str, repeat: int) -> tuple[float, set[str]]:
+    """Best-of-`repeat` total import time (ms) and the set of top-level packages imported."""
+    code = f"from decision_copilot.cli import build_parser; build_parser({[command]!r})"
+    env = dict(os.environ)
+    env.setdefault("DECISION_COPILOT_DB", str(Path(tempfile.gettempdir()) / "dc-import-bench.sqlite3"))
+
+    best = float("inf")
+    packages: set[str] = set()
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            total_us += int(self_us)
+            packages.add(name.strip().split(".")[0])
+        best = min(best, total_us / 1000)
+    return best, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Fail if a budget is exceeded")
+    parser.add_argument("--update", action="store_true", help="Rewrite time budgets from this run")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    budgets_ms: dict[str, float] = budget.get("budgets_ms", {})
+    forbidden: dict[str, list[str]] = budget.get("forbidden", {})
+
+    failures = []
+    measured = {}
+    print(f"{'command':<18}{'import ms':>12}{'budget ms':>12}  forbidden imports")
+    for command in ["--help", *COMMANDS]:
+        ms, packages = measure(command, args.repeat)
+        measured[command] = ms
+        bad = sorted(packages & set(forbidden.get(command, [])))
+        limit = budgets_ms.get(command)
+
+        print(f"{command:<18}{ms:>12.1f}{limit if limit is not None else '-':>12}  {', '.join(bad) or '-'}")
+        if bad:
+            failures.append(f"{command}: imports {', '.join(bad)}")
+        if limit is not None and ms > limit:
+            failures.append(f"{command}: {ms:.1f} ms > budget {limit} ms")
+
+    if args.update:
+        budget["budgets_ms"] = {c: round(ms * HEADROOM) for c, ms in measured.items()}
+        BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n")
+        print(f"Budgets written to {BUDGET_FILE}")
+
+    if args.check and failures:
+        print("\n".join(["", "Import budget exceeded:", *failures]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
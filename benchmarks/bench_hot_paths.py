@@ -0,0 +1,222 @@
+# coding: utf-8
+"""
+Benchmark: non-LLM overhead of the orchestration and persistence hot paths.
+
+Once LLM calls are cached or fast, a run's wall time is dominated by what happens
+between them. For each database size, a temp SQLite file is filled with finished
+runs (`--sizes` counts agent_runs rows), then every case below is timed on fresh
+runs against it, with an in-process fake queue instead of Redis:
+
+- start_run:     DecisionService.start_run (new run, planner dispatched)
+- fanout:        Orchestrator.on_agent_done for the planner (analysis agents dispatched)
+- agent_done:    on_agent_done for one analysis agent while its siblings still run
+- complete:      on_agent_done for the report agent (run and decision DONE)
+- status:        DecisionService.get_status_snapshot
+- explain:       explain_view of a finished run, agent outputs decoded
+- render:        render_markdown of a full report
+
+Baselines (median µs per case and size) live in `hot_paths_baseline.json`; a case
+regresses when its median exceeds baseline x `threshold`.
+
+    python benchmarks/bench_hot_paths.py                          # report
+    python benchmarks/bench_hot_paths.py --sizes 1000,100000,1000000
+    python benchmarks/bench_hot_paths.py --check                  # exit 1 on regression
+    python benchmarks/bench_hot_paths.py --update                 # rewrite baselines
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+import decision_copilot.orchestrator.orchestrator as orchestrator_module
+from decision_copilot.agents.registry import REPORT_AGENT, SELECTABLE_AGENTS, SELECTOR_AGENT
+from decision_copilot.database import DatabaseConfig, init_db, make_engine, make_session_factory
+from decision_copilot.models import AgentRun, AgentStatus, Decision, DecisionRun, DecisionStatus, RunStatus
+from decision_copilot.orchestrator.orchestrator import Orchestrator
+from decision_copilot.orchestrator.summary import refresh_run_summary
+from decision_copilot.services.decision_service import DecisionService
+from decision_copilot.services.read_models import explain_view
+from decision_copilot.services.rendering import render_markdown
+
+BASELINE_FILE = Path(__file__).with_name("hot_paths_baseline.json")
+DEFAULT_THRESHOLD = 1.3
+
+AGENTS = (SELECTOR_AGENT, *SELECTABLE_AGENTS, REPORT_AGENT)
+ITEMS = {"items": [f"Point {i}: latency, cost and operational complexity." for i in range(8)]}
+PLAN = {"required_agents": list(SELECTABLE_AGENTS), "rationale": "All perspectives matter."}
+SYNTH = {
+    "recommendation": "conditional_go",
+    "confidence": "medium",
+    "rationale": "Worth it if the migration fits the budget.",
+    "key_tradeoffs": ["Speed vs. cost", "Control vs. effort"],
+    "next_steps": ["Prototype", "Measure"],
+    "open_questions": ["Who owns operations?"],
+}
+
+
+class FakeQueue:
+    """Accepts jobs and drops them: the benchmark measures the orchestrator, not Redis."""
+
+    def __init__(self, name: str = "bench"):
+        self.name = name
+
+    def enqueue(self, fn, *args, **kwargs):
+        return None
+
+
+def fill(engine, agent_runs: int) -> None:
+    """Bulk-insert finished runs (one run per decision) up to `agent_runs` rows."""
+    runs = max(agent_runs // len(AGENTS), 1)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO decisions (id, question, status) VALUES (:id, :q, 'DONE')"),
+            [{"id": i, "q": f"Question {i}?"} for i in range(1, runs + 1)],
+        )
+        conn.execute(
+            text("INSERT INTO decision_runs (id, decision_id, status) VALUES (:id, :id, 'DONE')"),
+            [{"id": i} for i in range(1, runs + 1)],
+        )
+        conn.execute(
+            text("INSERT INTO agent_runs (decision_id, decision_run_id, agent_name, status, latency_ms) "
+                 "VALUES (:run, :run, :agent, 'DONE', 1000)"),
+            [{"run": i, "agent": a} for i in range(1, runs + 1) for a in AGENTS],
+        )
+
+
+def _new_run(session, done: tuple[str, ...] = (), running: tuple[str, ...] = ()) -> int:
+    """A RUNNING run whose listed agents are DONE / RUNNING, committed like a worker would."""
+    decision = Decision(question="Should we move the queue to a managed service?", context="Two engineers.",
+                        status=DecisionStatus.RUNNING)
+    session.add(decision)
+    session.flush()
+    run = DecisionRun(decision_id=decision.id, status=RunStatus.RUNNING,
+                      required_agents=list(SELECTABLE_AGENTS) if SELECTOR_AGENT in done else None)
+    session.add(run)
+    session.flush()
+    outputs = {SELECTOR_AGENT: PLAN, REPORT_AGENT: SYNTH}
+    for name in done:
+        agent_run = AgentRun(decision_id=decision.id, decision_run_id=run.id, agent_name=name,
+                             status=AgentStatus.DONE, latency_ms=900)
+        agent_run.output = outputs.get(name, ITEMS)
+        session.add(agent_run)
+    for name in running:
+        session.add(AgentRun(decision_id=decision.id, decision_run_id=run.id, agent_name=name,
+                             status=AgentStatus.RUNNING))
+    refresh_run_summary(session, run.id)
+    session.commit()
+    return run.id
+
+
+def _cases(session) -> dict[str, tuple[Callable[[], object], Callable[[object], None]]]:
+    """name -> (setup, timed call taking the setup result)."""
+    orch = Orchestrator(session)
+    service = DecisionService(session)
+    first, *others = SELECTABLE_AGENTS
+
+    def new_decision():
+        decision = Decision(question="Adopt a new queue?", status=DecisionStatus.NEW)
+        session.add(decision)
+        session.commit()
+        return decision.id
+
+    def full_report():
+        # Plain values, like an export record: only the rendering is timed.
+        decision = SimpleNamespace(question="Adopt a new queue?", context="Two engineers.", final_report=SYNTH)
+        return decision, {name: ITEMS for name in SELECTABLE_AGENTS}
+
+    return {
+        "start_run": (new_decision, lambda d: service.start_run(d)),
+        "fanout": (lambda: _new_run(session, done=(SELECTOR_AGENT,)),
+                   lambda r: orch.on_agent_done(r, SELECTOR_AGENT)),
+        "agent_done": (lambda: _new_run(session, done=(SELECTOR_AGENT, first), running=tuple(others)),
+                       lambda r: orch.on_agent_done(r, first)),
+        "complete": (lambda: _new_run(session, done=AGENTS),
+                     lambda r: orch.on_agent_done(r, REPORT_AGENT)),
+        "status": (lambda: session.get(DecisionRun, _new_run(session, done=AGENTS)).decision_id,
+                   lambda d: service.get_status_snapshot(d)),
+        "explain": (lambda: session.get(DecisionRun, _new_run(session, done=AGENTS)).decision_id,
+                    lambda d: list(explain_view(session, d).agents)),
+        "render": (full_report, lambda args: render_markdown(*args)),
+    }
+
+
+def bench_size(agent_runs: int, repeat: int) -> dict[str, float]:
+    """Median µs per case on a database with `agent_runs` rows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(DatabaseConfig(sqlite_path=Path(tmp) / "bench.sqlite3"))
+        init_db(engine)
+        fill(engine, agent_runs)
+        Session = make_session_factory(engine)
+
+        results = {}
+        with Session() as session:
+            for name, (setup, call) in _cases(session).items():
+                samples = []
+                for _ in range(repeat):
+                    arg = setup()
+                    session.expire_all()  # every call starts cold, as in a fresh worker job
+                    t0 = time.perf_counter()
+                    call(arg)
+                    samples.append((time.perf_counter() - t0) * 1e6)
+                results[name] = statistics.median(samples)
+        engine.dispose()
+        return results
+
+
+def _key(case: str, size: int) -> str:
+    return f"{case}@{size}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=str, default="1000,100000",
+                        help="Comma-separated agent_runs row counts (default: 1000,100000)")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"Allowed slowdown vs baseline (default: from the baseline file, else {DEFAULT_THRESHOLD})")
+    parser.add_argument("--check", action="store_true", help="Fail if a case regressed past the threshold")
+    parser.add_argument("--update", action="store_true", help="Rewrite baselines for the measured sizes")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    baseline_us: dict[str, float] = baseline.get("baseline_us", {})
+    threshold = args.threshold or baseline.get("threshold", DEFAULT_THRESHOLD)
+
+    # No Redis: dispatched jobs go to a queue that drops them.
+    orchestrator_module.get_queue = lambda *a, **k: FakeQueue()
+
+    failures = []
+    measured = {}
+    print(f"{'case':<12}{'rows':>10}{'median µs':>12}{'baseline µs':>13}{'ratio':>8}")
+    for size in sizes:
+        for case, us in bench_size(size, args.repeat).items():
+            key = _key(case, size)
+            measured[key] = us
+            base: Optional[float] = baseline_us.get(key)
+            ratio = us / base if base else None
+            print(f"{case:<12}{size:>10}{us:>12.0f}{base if base is not None else '-':>13}"
+                  f"{f'{ratio:.2f}' if ratio is not None else '-':>8}")
+            if ratio is not None and ratio > threshold:
+                failures.append(f"{key}: {us:.0f} µs > {threshold} x baseline {base} µs")
+
+    if args.update:
+        baseline["threshold"] = threshold
+        baseline["baseline_us"] = {**baseline_us, **{k: round(v) for k, v in measured.items()}}
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines written to {BASELINE_FILE}")
+
+    if args.check and failures:
+        print("\n".join(["", "Hot path regression:", *failures]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# coding: utf-8
+"""
+Benchmark: one shared FIFO queue vs per-stage priority queues under a bulk burst.
+
+Discrete-event simulation of the run pipeline (planner -> N analysis agents ->
+synth) on a fixed pool of workers. Runs arrive at a steady rate; at `--burst-at`
+a bulk batch of `--burst` runs is enqueued at once. The priority variant uses the
+real `QueuePriorityPolicy` that `PriorityWorker` applies.
+
+    python benchmarks/bench_queue_priority.py --workers 4 --burst 200
+"""
+import argparse
+import heapq
+import random
+import statistics
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from decision_copilot.queue.connection import stage_for_agent
+from decision_copilot.queue.priority import DEFAULT_STARVATION_LIMIT, QueuePriorityPolicy, parse_stage_order
+
+ANALYSIS_AGENTS = ("facts", "pro", "con", "risk")
+MEAN_DURATION_S = {"planner": 3.0, "analysis": 6.0, "synth": 5.0}
+
+
+@dataclass
+class Run:
+    arrived: float
+    burst: bool
+    pending_analysis: int = len(ANALYSIS_AGENTS)
+    finished: Optional[float] = None
+
+
+@dataclass
+class Scheduler:
+    policy: Optional[QueuePriorityPolicy]
+    fifo: deque = field(default_factory=deque)
+    staged: dict[str, deque] = field(default_factory=dict)
+
+    def push(self, job: tuple[int, str]) -> None:
+        if self.policy is None:
+            self.fifo.append(job)
+        else:
+            self.staged.setdefault(stage_for_agent(job[1]), deque()).append(job)
+
+    def pop(self) -> Optional[tuple[int, str]]:
+        if self.policy is None:
+            return self.fifo.popleft() if self.fifo else None
+        for stage in self.policy.ordered():
+            q = self.staged.get(stage)
+            if q:
+                self.policy.record(stage)
+                return q.popleft()
+        return None
+
+
+def simulate(args: argparse.Namespace, policy: Optional[QueuePriorityPolicy]) -> list[Run]:
+    rng = random.Random(args.seed)
+    runs: list[Run] = []
+    events: list[tuple[float, int, str, tuple]] = []
+    seq = 0
+
+    def schedule(t: float, kind: str, payload: tuple) -> None:
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (t, seq, kind, payload))
+
+    t = 0.0
+    while t < args.duration:
+        schedule(t, "arrive", (False,))
+        t += rng.expovariate(1 / args.interval)
+    for _ in range(args.burst):
+        schedule(args.burst_at, "arrive", (True,))
+
+    sched = Scheduler(policy)
+    idle = args.workers
+
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        if kind == "arrive":
+            runs.append(Run(arrived=now, burst=payload[0]))
+            sched.push((len(runs) - 1, "planner"))
+        else:
+            run_id, agent = payload
+            idle += 1
+            run = runs[run_id]
+            if agent == "planner":
+                for a in ANALYSIS_AGENTS:
+                    sched.push((run_id, a))
+            elif agent == "synth":
+                run.finished = now
+            else:
+                run.pending_analysis -= 1
+                if run.pending_analysis == 0:
+                    sched.push((run_id, "synth"))
+
+        while idle:
+            job = sched.pop()
+            if job is None:
+                break
+            idle -= 1
+            mean = MEAN_DURATION_S[stage_for_agent(job[1])]
+            schedule(now + rng.uniform(0.5 * mean, 1.5 * mean), "done", job)
+
+    return runs
+
+
+def _summary(runs: list[Run]) -> tuple[float, float, float]:
+    latencies = sorted(r.finished - r.arrived for r in runs)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return statistics.mean(latencies), p95, latencies[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=12.0, help="Mean seconds between steady arrivals")
+    parser.add_argument("--duration", type=float, default=1800.0, help="Seconds of steady arrivals")
+    parser.add_argument("--burst", type=int, default=100, help="Runs enqueued at once by the bulk batch")
+    parser.add_argument("--burst-at", type=float, default=300.0)
+    parser.add_argument("--order", default=None, help="Stage order, e.g. synth,analysis,planner")
+    parser.add_argument("--starvation-limit", type=int, default=DEFAULT_STARVATION_LIMIT)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    variants = {
+        "fifo (single queue)": None,
+        "stage priority": QueuePriorityPolicy(parse_stage_order(args.order), args.starvation_limit),
+    }
+
+    print(f"workers={args.workers} steady every ~{args.interval:g}s for {args.duration:g}s, "
+          f"burst={args.burst} at t={args.burst_at:g}s")
+    print(f"{'variant':<22}{'group':<10}{'runs':>6}{'mean s':>10}{'p95 s':>10}{'max s':>10}")
+    for name, policy in variants.items():
+        runs = simulate(args, policy)
+        makespan = max(r.finished for r in runs)
+        groups = {
+            "all": runs,
+            "steady": [r for r in runs if not r.burst],
+            "burst": [r for r in runs if r.burst],
+        }
+        for group, rs in groups.items():
+            if not rs:
+                continue
+            mean, p95, worst = _summary(rs)
+            print(f"{name:<22}{group:<10}{len(rs):>6}{mean:>10.1f}{p95:>10.1f}{worst:>10.1f}")
+        print(f"{name:<22}{'makespan':<10}{'':>6}{makespan:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# coding: utf-8
+from decision_copilot.agents.base import AgentContext
+from decision_copilot.llm.client import DeepSeekClient
+from decision_copilot.orchestrator.context_digest import Digest
+
+
+class DigestAgent:
+    name = "digest"
+
+    def __init__(self, llm: DeepSeekClient):
+        self.llm = llm
+
+    def run(self, ctx: AgentContext) -> Digest:
+        system = (
+            "You condense background material for a team of decision analysts. "
+            "Keep every fact, figure, date, option, constraint and stakeholder that could matter "
+            "for the decision; drop repetition, boilerplate and anything unrelated to it. "
+            "Do not add facts or opinions."
+        )
+
+        user = (
+            f"Decision question:\n{ctx.question}\n\n"
+            f"Context:\n{ctx.context or ''}\n\n"
+            "Write the condensed context as plain text, at most a quarter of its length."
+        )
+
+        text = self.llm.chat_text(system=system, user=user)
+        if not text:
+            raise ValueError("Context digest is empty")
+
+        usage = self.llm.last_usage
+        return Digest(
+            text=text,
+            model=self.llm.model,
+            context_chars=len(ctx.context or ""),
+            context_tokens=usage.prompt_tokens if usage is not None else None,
+            digest_tokens=usage.completion_tokens if usage is not None else None,
+        )
@@ -0,0 +1,33 @@
+# coding: utf-8
+from decision_copilot.llm.client import DeepSeekClient
+
+
+class IngestAgent:
+    name = "ingest"
+
+    def __init__(self, llm: DeepSeekClient):
+        self.llm = llm
+
+    def run(self, question: str, text: str, level: int) -> str:
+        """Notes on one chunk of a context file (level 0), or merged notes of several chunks."""
+        if level == 0:
+            system = (
+                "You extract material from one part of a long document for a decision analysis. "
+                "Write concise plain-text notes with the facts, figures, dates, options, constraints, "
+                "risks and stakeholders in this part that bear on the decision. "
+                "Leave out anything unrelated to it. Do not add facts or opinions."
+            )
+            user = f"Decision question:\n{question}\n\nDocument part:\n{text}"
+        else:
+            system = (
+                "You merge notes taken from consecutive parts of a long document for a decision analysis. "
+                "Write one concise set of plain-text notes: remove duplicates, keep every distinct fact "
+                "that bears on the decision, and keep conflicting statements side by side. "
+                "Do not add facts or opinions."
+            )
+            user = f"Decision question:\n{question}\n\nNotes:\n{text}"
+
+        notes = self.llm.chat_text(system=system, user=user)
+        if not notes:
+            raise ValueError("Chunk summary is empty")
+        return notes
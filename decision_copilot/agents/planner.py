@@ -1,6 +1,10 @@
 # coding: utf-8
+import json
+
 from decision_copilot.agents.base import AgentContext
+from decision_copilot.agents.registry import SELECTABLE_AGENTS
 from decision_copilot.llm.client import DeepSeekClient
+from decision_copilot.llm.contracts import AGENT_CONTRACTS
 
 
 class PlannerAgent:
@@ -19,7 +23,7 @@ class PlannerAgent:
             f"Decision question:\n{ctx.question}\n\n"
             f"Context:\n{ctx.context or ''}\n\n"
             "Select required agents from this allowed set:\n"
-            '["facts", "pro", "con", "risk"]\n\n'
+            f"{json.dumps(list(SELECTABLE_AGENTS))}\n\n"
             "Return a plan in json with:\n"
             '- required_agents: list of agent names\n'
             "- rationale: short string\n"
@@ -27,7 +31,7 @@ class PlannerAgent:
         )
 
         example = {
-            "required_agents": ["facts", "pro", "con", "risk"],
+            "required_agents": list(SELECTABLE_AGENTS),
             "rationale": "Need balanced analysis before synthesis.",
             "constraints": ["Keep it concise."]
         }
@@ -36,14 +40,14 @@ class PlannerAgent:
             system=system,
             user=user,
             example_json=example,
-            required_keys=["required_agents", "rationale"],
+            contract=AGENT_CONTRACTS["planner"],
         )
 
         # Normalize / guardrail
-        allowed = {"facts", "pro", "con", "risk"}
+        allowed = set(SELECTABLE_AGENTS)
         req = [a for a in (out.get("required_agents") or []) if a in allowed]
         if not req:
-            req = ["facts", "pro", "con", "risk"]
+            req = list(SELECTABLE_AGENTS)
 
         out["required_agents"] = req
         return out
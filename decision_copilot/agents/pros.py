@@ -1,6 +1,7 @@
 # coding: utf-8
 from decision_copilot.agents.base import AgentContext
 from decision_copilot.llm.client import DeepSeekClient
+from decision_copilot.llm.contracts import AGENT_CONTRACTS
 
 
 class ProAgent:
@@ -53,5 +54,5 @@ class ProAgent:
             system=system,
             user=user,
             example_json=example,
-            required_keys=["items"],
+            contract=AGENT_CONTRACTS["pro"],
         )
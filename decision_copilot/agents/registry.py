@@ -0,0 +1,77 @@
+# coding: utf-8
+from dataclasses import dataclass
+
+from decision_copilot.llm.routing import GenerationConfig
+
+# Plain data on purpose: the CLI and orchestrator read the graph without importing
+# the agents (and the LLM SDK); only the worker imports `factory`.
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """
+    One node of the agent DAG.
+
+    - factory: "module:Class", constructed with the LLM client.
+    - version: bump whenever the prompt or output contract changes; resumed runs
+      only reuse outputs produced by the current version.
+    - inputs: agents whose DONE outputs this agent receives; it is dispatched as
+      soon as all of them are DONE (or were not selected for the run).
+    - stage: worker queue (see queue/connection.py).
+    - cost: rough relative duration, used to prioritize the longest remaining path.
+    - selectable: runs only if the planner lists it in `required_agents`.
+    - generation: default model / max_tokens / temperature / timeout; overridden per
+      agent and per run mode by DECISION_COPILOT_AGENT_CONFIG (see llm/routing.py).
+    """
+    name: str
+    factory: str
+    version: str
+    inputs: tuple[str, ...] = ()
+    stage: str = "analysis"
+    cost: float = 1.0
+    selectable: bool = False
+    generation: GenerationConfig = GenerationConfig()
+
+
+# The agent whose output selects the `selectable` agents, and the agent whose output
+# becomes the decision's final report.
+SELECTOR_AGENT = "planner"
+REPORT_AGENT = "synth"
+
+AGENT_SPECS: dict[str, AgentSpec] = {
+    spec.name: spec
+    for spec in (
+        AgentSpec("planner", "decision_copilot.agents.planner:PlannerAgent", "1", stage="planner", cost=3.0,
+                  generation=GenerationConfig(max_tokens=512)),
+        AgentSpec("facts", "decision_copilot.agents.facts:FactsAgent", "1",
+                  inputs=("planner",), cost=6.0, selectable=True, generation=GenerationConfig(max_tokens=1024)),
+        AgentSpec("pro", "decision_copilot.agents.pros:ProAgent", "1",
+                  inputs=("planner",), cost=6.0, selectable=True, generation=GenerationConfig(max_tokens=1024)),
+        AgentSpec("con", "decision_copilot.agents.cons:ConAgent", "1",
+                  inputs=("planner",), cost=6.0, selectable=True, generation=GenerationConfig(max_tokens=1024)),
+        AgentSpec("risk", "decision_copilot.agents.risks:RiskAgent", "1",
+                  inputs=("planner",), cost=6.0, selectable=True, generation=GenerationConfig(max_tokens=1024)),
+        AgentSpec("synth", "decision_copilot.agents.synth:SynthAgent", "1",
+                  inputs=("facts", "pro", "con", "risk"), stage="synth", cost=5.0,
+                  generation=GenerationConfig(max_tokens=2048)),
+    )
+}
+
+AGENT_VERSIONS: dict[str, str] = {name: spec.version for name, spec in AGENT_SPECS.items()}
+
+# Not nodes of the DAG, but built, routed and queued like agents:
+# - digest condenses a long decision context once for a run's agents (orchestrator/context_digest.py);
+# - ingest summarizes and merges the chunks of a context file (orchestrator/ingest.py).
+DIGEST_AGENT = "digest"
+INGEST_AGENT = "ingest"
+
+AUXILIARY_SPECS: dict[str, AgentSpec] = {
+    spec.name: spec
+    for spec in (
+        AgentSpec(DIGEST_AGENT, "decision_copilot.agents.digest:DigestAgent", "1", stage="planner",
+                  generation=GenerationConfig(max_tokens=1024)),
+        AgentSpec(INGEST_AGENT, "decision_copilot.agents.ingest:IngestAgent", "1", stage="planner",
+                  generation=GenerationConfig(max_tokens=1024)),
+    )
+}
+SELECTABLE_AGENTS: tuple[str, ...] = tuple(name for name, spec in AGENT_SPECS.items() if spec.selectable)
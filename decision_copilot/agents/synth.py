@@ -1,6 +1,7 @@
 # coding: utf-8
 from decision_copilot.agents.base import AgentContext
 from decision_copilot.llm.client import DeepSeekClient
+from decision_copilot.llm.contracts import AGENT_CONTRACTS
 
 
 class SynthAgent:
@@ -49,6 +50,5 @@ class SynthAgent:
             system=system,
             user=user,
             example_json=example,
-            required_keys=["recommendation", "confidence", "rationale", "key_tradeoffs", "next_steps",
-                           "open_questions"],
+            contract=AGENT_CONTRACTS["synth"],
         )
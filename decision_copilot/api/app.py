@@ -0,0 +1,280 @@
+# coding: utf-8
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from decision_copilot.api.http import HTTPError, Request, Response, Router
+from decision_copilot.config import AppConfig
+from decision_copilot.models import Decision, DecisionStatus
+from decision_copilot.orchestrator.resume import RESUME_SCOPES, ResumePolicy
+from decision_copilot.orchestrator.synth_policy import SynthPolicy
+from decision_copilot.services.decision_service import DecisionService
+from decision_copilot.services.export_service import (
+    EXPORT_FORMATS,
+    ExportFilter,
+    iter_export_batches,
+    render_record,
+    write_csv,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_WAIT_S = 60.0
+
+_EXPORT_CONTENT_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "jsonl": "application/json",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class RunWatcher:
+    """
+    Wakes long-polling status requests when their decision leaves RUNNING.
+    One query per interval covers every waiting request, so idle long polls cost
+    nothing per client; the workers need no notification channel.
+    """
+
+    def __init__(self, db: "DatabaseExecutor", interval_s: float = 0.25, chunk: int = 500):
+        self.db = db
+        self.interval_s = interval_s
+        self.chunk = chunk
+        self._waiters: dict[int, list[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait_finished(self, decision_id: int, timeout_s: float) -> bool:
+        """True once the decision is no longer RUNNING, False on timeout."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(decision_id, []).append(fut)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        try:
+            return await asyncio.wait_for(fut, timeout_s)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiting = self._waiters.get(decision_id)
+            if waiting and fut in waiting:
+                waiting.remove(fut)
+                if not waiting:
+                    del self._waiters[decision_id]
+
+    async def _poll(self) -> None:
+        while self._waiters:
+            await asyncio.sleep(self.interval_s)
+            try:
+                finished = await self._finished(list(self._waiters))
+            except Exception:
+                logger.warning("Status watch query failed", exc_info=True)
+                continue
+            for decision_id in finished:
+                for fut in self._waiters.pop(decision_id, []):
+                    if not fut.done():
+                        fut.set_result(True)
+
+    async def _finished(self, ids: list[int]) -> list[int]:
+        def query(session: Session) -> list[int]:
+            out = []
+            for i in range(0, len(ids), self.chunk):
+                out.extend(session.execute(
+                    select(Decision.id).where(
+                        Decision.id.in_(ids[i:i + self.chunk]),
+                        Decision.status != DecisionStatus.RUNNING,
+                    )
+                ).scalars())
+            return out
+
+        return await self.db.run(query)
+
+
+class DatabaseExecutor:
+    """
+    Runs session work on a bounded thread pool so the event loop never blocks on
+    SQLite (or on the Redis enqueues a run start makes). The threads share the
+    engine's connection pool; SQLite serializes writers anyway, so a handful of
+    threads is enough.
+    """
+
+    def __init__(self, session_factory: sessionmaker[Session], threads: int = 8):
+        self.session_factory = session_factory
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api-db")
+
+    async def run(self, fn: Callable[[Session], T]) -> T:
+        def call() -> T:
+            with self.session_factory() as session:
+                return fn(session)
+
+        return await asyncio.get_running_loop().run_in_executor(self.pool, call)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+class DecisionApi:
+    """
+    HTTP/JSON front end of `DecisionService` for the long-running daemon.
+
+    Requests run the same service code as the CLI, on pooled connections, so
+    interpreter start-up, imports and engine construction are paid once per process.
+    """
+
+    def __init__(self, db: DatabaseExecutor, watcher: Optional[RunWatcher] = None, cfg: Optional[AppConfig] = None):
+        self.db = db
+        self.watcher = watcher or RunWatcher(db)
+        self.single_flight = (cfg or AppConfig()).single_flight
+
+    def router(self) -> Router:
+        r = Router()
+        r.add("GET", "/healthz", self.healthz)
+        r.add("POST", "/decisions", self.create)
+        r.add("POST", "/decisions/{decision_id}/runs", self.run)
+        r.add("POST", "/decisions/{decision_id}/cancel", self.cancel)
+        r.add("GET", "/decisions/{decision_id}/status", self.status)
+        r.add("GET", "/decisions/{decision_id}/report", self.report)
+        r.add("GET", "/decisions/{decision_id}/export", self.export)
+        return r
+
+    async def _call(self, fn: Callable[[DecisionService], T]) -> T:
+        try:
+            return await self.db.run(lambda s: fn(DecisionService(s)))
+        except ValueError as e:
+            # The service reports unknown ids and refused transitions as ValueError.
+            raise HTTPError(404 if "not found" in str(e).lower() else 409, str(e)) from e
+
+    # ----- handlers -----
+
+    async def healthz(self, request: Request) -> Response:
+        return Response.json({"status": "ok"})
+
+    async def create(self, request: Request) -> Response:
+        body = request.json()
+        question = body.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise HTTPError(400, "'question' is required")
+        context = body.get("context")
+        res = await self._call(lambda svc: svc.create_decision(question=question, context=context))
+        return Response.json({"decision_id": res.decision_id}, 201)
+
+    async def run(self, request: Request) -> Response:
+        decision_id = _int_param(request, "decision_id")
+        body = request.json()
+        resume = None
+        if body.get("resume") or body.get("resume_from") is not None:
+            scope = body.get("resume_from", "latest")
+            if scope not in RESUME_SCOPES:
+                raise HTTPError(400, f"'resume_from' must be one of {RESUME_SCOPES}")
+            resume = ResumePolicy(scope=scope)
+        single_flight = bool(body.get("single_flight", self.single_flight)) and not body.get("force")
+        try:
+            synth_policy = SynthPolicy(quorum=body.get("quorum"), deadline_s=body.get("deadline_s"))
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, str(e))
+        context_digest = body.get("context_digest")
+        if context_digest is not None and not isinstance(context_digest, bool):
+            raise HTTPError(400, "'context_digest' must be a boolean")
+        res = await self._call(lambda svc: svc.start_run(
+            decision_id=decision_id,
+            mode=str(body.get("mode", "default")),
+            resume=resume,
+            single_flight=single_flight,
+            synth_policy=None if synth_policy.waits_for_all else synth_policy,
+            context_digest=context_digest,
+        ))
+        return Response.json(
+            {
+                "decision_run_id": res.decision_run_id,
+                "reused_agents": list(res.reused_agents),
+                "coalesced": res.coalesced,
+            },
+            200 if res.coalesced else 202,
+        )
+
+    async def cancel(self, request: Request) -> Response:
+        decision_id = _int_param(request, "decision_id")
+        run_id = request.json().get("decision_run_id")
+        res = await self._call(lambda svc: svc.cancel_run(decision_id, run_id))
+        return Response.json({"decision_run_id": res.decision_run_id, "canceled": res.canceled, "status": res.status})
+
+    async def status(self, request: Request) -> Response:
+        """`?wait=S` long-polls up to S seconds (max 60) for the latest run to finish."""
+        decision_id = _int_param(request, "decision_id")
+        wait_s = min(_float_query(request, "wait", 0.0), MAX_WAIT_S)
+        snap = await self._call(lambda svc: svc.get_status_snapshot(decision_id))
+        if wait_s > 0 and snap["decision"]["status"] == DecisionStatus.RUNNING.value:
+            if await self.watcher.wait_finished(decision_id, wait_s):
+                snap = await self._call(lambda svc: svc.get_status_snapshot(decision_id))
+        return Response.json(snap)
+
+    async def report(self, request: Request) -> Response:
+        decision_id = _int_param(request, "decision_id")
+        if _not_modified(request, await self._call(lambda svc: svc.get_report_etag(decision_id))):
+            return Response(status=304)
+        rep = await self._call(lambda svc: svc.get_report(decision_id))
+        return Response.json(rep, headers=_etag_header(rep["etag"]))
+
+    async def export(self, request: Request) -> Response:
+        """Served from the stored report artifact when there is one; `If-None-Match` gets a 304."""
+        decision_id = _int_param(request, "decision_id")
+        fmt = request.query.get("format", "markdown")
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPError(400, f"'format' must be one of {EXPORT_FORMATS}")
+        etag = await self._call(lambda svc: svc.get_report_etag(decision_id))
+        # A format-specific tag, so caches never mix up representations.
+        etag = f"{etag}-{fmt}" if etag else None
+        if _not_modified(request, etag):
+            return Response(status=304)
+
+        def load(session: Session) -> list[Any]:
+            return [r for batch in iter_export_batches(session, ExportFilter(decision_ids=[decision_id])) for r in batch]
+
+        records = await self.db.run(load)
+        if not records:
+            raise HTTPError(404, f"Decision not found: {decision_id}")
+        record = records[0]
+        if record.latest_run is None:
+            raise HTTPError(409, f"No run found for decision: {decision_id}")
+
+        if fmt == "csv":
+            out = io.StringIO()
+            write_csv(out, iter([(record, render_record("csv", record))]))
+            content = out.getvalue()
+        else:
+            content = render_record(fmt, record)
+        response = Response.text(content, _EXPORT_CONTENT_TYPES[fmt])
+        response.headers.update(_etag_header(etag))
+        return response
+
+
+def _not_modified(request: Request, etag: Optional[str]) -> bool:
+    if etag is None:
+        return False
+    tags = {t.strip().strip('"') for t in request.headers.get("if-none-match", "").split(",")}
+    return etag in tags or "*" in tags
+
+
+def _etag_header(etag: Optional[str]) -> dict[str, str]:
+    return {"ETag": f'"{etag}"'} if etag else {}
+
+
+def _int_param(request: Request, name: str) -> int:
+    try:
+        return int(request.params[name])
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be an integer")
+
+
+def _float_query(request: Request, name: str, default: float) -> float:
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be a number")
@@ -0,0 +1,180 @@
+# coding: utf-8
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# A small HTTP/1.1 server on asyncio streams: keep-alive, JSON bodies, path
+# parameters. It serves trusted local clients only (no TLS, no chunked uploads),
+# which is all the daemon needs and keeps it free of a web framework dependency.
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+IDLE_TIMEOUT_S = 75.0
+
+_REASONS = {
+    200: "OK", 201: "Created", 202: "Accepted", 304: "Not Modified", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]  # lower-case names
+    body: bytes
+    params: dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            data = orjson.loads(self.body)
+        except orjson.JSONDecodeError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}") from e
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSON body must be an object")
+        return data
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "application/json"
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, data: Any, status: int = 200, headers: Optional[dict[str, str]] = None) -> "Response":
+        return cls(status=status, body=orjson.dumps(data), headers=headers or {})
+
+    @classmethod
+    def text(cls, text: str, content_type: str = "text/plain; charset=utf-8", status: int = 200) -> "Response":
+        return cls(status=status, body=text.encode(), content_type=content_type)
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class Router:
+    """Routes like `/decisions/{decision_id}/status`; path parameters are matched as path segments."""
+
+    def __init__(self):
+        self._routes: list[tuple[str, re.Pattern, Handler]] = []
+
+    def add(self, method: str, pattern: str, handler: Handler) -> None:
+        regex = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern)
+        self._routes.append((method, re.compile(f"^{regex}$"), handler))
+
+    def resolve(self, method: str, path: str) -> tuple[Handler, dict[str, str]]:
+        allowed = False
+        for m, regex, handler in self._routes:
+            match = regex.match(path)
+            if match is None:
+                continue
+            if m == method:
+                return handler, match.groupdict()
+            allowed = True
+        if allowed:
+            raise HTTPError(405, f"Method {method} not allowed for {path}")
+        raise HTTPError(404, f"No route for {path}")
+
+
+class HTTPServer:
+    def __init__(self, router: Router):
+        self.router = router
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._connection, host, port, limit=MAX_HEADER_BYTES)
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT_S)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, Response.json({"error": "Headers too large"}, 413), False)
+                    return
+
+                try:
+                    request, keep_alive = await self._parse(head, reader)
+                except HTTPError as e:
+                    await self._write(writer, Response.json({"error": e.message}, e.status), False)
+                    return
+
+                response = await self._dispatch(request)
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _parse(self, head: bytes, reader: asyncio.StreamReader) -> tuple[Request, bool]:
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return Request(method=method.upper(), path=url.path, query=query, headers=headers, body=body), keep_alive
+
+    async def _dispatch(self, request: Request) -> Response:
+        try:
+            handler, request.params = self.router.resolve(request.method, request.path)
+            return await handler(request)
+        except HTTPError as e:
+            return Response.json({"error": e.message}, e.status)
+        except Exception:
+            logger.exception("Unhandled error for %s %s", request.method, request.path)
+            return Response.json({"error": "Internal server error"}, 500)
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, response: Response, keep_alive: bool) -> None:
+        head = [f"HTTP/1.1 {response.status} {_REASONS.get(response.status, 'Unknown')}"]
+        headers = {
+            "Content-Type": response.content_type,
+            "Content-Length": str(len(response.body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **response.headers,
+        }
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+        await writer.drain()
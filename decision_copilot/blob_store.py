@@ -0,0 +1,51 @@
+# coding: utf-8
+import hashlib
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+
+# Codec is stored per blob so new codecs can be added without rewriting old rows.
+DEFAULT_CODEC = "zlib"
+
+
+@dataclass(frozen=True)
+class EncodedBlob:
+    hash: str
+    codec: str
+    raw_size: int
+    data: bytes
+
+    def as_row(self) -> dict[str, Any]:
+        return {"hash": self.hash, "codec": self.codec, "raw_size": self.raw_size, "data": self.data}
+
+
+def encode_json(value: Any) -> EncodedBlob:
+    """
+    Serialize and compress `value`.
+
+    The hash is taken over canonical JSON (sorted keys), so equal values share one
+    blob; the stored payload keeps the original key order. Payloads that do not
+    shrink are stored uncompressed.
+    """
+    canonical = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    raw = orjson.dumps(value)
+    codec, data = DEFAULT_CODEC, zlib.compress(raw, 6)
+    if len(data) >= len(raw):
+        codec, data = "raw", raw
+
+    return EncodedBlob(
+        hash=hashlib.sha256(canonical).hexdigest(),
+        codec=codec,
+        raw_size=len(raw),
+        data=data,
+    )
+
+
+def decode_json(codec: str, data: bytes) -> Any:
+    if codec == "zlib":
+        return orjson.loads(zlib.decompress(data))
+    if codec == "raw":
+        return orjson.loads(data)
+    raise ValueError(f"Unknown blob codec: {codec}")
@@ -0,0 +1,60 @@
+# coding: utf-8
+import threading
+from typing import Callable
+
+
+class RunCanceled(Exception):
+    """Raised inside a worker when the run it is executing has been canceled."""
+
+
+class CancelToken:
+    """
+    Thread-safe cancellation signal.
+
+    `cancel()` may be called from any thread (e.g. a watcher polling Redis); it runs
+    the registered callbacks, which is how in-flight HTTP streams get closed.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def canceled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception:
+                # Aborting is best-effort; the worker re-checks the token anyway.
+                pass
+
+    def on_cancel(self, cb: Callable[[], None]) -> Callable[[], None]:
+        """Register `cb`; returns a function that unregisters it. Runs `cb` now if already canceled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(cb)
+                return lambda: self._remove(cb)
+        cb()
+        return lambda: None
+
+    def raise_if_canceled(self) -> None:
+        if self._event.is_set():
+            raise RunCanceled("Run canceled")
+
+    def wait(self, timeout: float) -> bool:
+        return self._event.wait(timeout)
+
+    def _remove(self, cb: Callable[[], None]) -> None:
+        with self._lock:
+            if cb in self._callbacks:
+                self._callbacks.remove(cb)
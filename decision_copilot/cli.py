@@ -1,41 +1,67 @@
 # coding: utf-8
 import argparse
+import importlib
+import sys
+from typing import Optional, Sequence
 
 from dotenv import load_dotenv
 
-from decision_copilot.cli_commands import (
-    init_db,
-    create,
-    run,
-    status,
-    report,
-    list_cmd,
-    explain,
-    export,
-)
-
 load_dotenv()
 
+# Subcommand registry: name -> (module, help).
+# A command's module (and everything it imports: SQLAlchemy, Redis/RQ, the LLM SDK)
+# is imported only when that command is dispatched, so `--help` and light commands
+# stay cheap. Keep the help strings in sync with each module's `register`.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "init-db": ("decision_copilot.cli_commands.init_db", "Initialize SQLite database"),
+    "create": ("decision_copilot.cli_commands.create", "Create a decision"),
+    "run": ("decision_copilot.cli_commands.run", "Start a decision run"),
+    "cancel": ("decision_copilot.cli_commands.cancel", "Cancel a decision run"),
+    "status": ("decision_copilot.cli_commands.status", "Show decision status snapshot"),
+    "report": ("decision_copilot.cli_commands.report", "Show final decision report"),
+    "list": ("decision_copilot.cli_commands.list_cmd", "List decisions"),
+    "explain": ("decision_copilot.cli_commands.explain", "Explain decision execution"),
+    "export": ("decision_copilot.cli_commands.export", "Export decision report(s)"),
+    "migrate-storage": (
+        "decision_copilot.cli_commands.migrate_storage",
+        "Move inline agent outputs/final reports into compressed blob storage",
+    ),
+    "gc": ("decision_copilot.cli_commands.gc", "Expire old runs, archive them, and compact the database"),
+    "perf-report": (
+        "decision_copilot.cli_commands.perf_report",
+        "Agent latency percentiles, critical-path attribution and throughput",
+    ),
+    "metrics": ("decision_copilot.cli_commands.metrics", "Show aggregated worker metrics (Prometheus text format)"),
+}
+
 
-def build_parser() -> argparse.ArgumentParser:
+def build_parser(argv: Optional[Sequence[str]] = None) -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="decision-copilot")
     sub = p.add_subparsers(dest="cmd", required=True)
 
-    init_db.register(sub)
-    create.register(sub)
-    run.register(sub)
-    status.register(sub)
-    report.register(sub)
-    list_cmd.register(sub)
-    explain.register(sub)
-    export.register(sub)
+    selected = _selected_command(argv)
+    for name, (module, help_) in COMMANDS.items():
+        if name == selected:
+            importlib.import_module(module).register(sub)
+        else:
+            # Placeholder so the command is listed in --help without importing it.
+            sub.add_parser(name, help=help_)
 
     return p
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+def _selected_command(argv: Optional[Sequence[str]]) -> Optional[str]:
+    # The top-level parser has no options besides -h, so the command is the first positional.
+    for arg in argv or ():
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser(argv)
+    args = parser.parse_args(argv)
     args.func(args)
 
 
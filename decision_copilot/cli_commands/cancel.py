@@ -0,0 +1,29 @@
+# coding: utf-8
+import argparse
+
+from decision_copilot.config import AppConfig
+from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
+from decision_copilot.services.decision_service import DecisionService
+
+
+def _make_service() -> DecisionService:
+    cfg = AppConfig()
+    engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
+    SessionFactory = make_session_factory(engine)
+    return DecisionService(SessionFactory())
+
+
+def register(subparsers):
+    p = subparsers.add_parser("cancel", help="Cancel a decision run")
+    p.add_argument("decision_id", type=int)
+    p.add_argument("--run", type=int, default=None, help="Run id to cancel (default: latest run)")
+    p.set_defaults(func=cmd_cancel)
+
+
+def cmd_cancel(args: argparse.Namespace) -> None:
+    svc = _make_service()
+    res = svc.cancel_run(decision_id=args.decision_id, decision_run_id=args.run)
+    if res.canceled:
+        print(f"Canceled run {res.decision_run_id}")
+    else:
+        print(f"Run {res.decision_run_id} already {res.status}; nothing to cancel")
@@ -1,5 +1,7 @@
 # coding: utf-8
 import argparse
+import sys
+from pathlib import Path
 
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
@@ -16,11 +18,34 @@ def _make_service() -> DecisionService:
 def register(subparsers):
     p = subparsers.add_parser("create", help="Create a decision")
     p.add_argument("question", type=str)
-    p.add_argument("--context", type=str, default=None)
+    source = p.add_mutually_exclusive_group()
+    source.add_argument("--context", type=str, default=None)
+    source.add_argument(
+        "--context-file",
+        type=Path,
+        default=None,
+        help="UTF-8 text file; larger than --max-context-chars, it is chunked, summarized "
+             "by the workers in parallel and reduced to a bounded context",
+    )
+    p.add_argument("--chunk-chars", type=int, default=None,
+                   help="Chunk size for --context-file ingestion (default: 12000)")
+    p.add_argument("--max-context-chars", type=int, default=None,
+                   help="Bound on the context built from --context-file (default: 16000)")
     p.set_defaults(func=cmd_create)
 
 
 def cmd_create(args: argparse.Namespace) -> None:
     svc = _make_service()
-    res = svc.create_decision(question=args.question, context=args.context)
+    if args.context_file is None:
+        res = svc.create_decision(question=args.question, context=args.context)
+    else:
+        res = svc.create_decision_from_file(
+            question=args.question,
+            path=args.context_file,
+            chunk_chars=args.chunk_chars,
+            max_context_chars=args.max_context_chars,
+        )
+        if res.chunks:
+            print(f"Ingesting {res.chunks} chunk(s) of {args.context_file}; "
+                  "the decision can run once its status is 'new'.", file=sys.stderr)
     print(res.decision_id)
@@ -4,7 +4,7 @@ import json
 
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
-from decision_copilot.models import Decision, DecisionRun, AgentRun
+from decision_copilot.services.read_models import explain_view
 
 
 def _make_session():
@@ -21,36 +21,27 @@ def register(subparsers):
 
 
 def cmd_explain(args: argparse.Namespace) -> None:
-    session = _make_session()
-
-    decision = session.get(Decision, args.decision_id)
-    if not decision:
-        print("Decision not found")
-        return
-
-    run = (
-        session.query(DecisionRun)
-        .filter(DecisionRun.decision_id == decision.id)
-        .order_by(DecisionRun.created_at.desc())
-        .first()
-    )
-
-    agents = (
-        session.query(AgentRun)
-        .filter(AgentRun.decision_run_id == run.id)
-        .order_by(AgentRun.created_at)
-        .all()
-    )
-
-    print(f"Decision {decision.id}")
-    print(f"Question: {decision.question}")
-    print(f"Status: {decision.status}")
-    print()
-
-    for a in agents:
-        print(f"[{a.agent_name}] {a.status}")
-        if a.output:
-            print(json.dumps(a.output, indent=2, ensure_ascii=False))
-        if a.error_message:
-            print(f"ERROR: {a.error_message}")
+    with _make_session() as session:
+        view = explain_view(session, args.decision_id)
+        if view is None:
+            print("Decision not found")
+            return
+
+        print(f"Decision {view.decision_id}")
+        print(f"Question: {view.question}")
+        print(f"Status: {view.status}")
         print()
+
+        if view.run_id is None:
+            print("No runs yet.")
+            return
+
+        # Agents stream from the query, one decoded output at a time.
+        for a in view.agents:
+            reused = f" (reused from agent run {a.reused_from_id})" if a.reused_from_id else ""
+            print(f"[{a.agent_name}] {a.status}{reused}")
+            if a.output:
+                print(json.dumps(a.output, indent=2, ensure_ascii=False))
+            if a.error_message:
+                print(f"ERROR: {a.error_message}")
+            print()
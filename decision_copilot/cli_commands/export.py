@@ -1,10 +1,25 @@
 # coding: utf-8
 import argparse
-from typing import Any
+import os
+import sys
+from contextlib import nullcontext
+from pathlib import Path
 
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
-from decision_copilot.models import Decision, DecisionRun, AgentRun
+from decision_copilot.models import DecisionStatus
+from decision_copilot.services.export_service import (
+    EXPORT_FORMATS,
+    ExportFilter,
+    export_incremental,
+    iter_export_batches,
+    parse_since,
+    render_batches,
+    render_record,
+    write_csv,
+    write_jsonl,
+    write_markdown_dir,
+)
 
 
 def _make_session():
@@ -15,142 +30,129 @@ def _make_session():
 
 
 def register(subparsers):
-    p = subparsers.add_parser("export", help="Export decision report")
-    p.add_argument("decision_id", type=int)
-    p.add_argument("--format", choices=["markdown"], default="markdown")
+    p = subparsers.add_parser("export", help="Export decision report(s)")
+    p.add_argument("decision_id", type=int, nargs="?", default=None)
+    p.add_argument("--all", action="store_true", help="Export every decision")
+    p.add_argument("--since", type=str, default=None, help="Only decisions updated at/after this ISO time")
+    p.add_argument(
+        "--status",
+        choices=[s.value for s in DecisionStatus],
+        default=None,
+        help="Only decisions with this status",
+    )
+    p.add_argument("--format", choices=EXPORT_FORMATS, default="markdown")
     p.add_argument(
         "--output",
         type=str,
         default=None,
-        help="Write output to file instead of stdout",
+        help="Write output to file (or directory for bulk markdown) instead of stdout",
+    )
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --all: write only decisions changed since the last export (manifest-based)",
+    )
+    p.add_argument("--manifest", type=str, default=None, help="Manifest path for --incremental")
+    p.add_argument("--batch-size", type=int, default=500, help="Decisions per streamed batch")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Rendering processes (<= 1 renders inline)",
     )
     p.set_defaults(func=cmd_export)
 
 
 def cmd_export(args: argparse.Namespace) -> None:
+    bulk = args.all or args.since is not None or args.status is not None
+    if bulk and args.decision_id is not None:
+        print("Use either a decision_id or --all/--since/--status, not both")
+        return
+    if not bulk and args.decision_id is None:
+        print("A decision_id or one of --all/--since/--status is required")
+        return
+
     session = _make_session()
 
-    decision = session.get(Decision, args.decision_id)
-    if not decision:
-        print("Decision not found")
+    if not bulk:
+        _export_one(session, args)
         return
 
-    run = (
-        session.query(DecisionRun)
-        .filter(DecisionRun.decision_id == decision.id)
-        .order_by(DecisionRun.created_at.desc())
-        .first()
-    )
-    if not run:
-        print("No run found for decision")
+    if args.incremental:
+        _export_incremental(session, args)
         return
 
-    agent_runs = (
-        session.query(AgentRun)
-        .filter(AgentRun.decision_run_id == run.id)
-        .all()
+    flt = ExportFilter(
+        since=parse_since(args.since) if args.since else None,
+        status=args.status,
     )
+    batches = iter_export_batches(session, flt, batch_size=args.batch_size)
+    rendered = render_batches(batches, args.format, workers=args.workers)
+
+    if args.format == "markdown":
+        if not args.output:
+            print("--output directory is required for bulk markdown export")
+            return
+        n = write_markdown_dir(Path(args.output), rendered)
+        print(f"Exported {n} decisions to: {args.output}")
+        return
 
-    agents: dict[str, dict[str, Any]] = {
-        a.agent_name: (a.output or {}) for a in agent_runs
-    }
-
-    markdown = _render_markdown(decision, agents)
-
+    writer = write_jsonl if args.format == "jsonl" else write_csv
     if args.output:
-        _write_file(args.output, markdown)
-        print(f"Report written to: {args.output}")
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            n = writer(f, rendered)
+        print(f"Exported {n} decisions to: {args.output}")
     else:
-        print(markdown)
-
-
-# =========================
-# Rendering
-# =========================
-
-def _render_markdown(decision: Decision, agents: dict[str, dict[str, Any]]) -> str:
-    md: list[str] = []
-
-    md.append("# Decision Report\n")
+        writer(sys.stdout, rendered)
 
-    md.append("## Question\n")
-    md.append(f"{decision.question}\n")
 
-    if decision.context:
-        md.append("## Context\n")
-        md.append(f"{decision.context}\n")
-
-    md.append("## Analysis\n")
-    _render_list_section(md, "Facts", agents.get("facts"))
-    _render_list_section(md, "Pros", agents.get("pro"))
-    _render_list_section(md, "Cons", agents.get("con"))
-    _render_list_section(md, "Risks", agents.get("risk"))
-
-    if decision.final_report:
-        md.append("## Final Recommendation\n")
-        _render_final_report(md, decision.final_report)
-
-    return "\n".join(md)
-
-
-# =========================
-# Helpers
-# =========================
-
-def _render_list_section(md: list[str], title: str, data: dict | None) -> None:
-    if not data:
+def _export_incremental(session, args: argparse.Namespace) -> None:
+    if not args.all or args.since is not None or args.status is not None:
+        print("--incremental only works with --all")
         return
-
-    items = []
-    if isinstance(data, dict) and isinstance(data.get("items"), list):
-        items = data["items"]
-
-    md.append(f"### {title}\n")
-
-    if not items:
-        md.append("_No items provided._\n")
+    if not args.output:
+        print("--output is required for --incremental")
         return
 
-    for it in items:
-        md.append(f"- {it}")
-    md.append("")
+    res = export_incremental(
+        session,
+        args.format,
+        Path(args.output),
+        manifest_path=Path(args.manifest) if args.manifest else None,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    print(f"Exported {res.written} changed, {res.deleted} deleted, {res.unchanged} unchanged: {args.output}")
 
 
-def _render_final_report(md: list[str], report: dict[str, Any]) -> None:
-    if not isinstance(report, dict):
-        md.append("_Invalid final report format._\n")
+def _export_one(session, args: argparse.Namespace) -> None:
+    batches = iter_export_batches(session, ExportFilter(decision_ids=[args.decision_id]))
+    records = [r for batch in batches for r in batch]
+    if not records:
+        print("Decision not found")
         return
 
-    if report.get("recommendation"):
-        md.append(f"**Recommendation**: {report['recommendation']}\n")
-
-    if report.get("confidence") is not None:
-        md.append(f"**Confidence**: {report['confidence']}\n")
-
-    if report.get("rationale"):
-        md.append("**Rationale**:\n")
-        md.append(f"{report['rationale']}\n")
-
-    _render_bullets(md, "Key Trade-offs", report.get("key_tradeoffs"))
-    _render_bullets(md, "Next Steps", report.get("next_steps"))
-    _render_bullets(md, "Open Questions", report.get("open_questions"))
-
-
-def _render_bullets(md: list[str], title: str, value: Any) -> None:
-    if not value:
+    record = records[0]
+    if record.latest_run is None:
+        print("No run found for decision")
         return
 
-    md.append(f"**{title}**:\n")
-
-    if isinstance(value, list):
-        for v in value:
-            md.append(f"- {v}")
+    if args.format == "csv":
+        with _open_output(args.output) as f:
+            write_csv(f, iter([(record, render_record("csv", record))]))
     else:
-        md.append(f"- {value}")
+        content = render_record(args.format, record)
+        if args.output:
+            with _open_output(args.output) as f:
+                f.write(content)
+        else:
+            print(content)
 
-    md.append("")
+    if args.output:
+        print(f"Report written to: {args.output}")
 
 
-def _write_file(path: str, content: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+def _open_output(path: str | None):
+    if path is None:
+        return nullcontext(sys.stdout)
+    return open(path, "w", encoding="utf-8", newline="")
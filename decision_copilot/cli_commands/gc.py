@@ -0,0 +1,50 @@
+# coding: utf-8
+import argparse
+from pathlib import Path
+
+from decision_copilot.config import AppConfig
+from decision_copilot.database import DatabaseConfig, make_engine
+from decision_copilot.services.gc_service import RetentionPolicy, plan_gc, run_gc
+
+
+def register(subparsers):
+    p = subparsers.add_parser("gc", help="Expire old runs, archive them, and compact the database")
+    p.add_argument("--keep", type=int, default=3, help="Runs to keep per decision (latest first)")
+    p.add_argument("--older-than", type=int, default=None, help="Also expire runs older than N days")
+    p.add_argument("--archive", type=str, default=None, help="Archive expired runs to DIR as .jsonl.gz")
+    p.add_argument("--batch-size", type=int, default=200, help="Runs deleted per transaction")
+    p.add_argument("--vacuum", action="store_true", help="Run a full VACUUM (switches to incremental mode)")
+    p.add_argument("--dry-run", action="store_true", help="Only report what would be reclaimed")
+    p.set_defaults(func=cmd_gc)
+
+
+def cmd_gc(args: argparse.Namespace) -> None:
+    cfg = AppConfig()
+    engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
+    policy = RetentionPolicy(keep_last=args.keep, older_than_days=args.older_than)
+
+    if args.dry_run:
+        rep = plan_gc(engine, policy)
+        print(f"Runs to delete: {rep.runs} (agent runs: {rep.agent_runs})")
+        print(f"Blobs to delete: {rep.blobs} ({_mb(rep.blob_bytes)})")
+        print(f"Row data: ~{_mb(rep.row_bytes)}")
+        print(f"Free pages: {_mb(rep.free_bytes)}")
+        print(f"Reclaimable: ~{_mb(rep.reclaimable_bytes)}")
+        return
+
+    rep = run_gc(
+        engine,
+        cfg.sqlite_path,
+        policy,
+        archive_dir=Path(args.archive) if args.archive else None,
+        batch_size=args.batch_size,
+        vacuum=args.vacuum,
+    )
+    print(f"Deleted {rep.runs} runs, {rep.agent_runs} agent runs, {rep.blobs} blobs")
+    if rep.archive_path:
+        print(f"Archived to: {rep.archive_path}")
+    print(f"Database size: {rep.size_before} -> {rep.size_after} bytes")
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1e6:.2f} MB"
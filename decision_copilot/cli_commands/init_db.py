@@ -2,7 +2,9 @@
 import argparse
 
 from decision_copilot.config import AppConfig
-from decision_copilot.database import DatabaseConfig, make_engine, init_db
+from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory, init_db
+from decision_copilot.orchestrator.summary import backfill_run_summaries
+from decision_copilot.services.storage_service import legacy_inline_columns
 
 
 def register(subparsers):
@@ -14,4 +16,13 @@ def cmd_init_db(args: argparse.Namespace) -> None:
     cfg = AppConfig()
     engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
     init_db(engine)
+
+    with make_session_factory(engine)() as session:
+        n = backfill_run_summaries(session)
+    if n:
+        print(f"Backfilled run summaries for {n} decisions")
+
     print(f"Initialized SQLite database at: {cfg.sqlite_path}")
+
+    if legacy_inline_columns(engine):
+        print("Inline agent outputs found; run `decision-copilot migrate-storage` to move them to blob storage.")
@@ -1,6 +1,8 @@
 # coding: utf-8
 import argparse
 
+from sqlalchemy import select
+
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
 from decision_copilot.models import Decision
@@ -21,11 +23,12 @@ def register(subparsers):
 
 def cmd_list(args: argparse.Namespace) -> None:
     session = _make_session()
-    q = session.query(Decision)
+    # Project only the printed columns; never hydrate reports or summaries.
+    stmt = select(Decision.id, Decision.status, Decision.question)
     if args.status:
-        q = q.filter(Decision.status == args.status)
+        stmt = stmt.where(Decision.status == args.status)
 
-    rows = q.order_by(Decision.created_at.desc()).limit(20).all()
+    rows = session.execute(stmt.order_by(Decision.created_at.desc()).limit(20)).all()
 
     for d in rows:
         print(f"{d.id}\t{d.status}\t{d.question}")
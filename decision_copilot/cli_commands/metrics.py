@@ -0,0 +1,95 @@
+# coding: utf-8
+import argparse
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+
+from decision_copilot import metrics
+from decision_copilot.config import AppConfig
+from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
+from decision_copilot.models import DecisionRun, RunStatus
+from decision_copilot.queue.connection import STAGES, get_queue
+
+logger = logging.getLogger(__name__)
+
+
+def _make_session_factory():
+    cfg = AppConfig()
+    engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
+    return make_session_factory(engine)
+
+
+def register(subparsers):
+    p = subparsers.add_parser("metrics", help="Show aggregated worker metrics (Prometheus text format)")
+    p.add_argument(
+        "--dir",
+        type=Path,
+        default=os.environ.get("DECISION_COPILOT_METRICS_DIR"),
+        help="Directory the worker processes write snapshots to (default: DECISION_COPILOT_METRICS_DIR)",
+    )
+    p.add_argument("--serve", type=int, default=None, metavar="PORT",
+                   help="Serve the aggregate on http://HOST:PORT/metrics instead of printing it once")
+    p.add_argument("--host", type=str, default="127.0.0.1")
+    p.set_defaults(func=cmd_metrics)
+
+
+def cmd_metrics(args: argparse.Namespace) -> None:
+    SessionFactory = _make_session_factory()
+
+    def collect() -> str:
+        merged = {}
+        if args.dir and args.dir.exists():
+            try:
+                metrics.compact_snapshots(args.dir)
+            except OSError as e:
+                logger.warning("Could not compact metrics snapshots: %s", e)
+            merged = metrics.merge_snapshots(args.dir)
+        return metrics.render(merged, _cluster_gauges(SessionFactory))
+
+    if args.serve is None:
+        print(collect(), end="")
+        return
+
+    metrics.start_http_server(args.serve, collect, host=args.host)
+    print(f"Serving aggregated metrics on http://{args.host}:{args.serve}/metrics (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+def _cluster_gauges(SessionFactory) -> dict[str, Any]:
+    """Gauges that no single process knows: runs in flight (SQLite) and queue depth (Redis)."""
+    with SessionFactory() as session:
+        rows = session.execute(
+            select(DecisionRun.status, func.count())
+            .where(DecisionRun.status.in_((RunStatus.QUEUED, RunStatus.RUNNING)))
+            .group_by(DecisionRun.status)
+        ).all()
+    in_flight = {(s.value,): 0.0 for s in (RunStatus.QUEUED, RunStatus.RUNNING)}
+    in_flight.update({(status.value,): float(n) for status, n in rows})
+
+    out = {
+        "dc_runs_in_flight": metrics.gauge_family(
+            "dc_runs_in_flight", "Decision runs not finished yet, by status.", ("status",), in_flight),
+    }
+
+    depth = _queue_depth()
+    if depth is not None:
+        out["dc_queue_depth"] = metrics.gauge_family(
+            "dc_queue_depth", "Jobs waiting in each stage queue.", ("queue",), depth)
+    return out
+
+
+def _queue_depth() -> Optional[dict[tuple[str, ...], float]]:
+    try:
+        return {(q.name,): float(q.count) for q in (get_queue(stage) for stage in (*STAGES, None))}
+    except Exception as e:
+        # Redis down should not hide the other metrics.
+        logger.warning("Queue depth unavailable: %s", e)
+        return None
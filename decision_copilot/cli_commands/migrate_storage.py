@@ -0,0 +1,33 @@
+# coding: utf-8
+import argparse
+
+from decision_copilot.config import AppConfig
+from decision_copilot.database import DatabaseConfig, make_engine
+from decision_copilot.services.storage_service import migrate_inline_storage
+
+
+def register(subparsers):
+    p = subparsers.add_parser(
+        "migrate-storage",
+        help="Move inline agent outputs/final reports into compressed blob storage",
+    )
+    p.add_argument("--batch-size", type=int, default=500)
+    p.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM after migrating")
+    p.set_defaults(func=cmd_migrate_storage)
+
+
+def cmd_migrate_storage(args: argparse.Namespace) -> None:
+    cfg = AppConfig()
+    engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
+    res = migrate_inline_storage(
+        engine,
+        cfg.sqlite_path,
+        batch_size=args.batch_size,
+        vacuum=not args.no_vacuum,
+    )
+
+    for table, n in res.rows_migrated.items():
+        print(f"Migrated {n} rows from {table}")
+    for column in res.dropped_columns:
+        print(f"Dropped inline column {column}")
+    print(f"Database size: {res.size_before} -> {res.size_after} bytes")
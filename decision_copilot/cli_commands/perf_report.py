@@ -0,0 +1,152 @@
+# coding: utf-8
+import argparse
+import re
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import orjson
+
+from decision_copilot.config import AppConfig
+from decision_copilot.database import DatabaseConfig, make_engine
+from decision_copilot.models import utcnow
+from decision_copilot.services.perf_service import (
+    GROUP_KEYS,
+    PERCENTILES,
+    WINDOW_FORMATS,
+    PerfQuery,
+    PerfReport,
+    perf_report,
+)
+
+_RELATIVE_RE = re.compile(r"^(\d+)([hdw])$")
+_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def register(subparsers):
+    p = subparsers.add_parser(
+        "perf-report",
+        help="Agent latency percentiles, critical-path attribution, throughput and context digest savings",
+    )
+    p.add_argument("--since", type=str, default="7d",
+                   help="Start of the range: ISO date/time (UTC) or relative like 24h, 7d, 4w (default: 7d)")
+    p.add_argument("--until", type=str, default=None, help="End of the range (default: now)")
+    p.add_argument("--by", type=str, default="agent",
+                   help=f"Latency grouping, comma-separated from {','.join(GROUP_KEYS)} (default: agent)")
+    p.add_argument("--window", choices=tuple(WINDOW_FORMATS), default="day",
+                   help="Time window for throughput and --by window (default: day)")
+    p.add_argument("--json", action="store_true", help="Print JSON instead of tables")
+    p.set_defaults(func=cmd_perf_report)
+
+
+def cmd_perf_report(args: argparse.Namespace) -> None:
+    query = PerfQuery(
+        since=_parse_time(args.since),
+        until=_parse_time(args.until),
+        group_by=tuple(k.strip() for k in args.by.split(",") if k.strip()),
+        window=args.window,
+    )
+
+    cfg = AppConfig()
+    engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
+    with engine.connect() as conn:
+        report = perf_report(conn, query)
+
+    if args.json:
+        print(orjson.dumps(_as_dict(report), option=orjson.OPT_INDENT_2).decode())
+    else:
+        _print_report(report)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    m = _RELATIVE_RE.match(value)
+    if m:
+        return utcnow() - timedelta(**{_UNITS[m.group(2)]: int(m.group(1))})
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"Invalid time: {value!r} (use ISO format or 24h / 7d / 4w)") from e
+
+
+def _pct(p: float) -> str:
+    return f"p{round(p * 100):d}"
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def _print_report(report: PerfReport) -> None:
+    q = report.query
+    since = q.since.isoformat(timespec="minutes") if q.since else "beginning"
+    until = q.until.isoformat(timespec="minutes") if q.until else "now"
+    print(f"Range: {since} .. {until} (UTC)")
+
+    print("\nLatency of DONE agent runs (ms): queue wait / execution")
+    header = [*q.group_by, "n"]
+    header += [f"wait {_pct(p)}" for p in PERCENTILES] + [f"exec {_pct(p)}" for p in PERCENTILES]
+    rows = [
+        [*(str(r.group[k]) for k in q.group_by), str(r.count)]
+        + [_ms(r.wait_ms[p]) for p in PERCENTILES]
+        + [_ms(r.exec_ms[p]) for p in PERCENTILES]
+        for r in report.latency
+    ]
+    _print_table(header, rows)
+
+    print(f"\nCritical path over {report.critical_path_runs} completed run(s)")
+    _print_table(
+        ["agent", "on path", "% runs", "% path time", "avg wait", "avg exec"],
+        [
+            [r.agent, str(r.runs_on_path), f"{r.share_of_runs:.0%}", f"{r.share_of_time:.0%}",
+             _ms(r.avg_wait_ms), _ms(r.avg_exec_ms)]
+            for r in report.critical_path
+        ],
+    )
+
+    print(f"\nThroughput per {q.window}")
+    _print_table(
+        ["window", "agent runs", "failed", "runs completed"],
+        [[r.window, str(r.agent_runs), str(r.failed), str(r.runs_completed)] for r in report.throughput],
+    )
+
+    print("\nContext digest: prompt tokens saved (estimated)")
+    _print_table(
+        ["mode", "runs", "agent runs", "tokens saved"],
+        [[r.mode, str(r.runs), str(r.agent_runs), str(r.tokens_saved)] for r in report.context_digest],
+    )
+
+
+def _print_table(header: list[str], rows: list[list[str]]) -> None:
+    if not rows:
+        print("(no data)")
+        return
+    widths = [max(len(header[i]), *(len(r[i]) for r in rows)) for i in range(len(header))]
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    for r in rows:
+        print("  ".join(c.ljust(w) for c, w in zip(r, widths)))
+
+
+def _as_dict(report: PerfReport) -> dict[str, Any]:
+    q = report.query
+    return {
+        "since": q.since.isoformat() if q.since else None,
+        "until": q.until.isoformat() if q.until else None,
+        "group_by": list(q.group_by),
+        "window": q.window,
+        "latency": [
+            {
+                **r.group,
+                "count": r.count,
+                "wait_ms": {_pct(p): v for p, v in r.wait_ms.items()},
+                "exec_ms": {_pct(p): v for p, v in r.exec_ms.items()},
+            }
+            for r in report.latency
+        ],
+        "critical_path": {
+            "runs": report.critical_path_runs,
+            "agents": [r.__dict__ for r in report.critical_path],
+        },
+        "throughput": [r.__dict__ for r in report.throughput],
+        "context_digest": [r.__dict__ for r in report.context_digest],
+    }
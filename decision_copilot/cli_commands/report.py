@@ -1,6 +1,7 @@
 # coding: utf-8
 import argparse
 import json
+import sys
 
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
@@ -17,10 +18,22 @@ def _make_service() -> DecisionService:
 def register(subparsers):
     p = subparsers.add_parser("report", help="Show final decision report")
     p.add_argument("decision_id", type=int)
+    p.add_argument(
+        "--if-none-match",
+        type=str,
+        default=None,
+        metavar="ETAG",
+        help="Print nothing if the stored report still has this ETag (from a previous report's \"etag\")",
+    )
     p.set_defaults(func=cmd_report)
 
 
 def cmd_report(args: argparse.Namespace) -> None:
     svc = _make_service()
+    if args.if_none_match is not None:
+        etag = svc.get_report_etag(decision_id=args.decision_id)
+        if etag is not None and etag == args.if_none_match.strip('"'):
+            print(f"Not modified: {etag}", file=sys.stderr)
+            return
     rep = svc.get_report(decision_id=args.decision_id)
     print(json.dumps(rep, indent=2, ensure_ascii=False))
@@ -1,8 +1,12 @@
 # coding: utf-8
 import argparse
+import sys
 
+from decision_copilot import metrics
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
+from decision_copilot.orchestrator.resume import RESUME_SCOPES, ResumePolicy
+from decision_copilot.orchestrator.synth_policy import SynthPolicy
 from decision_copilot.services.decision_service import DecisionService
 
 
@@ -17,10 +21,66 @@ def register(subparsers):
     p = subparsers.add_parser("run", help="Start a decision run")
     p.add_argument("decision_id", type=int)
     p.add_argument("--mode", type=str, default="default")
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse DONE outputs of earlier runs; only failed/missing agents and synth are executed",
+    )
+    p.add_argument(
+        "--resume-from",
+        choices=RESUME_SCOPES,
+        default=None,
+        help="Reuse outputs from the latest run only (default), or the newest output of each agent "
+             "from any run; implies --resume",
+    )
+    p.add_argument(
+        "--single-flight",
+        action="store_true",
+        help="Return the decision's QUEUED/RUNNING run of the same mode instead of starting another "
+             "(default when DECISION_COPILOT_SINGLE_FLIGHT=1)",
+    )
+    p.add_argument("--force", action="store_true", help="Always start a new run, even under single-flight")
+    p.add_argument(
+        "--quorum",
+        type=int,
+        default=None,
+        help="Start synth once this many of its inputs are DONE; the rest are skipped",
+    )
+    p.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Start synth this long after fan-out with the inputs that are DONE (with --quorum: once it is met)",
+    )
+    p.add_argument(
+        "--digest",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Give agents a digest of the context, condensed once and cached (default: "
+             "DECISION_COPILOT_DIGEST_MODES / DECISION_COPILOT_DIGEST_MIN_CHARS)",
+    )
     p.set_defaults(func=cmd_run)
 
 
 def cmd_run(args: argparse.Namespace) -> None:
     svc = _make_service()
-    res = svc.start_run(decision_id=args.decision_id, mode=args.mode)
+    resume = None
+    if args.resume or args.resume_from is not None:
+        resume = ResumePolicy(scope=args.resume_from or "latest")
+    single_flight = (args.single_flight or AppConfig().single_flight) and not args.force
+    synth_policy = SynthPolicy(quorum=args.quorum, deadline_s=args.deadline)
+    res = svc.start_run(
+        decision_id=args.decision_id,
+        mode=args.mode,
+        resume=resume,
+        single_flight=single_flight,
+        synth_policy=None if synth_policy.waits_for_all else synth_policy,
+        context_digest=args.digest,
+    )
+    if res.coalesced:
+        print(f"Run {res.decision_run_id} is already in flight; not starting another (use --force).", file=sys.stderr)
+        metrics.flush_snapshot()
+    elif resume is not None:
+        print(f"Reused outputs: {', '.join(res.reused_agents) or '(none)'}", file=sys.stderr)
     print(res.decision_run_id)
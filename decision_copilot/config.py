@@ -1,9 +1,24 @@
 # coding: utf-8
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
+def _sqlite_path_from_env() -> Path:
+    # Read at construction time, not import time: detached workers import the
+    # task module without any database configured.
+    value = os.environ.get("DECISION_COPILOT_DB")
+    if not value:
+        raise RuntimeError("DECISION_COPILOT_DB is not set.")
+    return Path(value)
+
+
+def _single_flight_from_env() -> bool:
+    return os.environ.get("DECISION_COPILOT_SINGLE_FLIGHT", "").strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass(frozen=True)
 class AppConfig:
-    sqlite_path: Path = Path(os.environ.get("DECISION_COPILOT_DB"))
+    sqlite_path: Path = field(default_factory=_sqlite_path_from_env)
+    # Coalesce `run` onto an in-flight run of the same decision and mode by default.
+    single_flight: bool = field(default_factory=_single_flight_from_env)
@@ -2,8 +2,9 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import Session, sessionmaker
 
 from decision_copilot.models import Base
@@ -48,5 +49,31 @@ def make_session_factory(engine: Engine) -> sessionmaker[Session]:
 
 
 def init_db(engine: Engine) -> None:
-    """Create all tables (no migrations in the MVP)."""
-    Base.metadata.create_all(bind=engine)
+    """
+    Create all tables (no migrations in the MVP).
+
+    Columns and indexes added after a table was first created are created here too,
+    so re-running init-db upgrades an existing database in place.
+    """
+    with engine.connect() as conn:
+        # Only takes effect on a brand-new file; lets `gc` compact with incremental_vacuum.
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        Base.metadata.create_all(bind=conn)
+        conn.commit()
+    _add_missing_columns(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    # Additive only: new columns must be nullable or carry a server default.
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
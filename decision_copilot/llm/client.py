@@ -1,5 +1,7 @@
 # coding: utf-8
+import logging
 import os
+import time
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -11,6 +13,15 @@ from openai.types.chat import (
 )
 from openai.types.shared_params import ResponseFormatJSONObject
 
+from decision_copilot import metrics
+from decision_copilot.cancellation import CancelToken, RunCanceled
+from decision_copilot.llm.contracts import ContractValidator
+from decision_copilot.llm.repair import parse_json_object
+from decision_copilot.llm.routing import GenerationConfig
+from decision_copilot.llm.transport import CallTiming, get_http_client, measure_call
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class DeepSeekConfig:
@@ -24,12 +35,44 @@ class DeepSeekClient:
     DeepSeek API is OpenAI-compatible. We use the OpenAI Python SDK with base_url override.
     This client provides:
       - text completion (non-structured)
-      - strict JSON completion (response_format=json_object) + parsing + basic validation
+      - strict JSON completion (response_format=json_object) + parsing, local repair and
+        contract validation
+
+    Every client in the process sends through the shared pooled transport
+    (llm/transport.py); `last_call_timing` tells whether the last call reused a
+    warm connection and how long the handshake took otherwise; `last_usage` holds
+    the token usage the provider reported for it.
+
+    With a `cancel` token, completions are streamed and the HTTP response is closed
+    as soon as the token fires, so a canceled run stops consuming tokens and the
+    worker is freed immediately.
+
+    `generation` (model, max_tokens, temperature, timeout) applies to every call;
+    its model falls back to `cfg.model`.
     """
 
-    def __init__(self, cfg: Optional[DeepSeekConfig] = None):
+    # Targeted follow-up calls when a reply still breaks its contract after local repair.
+    JSON_FIX_ATTEMPTS = 1
+
+    _FIX_JSON_SYSTEM = (
+        "You repair JSON objects produced by another model.\n"
+        "Fix only the listed problems, keep all existing content, and do not add new facts.\n"
+        "Output the corrected json object only."
+    )
+
+    def __init__(
+            self,
+            cfg: Optional[DeepSeekConfig] = None,
+            *,
+            cancel: Optional[CancelToken] = None,
+            generation: Optional[GenerationConfig] = None,
+    ):
         self.cfg = cfg or DeepSeekConfig()
+        self.cancel = cancel
+        self.generation = generation or GenerationConfig()
         self._client = None
+        self.last_call_timing: Optional[CallTiming] = None
+        self.last_usage: Optional[Any] = None
 
         if not self.cfg.api_key:
             raise RuntimeError("DEEPSEEK_API_KEY is not set.")
@@ -38,19 +81,85 @@ class DeepSeekClient:
         if self._client is not None:
             return self._client
 
-        self._client = OpenAI(api_key=self.cfg.api_key, base_url=self.cfg.base_url)
+        # All clients in the process share one keep-alive connection pool.
+        self._client = OpenAI(api_key=self.cfg.api_key, base_url=self.cfg.base_url, http_client=get_http_client())
         return self._client
 
-    def chat_text(self, system: str, user: str, *, model: Optional[str] = None) -> str:
+    @property
+    def model(self) -> str:
+        """The model used when a call does not pass one explicitly."""
+        return self.generation.model or self.cfg.model
+
+    def _complete(self, *, model: Optional[str] = None, **kwargs: Any) -> str:
+        kwargs = {"model": model or self.model, **self.generation.request_kwargs(), **kwargs}
+        model = kwargs["model"]
+        self.last_usage = None
+        start = time.perf_counter()
+        with measure_call() as timing:
+            try:
+                content = self._send(start, **kwargs)
+            except RunCanceled:
+                raise
+            except Exception:
+                metrics.LLM_ERRORS.inc(model=model)
+                raise
+            else:
+                metrics.LLM_LATENCY.observe(time.perf_counter() - start, model=model)
+                return content
+            finally:
+                self.last_call_timing = timing
+                metrics.LLM_CONNECTIONS.inc(reused=str(timing.reused).lower())
+                logger.info(
+                    "LLM call model=%s took %.0f ms on a %s connection (handshake %.1f ms)",
+                    kwargs["model"], (time.perf_counter() - start) * 1000,
+                    "reused" if timing.reused else "new", timing.handshake_ms,
+                )
+
+    def _send(self, start: float, **kwargs: Any) -> str:
         client = self._get_client()
-        resp = client.chat.completions.create(
-            model=model or self.cfg.model,
+        model = kwargs["model"]
+        if self.cancel is None:
+            resp = client.chat.completions.create(**kwargs)
+            self.last_usage = resp.usage
+            _record_usage(model, resp.usage)
+            return (resp.choices[0].message.content or "").strip()
+
+        self.cancel.raise_if_canceled()
+        # The final chunk carries token usage (and no choices).
+        stream = client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs)
+        # Closing the response from the watcher thread aborts the blocked read.
+        unregister = self.cancel.on_cancel(stream.close)
+        parts = []
+        try:
+            for chunk in stream:
+                if self.cancel.canceled:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not parts:
+                        metrics.LLM_TTFT.observe(time.perf_counter() - start, model=model)
+                    parts.append(chunk.choices[0].delta.content)
+                if getattr(chunk, "usage", None):
+                    self.last_usage = chunk.usage
+                    _record_usage(model, chunk.usage)
+        except Exception:
+            if not self.cancel.canceled:
+                raise
+        finally:
+            unregister()
+            stream.close()
+
+        if self.cancel.canceled:
+            raise RunCanceled("Run canceled during LLM call")
+        return "".join(parts).strip()
+
+    def chat_text(self, system: str, user: str, *, model: Optional[str] = None) -> str:
+        return self._complete(
+            model=model,
             messages=[
                 ChatCompletionSystemMessageParam(content=system, role="system"),
                 ChatCompletionUserMessageParam(content=user, role="user"),
             ],
         )
-        return (resp.choices[0].message.content or "").strip()
 
     def chat_json(
             self,
@@ -59,15 +168,20 @@ class DeepSeekClient:
             *,
             example_json: dict[str, Any],
             required_keys: Optional[list[str]] = None,
+            contract: Optional[ContractValidator] = None,
             model: Optional[str] = None,
     ) -> dict[str, Any]:
         """
         Enforces JSON-only output via DeepSeek JSON Output mode:
           - response_format={"type": "json_object"}
           - prompt includes the word 'json' and provides an example
-        Returns parsed dict. Raises ValueError if invalid.
+
+        The reply is repaired locally (fences, trailing commas, truncation) and, with
+        a `contract`, validated and coerced against it. If problems remain, one
+        targeted "fix this JSON" call is made instead of failing the agent.
+        Returns parsed dict. Raises ValueError if still invalid.
         """
-        required_keys = required_keys or []
+        required_keys = list(contract.required_keys if contract else required_keys or [])
 
         system_with_example = (
             f"{system}\n\n"
@@ -82,30 +196,78 @@ class DeepSeekClient:
             "Remember: output must be JSON."
         )
 
-        client = self._get_client()
-        resp = client.chat.completions.create(
-            model=model or self.cfg.model,
+        content = self._complete(
+            model=model,
             messages=[
                 ChatCompletionSystemMessageParam(content=system_with_example, role="system"),
                 ChatCompletionUserMessageParam(content=user_with_json_hint, role="user"),
             ],
             response_format=ResponseFormatJSONObject(type="json_object"),
         )
+        obj, errors = self._check_json(content, required_keys, contract)
+
+        for _ in range(self.JSON_FIX_ATTEMPTS):
+            if not errors:
+                break
+            logger.info("Asking the model to fix its JSON: %s", errors)
+            metrics.LLM_RETRIES.inc(kind="fix_call")
+            content = self._complete(
+                model=model,
+                messages=[
+                    ChatCompletionSystemMessageParam(content=self._FIX_JSON_SYSTEM, role="system"),
+                    ChatCompletionUserMessageParam(
+                        content=self._fix_json_prompt(content, errors, example_json), role="user"),
+                ],
+                response_format=ResponseFormatJSONObject(type="json_object"),
+            )
+            obj, errors = self._check_json(content, required_keys, contract)
 
-        content = (resp.choices[0].message.content or "").strip()
+        if errors:
+            raise ValueError(f"Model JSON output is invalid: {'; '.join(errors)}. Raw content: {content[:4000]}")
+        return obj
+
+    @staticmethod
+    def _fix_json_prompt(content: str, errors: list[str], example_json: dict[str, Any]) -> str:
+        problems = "\n".join(f"- {e}" for e in errors)
+        return (
+            f"Problems:\n{problems}\n\n"
+            "Required format example:\n"
+            f"{orjson.dumps(example_json, option=orjson.OPT_INDENT_2).decode()}\n\n"
+            f"JSON to fix:\n{content[:8000]}"
+        )
+
+    @staticmethod
+    def _check_json(
+            content: str,
+            required_keys: list[str],
+            contract: Optional[ContractValidator],
+    ) -> tuple[Optional[dict[str, Any]], list[str]]:
+        """Parse, repair and validate one reply. Returns (object, remaining problems)."""
         if not content:
-            raise ValueError("Empty JSON content returned by model.")
+            return None, ["the reply was empty"]
 
         try:
-            obj = orjson.loads(content)
-        except orjson.JSONDecodeError as e:
-            raise ValueError(f"Model did not return valid JSON. Raw content: {content[:4000]}") from e
+            obj, repaired = parse_json_object(content)
+        except ValueError as e:
+            return None, [str(e).split(" Raw content:")[0].rstrip(".")]
+        if repaired:
+            logger.info("Repaired malformed JSON reply locally")
+            metrics.LLM_RETRIES.inc(kind="local_repair")
 
-        if not isinstance(obj, dict):
-            raise ValueError(f"Model JSON output is not an object. Got type={type(obj)}")
+        if contract is not None:
+            result = contract.validate(obj)
+            if result.coerced:
+                logger.info("Coerced %s output: %s", contract.contract.name, result.coerced)
+            return result.value, result.errors
 
         missing = [k for k in required_keys if k not in obj]
         if missing:
-            raise ValueError(f"Model JSON output missing required keys: {missing}. Got keys={list(obj.keys())}")
+            return obj, [f"missing required keys {missing}; got keys {list(obj.keys())}"]
+        return obj, []
 
-        return obj
+
+def _record_usage(model: str, usage: Any) -> None:
+    if usage is None:
+        return
+    metrics.LLM_TOKENS.inc(usage.prompt_tokens or 0, model=model, kind="prompt")
+    metrics.LLM_TOKENS.inc(usage.completion_tokens or 0, model=model, kind="completion")
@@ -0,0 +1,185 @@
+# coding: utf-8
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
+
+# Output contracts from docs/agent-contracts.md, compiled once at import into
+# per-field check functions. Validation coerces what can be coerced without
+# guessing (a bare string for a list, numbers for strings, enum spelling) and
+# reports the rest, so the client can ask the model to fix just those problems.
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    - type: "str" or "list[str]"
+    - choices: allowed values for a "str" field (compared after normalizing case,
+      spaces and dashes to the canonical spelling)
+    - required: a missing required field is an error; a missing optional
+      "list[str]" field becomes [].
+    """
+    type: str
+    required: bool = True
+    choices: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Contract:
+    name: str
+    fields: Mapping[str, FieldSpec]
+    # Extra keys are dropped (contracts forbid them) unless listed here.
+    allow_extra: bool = False
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    value: dict[str, Any]
+    errors: list[str] = field(default_factory=list)
+    coerced: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+_Check = Callable[[Any, list[str], list[str]], Any]
+_MISSING = object()
+
+
+def _normalize_choice(value: str) -> str:
+    return value.strip().lower().replace("-", "_").replace(" ", "_")
+
+
+def _compile_str(key: str, spec: FieldSpec) -> _Check:
+    choices = {_normalize_choice(c): c for c in spec.choices}
+
+    def check(value: Any, errors: list[str], coerced: list[str]) -> Any:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            coerced.append(f"{key}: number -> string")
+            value = str(value)
+        if not isinstance(value, str):
+            errors.append(f"'{key}' must be a string, got {type(value).__name__}")
+            return value
+        if choices:
+            canonical = choices.get(_normalize_choice(value))
+            if canonical is None:
+                errors.append(f"'{key}' must be one of {list(spec.choices)}, got {value!r}")
+                return value
+            if canonical != value:
+                coerced.append(f"{key}: {value!r} -> {canonical!r}")
+            value = canonical
+        return value
+
+    return check
+
+
+def _compile_str_list(key: str, spec: FieldSpec) -> _Check:
+    def item(value: Any) -> Optional[str]:
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        # {"text": "..."} and similar single-string wrappers
+        if isinstance(value, dict) and len(value) == 1:
+            inner = next(iter(value.values()))
+            if isinstance(inner, str):
+                return inner.strip()
+        return None
+
+    def check(value: Any, errors: list[str], coerced: list[str]) -> Any:
+        if value is None:
+            coerced.append(f"{key}: null -> []")
+            return []
+        if isinstance(value, str):
+            coerced.append(f"{key}: string -> list")
+            value = [value]
+        if not isinstance(value, list):
+            errors.append(f"'{key}' must be a list of strings, got {type(value).__name__}")
+            return value
+
+        out = []
+        for i, raw in enumerate(value):
+            text = item(raw)
+            if text is None:
+                errors.append(f"'{key}[{i}]' must be a string, got {type(raw).__name__}")
+                continue
+            if text != raw:
+                coerced.append(f"{key}[{i}]: {type(raw).__name__} -> string")
+            if text:
+                out.append(text)
+        return out
+
+    return check
+
+
+_COMPILERS = {"str": _compile_str, "list[str]": _compile_str_list}
+
+
+class ContractValidator:
+    """A contract compiled into one check function per field."""
+
+    def __init__(self, contract: Contract):
+        self.contract = contract
+        self.required_keys = [k for k, f in contract.fields.items() if f.required]
+        self._checks: list[tuple[str, FieldSpec, _Check]] = []
+        for key, spec in contract.fields.items():
+            compiler = _COMPILERS.get(spec.type)
+            if compiler is None:
+                raise ValueError(f"Contract {contract.name}: unsupported type {spec.type!r} for '{key}'")
+            self._checks.append((key, spec, compiler(key, spec)))
+
+    def validate(self, obj: dict[str, Any]) -> ValidationResult:
+        errors: list[str] = []
+        coerced: list[str] = []
+        out: dict[str, Any] = {}
+
+        for key, spec, check in self._checks:
+            value = obj.get(key, _MISSING)
+            if value is _MISSING:
+                if spec.required:
+                    errors.append(f"missing required key '{key}'")
+                elif spec.type == "list[str]":
+                    out[key] = []
+                continue
+            out[key] = check(value, errors, coerced)
+
+        extra = [k for k in obj if k not in self.contract.fields]
+        if extra:
+            if self.contract.allow_extra:
+                out.update((k, obj[k]) for k in extra)
+            else:
+                coerced.append(f"dropped extra keys {extra}")
+
+        return ValidationResult(value=out, errors=errors, coerced=coerced)
+
+
+LIST_ITEMS = Contract("list_items", {"items": FieldSpec("list[str]")})
+
+PLANNER = Contract(
+    "planner",
+    {
+        "required_agents": FieldSpec("list[str]"),
+        "rationale": FieldSpec("str"),
+        "constraints": FieldSpec("list[str]", required=False),
+    },
+)
+
+SYNTH = Contract(
+    "synth",
+    {
+        "recommendation": FieldSpec("str", choices=("go", "no_go", "conditional_go", "gather_more_info")),
+        "confidence": FieldSpec("str", choices=("low", "medium", "high")),
+        "rationale": FieldSpec("str"),
+        "key_tradeoffs": FieldSpec("list[str]"),
+        "next_steps": FieldSpec("list[str]"),
+        "open_questions": FieldSpec("list[str]"),
+    },
+)
+
+AGENT_CONTRACTS: dict[str, ContractValidator] = {
+    "planner": ContractValidator(PLANNER),
+    "facts": ContractValidator(LIST_ITEMS),
+    "pro": ContractValidator(LIST_ITEMS),
+    "con": ContractValidator(LIST_ITEMS),
+    "risk": ContractValidator(LIST_ITEMS),
+    "synth": ContractValidator(SYNTH),
+}
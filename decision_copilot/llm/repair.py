@@ -0,0 +1,105 @@
+# coding: utf-8
+import re
+from typing import Any
+
+import orjson
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z0-9_-]*\s*\n?|\n?```\s*$")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def parse_json_object(content: str) -> tuple[dict[str, Any], bool]:
+    """
+    Parse a model reply into a JSON object, repairing it locally if needed.
+
+    Returns `(obj, repaired)`. Raises ValueError if the text cannot be turned into
+    a JSON object without guessing at content.
+    """
+    try:
+        obj = orjson.loads(content)
+        repaired = False
+    except orjson.JSONDecodeError:
+        fixed = repair_json(content)
+        try:
+            obj = orjson.loads(fixed)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Model did not return valid JSON. Raw content: {content[:4000]}") from e
+        repaired = True
+
+    if not isinstance(obj, dict):
+        raise ValueError(f"Model JSON output is not an object. Got type={type(obj)}")
+    return obj, repaired
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort syntactic repair of an LLM JSON reply:
+
+    - strip markdown code fences and any prose around the outermost object
+    - drop trailing commas before `}` / `]`
+    - close a reply truncated mid-way (open string, dangling key or comma,
+      unclosed arrays and objects)
+
+    Only syntax is touched; values are never invented.
+    """
+    text = _FENCE_RE.sub("", text.strip())
+    start = text.find("{")
+    if start < 0:
+        return text
+    text = text[start:]
+
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = escaped = False
+    pending_comma = ""  # a comma (plus whitespace) held until we know it is not trailing
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if pending_comma:
+            if ch.isspace():
+                pending_comma += ch
+                continue
+            if ch not in "}]":
+                out.append(pending_comma)
+            pending_comma = ""
+
+        if ch == ",":
+            pending_comma = ch
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                break  # end of the outermost object; drop trailing prose
+            continue
+        out.append(ch)
+
+    if in_string:
+        out.append('"')
+    return _close("".join(out).rstrip(), stack)
+
+
+def _close(text: str, stack: list[str]) -> str:
+    if not stack:
+        return text
+
+    # A dangling `"key":` or `"key"` (cut before its value) is dropped with its comma.
+    if stack[-1] == "{":
+        text = re.sub(r'(?:,\s*|(?<=\{)\s*)"(?:[^"\\]|\\.)*"\s*:?\s*$', "", text)
+    text = text.rstrip().rstrip(",").rstrip()
+    return text + "".join(_CLOSERS[c] for c in reversed(stack))
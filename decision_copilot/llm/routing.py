@@ -0,0 +1,121 @@
+# coding: utf-8
+import os
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import orjson
+
+# No SDK imports here: the agent registry (read by the CLI) holds GenerationConfigs.
+
+AGENT_CONFIG_ENV = "DECISION_COPILOT_AGENT_CONFIG"
+
+
+@dataclass(frozen=True)
+class GenerationConfig:
+    """
+    Per-call generation settings. `None` means "not set here": the next layer down
+    (or the API default) applies.
+    """
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    timeout_s: Optional[float] = None
+
+    def merged(self, override: "GenerationConfig") -> "GenerationConfig":
+        """Return a copy with every field set in `override` taking precedence."""
+        changes = {f.name: getattr(override, f.name) for f in fields(override) if getattr(override, f.name) is not None}
+        return replace(self, **changes)
+
+    def request_kwargs(self) -> dict[str, Any]:
+        """Chat completion arguments (model excluded) for the fields that are set."""
+        out: dict[str, Any] = {}
+        if self.max_tokens is not None:
+            out["max_tokens"] = self.max_tokens
+        if self.temperature is not None:
+            out["temperature"] = self.temperature
+        if self.timeout_s is not None:
+            out["timeout"] = self.timeout_s
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], where: str) -> "GenerationConfig":
+        if not isinstance(data, Mapping):
+            raise ValueError(f"{where}: expected an object, got {type(data).__name__}")
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - known)
+        if unknown:
+            raise ValueError(f"{where}: unknown generation settings {unknown} (allowed: {sorted(known)})")
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class ModelRouting:
+    """
+    Generation overrides loaded from the JSON file named by DECISION_COPILOT_AGENT_CONFIG:
+
+        {
+          "default": {"max_tokens": 2048},
+          "agents": {"planner": {"model": "deepseek-chat", "max_tokens": 512}},
+          "modes": {"fast": {"default": {"temperature": 0}, "agents": {"synth": {"max_tokens": 1024}}}}
+        }
+
+    Precedence, lowest first: the agent's registry default, "default", "agents",
+    then for the run's mode its "default" and "agents".
+    """
+    default: GenerationConfig = GenerationConfig()
+    agents: Mapping[str, GenerationConfig] = field(default_factory=dict)
+    modes: Mapping[str, "ModelRouting"] = field(default_factory=dict)
+
+    def resolve(self, agent_name: str, mode: Optional[str], base: GenerationConfig) -> GenerationConfig:
+        cfg = base.merged(self.default)
+        if agent_name in self.agents:
+            cfg = cfg.merged(self.agents[agent_name])
+        if mode in self.modes:
+            cfg = self.modes[mode].resolve(agent_name, None, cfg)
+        return cfg
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], where: str = "agent config", *, nested: bool = False) -> "ModelRouting":
+        allowed = {"default", "agents"} if nested else {"default", "agents", "modes"}
+        unknown = sorted(set(data) - allowed)
+        if unknown:
+            raise ValueError(f"{where}: unknown sections {unknown} (allowed: {sorted(allowed)})")
+
+        agents = {
+            name: GenerationConfig.from_dict(cfg, f"{where}: agents.{name}")
+            for name, cfg in (data.get("agents") or {}).items()
+        }
+        modes = {
+            mode: cls.from_dict(cfg, f"{where}: modes.{mode}", nested=True)
+            for mode, cfg in (data.get("modes") or {}).items()
+        }
+        return cls(
+            default=GenerationConfig.from_dict(data.get("default") or {}, f"{where}: default"),
+            agents=agents,
+            modes=modes,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "ModelRouting":
+        data = orjson.loads(path.read_bytes())
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected a JSON object")
+        return cls.from_dict(data, str(path))
+
+
+@lru_cache(maxsize=1)
+def routing_from_env() -> ModelRouting:
+    path = os.environ.get(AGENT_CONFIG_ENV)
+    return ModelRouting.load(Path(path)) if path else ModelRouting()
+
+
+def resolve_generation(agent_name: str, mode: Optional[str] = None) -> GenerationConfig:
+    """Effective generation settings for one agent in a run of the given mode."""
+    # lazy import: the registry itself imports GenerationConfig from this module
+    from decision_copilot.agents.registry import AGENT_SPECS, AUXILIARY_SPECS
+
+    spec = AGENT_SPECS.get(agent_name) or AUXILIARY_SPECS.get(agent_name)
+    base = spec.generation if spec is not None else GenerationConfig()
+    return routing_from_env().resolve(agent_name, mode, base)
@@ -0,0 +1,199 @@
+# coding: utf-8
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """
+    Process-wide HTTP settings for LLM calls.
+
+    - max_connections / max_keepalive: pool size; one connection per concurrently
+      running agent is enough for a SimpleWorker, more for the API daemon.
+    - keepalive_expiry_s: idle connections are kept this long, so back-to-back
+      agent jobs skip DNS, TCP and TLS setup.
+    - http2: multiplex calls over one connection (needs `pip install 'httpx[http2]'`).
+    """
+    max_connections: int = int(os.environ.get("DECISION_COPILOT_HTTP_MAX_CONNECTIONS", "20"))
+    max_keepalive: int = int(os.environ.get("DECISION_COPILOT_HTTP_MAX_KEEPALIVE", "10"))
+    keepalive_expiry_s: float = float(os.environ.get("DECISION_COPILOT_HTTP_KEEPALIVE_S", "120"))
+    http2: bool = _env_bool("DECISION_COPILOT_HTTP2", False)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry_s,
+        )
+
+    def check(self) -> None:
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError as e:
+                raise RuntimeError(
+                    "DECISION_COPILOT_HTTP2 is enabled but the h2 package is missing "
+                    "(pip install 'httpx[http2]')."
+                ) from e
+
+
+@dataclass
+class CallTiming:
+    """Connection setup observed during one LLM call (all requests it made)."""
+    requests: int = 0
+    new_connections: int = 0
+    handshake_ms: float = 0.0  # TCP connect + TLS, only for new connections
+
+    @property
+    def reused(self) -> bool:
+        return self.requests > 0 and self.new_connections == 0
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0
+    new_connections: int = 0
+    handshake_ms_total: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, timing: CallTiming) -> None:
+        with self._lock:
+            self.requests += timing.requests
+            self.new_connections += timing.new_connections
+            self.handshake_ms_total += timing.handshake_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            mean = self.handshake_ms_total / self.new_connections if self.new_connections else 0.0
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_requests": reused,
+                "mean_handshake_ms": round(mean, 1),
+                # Every reused request skipped one handshake of about the mean cost.
+                "estimated_saved_ms": round(reused * mean, 1),
+            }
+
+
+STATS = TransportStats()
+
+_current: contextvars.ContextVar[Optional[CallTiming]] = contextvars.ContextVar("llm_call_timing", default=None)
+
+_HANDSHAKE_STEPS = ("connection.connect_tcp", "connection.start_tls")
+
+
+class _Trace:
+    """httpcore trace callback: times the connect and TLS steps of one request."""
+
+    def __init__(self):
+        self.started: dict[str, float] = {}
+        self.handshake_ms = 0.0
+        self.connected = False
+
+    def __call__(self, name: str, info: dict) -> None:
+        step, _, phase = name.rpartition(".")
+        if step not in _HANDSHAKE_STEPS:
+            return
+        if phase == "started":
+            self.started[step] = time.perf_counter()
+        elif phase == "complete" and step in self.started:
+            self.connected = True
+            self.handshake_ms += (time.perf_counter() - self.started.pop(step)) * 1000
+
+    def finish(self) -> None:
+        timing = _current.get()
+        if timing is None:
+            return
+        timing.requests += 1
+        if self.connected:
+            timing.new_connections += 1
+            timing.handshake_ms += self.handshake_ms
+
+
+class MeasuredTransport(httpx.HTTPTransport):
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _Trace()
+        request.extensions["trace"] = trace
+        try:
+            return super().handle_request(request)
+        finally:
+            trace.finish()
+
+
+@contextmanager
+def measure_call() -> Iterator[CallTiming]:
+    """Collect connection setup timings for the requests made inside the block."""
+    timing = CallTiming()
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+        STATS.record(timing)
+
+
+_lock = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+
+
+def get_http_client(cfg: Optional[TransportConfig] = None) -> httpx.Client:
+    """The process-wide pooled client shared by every sync LLM client."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None:
+            cfg = cfg or TransportConfig()
+            cfg.check()
+            _sync_client = httpx.Client(
+                transport=MeasuredTransport(limits=cfg.limits(), http2=cfg.http2),
+            )
+        return _sync_client
+
+
+def prewarm(base_url: str, connections: int = 1) -> CallTiming:
+    """
+    Open pooled connections to the provider before the first job arrives. The
+    response status does not matter (an unauthenticated 401 still leaves a warm
+    connection); network errors are logged, never raised.
+    """
+    client = get_http_client()
+    with measure_call() as timing:
+        # Each thread runs in a copy of this context, so its requests count towards `timing`.
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(_touch, client, base_url),
+                name=f"prewarm-{i}",
+                daemon=True,
+            )
+            for i in range(max(connections, 1))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    return timing
+
+
+def _touch(client: httpx.Client, base_url: str) -> None:
+    try:
+        client.head(base_url, timeout=10.0)
+    except httpx.HTTPError as e:
+        logger.warning("Could not prewarm connection to %s: %s", base_url, e)
@@ -0,0 +1,488 @@
+# coding: utf-8
+import fcntl
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+import orjson
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Prometheus-style metrics with no extra dependency.
+#
+# Each process keeps its own registry. A worker serves it on
+# DECISION_COPILOT_METRICS_PORT and, with DECISION_COPILOT_METRICS_DIR set, also
+# writes a snapshot file there every few seconds; `decision-copilot metrics`
+# merges all snapshot files (counters and histograms are summed, gauges of live
+# processes are summed) and adds cluster-wide gauges (queue depth, runs in flight).
+# Snapshots of dead processes are compacted into one file, so the directory does
+# not grow with worker restarts.
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; agent calls take seconds to minutes, commits milliseconds.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+SNAPSHOT_INTERVAL_S = 5.0
+# Gauges from snapshot files not refreshed for this long belong to dead processes.
+STALE_AFTER_S = 6 * SNAPSHOT_INTERVAL_S
+# Counters and histograms of dead processes accumulate here.
+DEAD_SNAPSHOT = "_dead.json"
+_LOCK_FILE = ".lock"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help_: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {list(self.labelnames)}, got {sorted(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = [[list(k), self._copy(v)] for k, v in self._values.items()]
+        return {"type": self.type, "help": self.help, "labels": list(self.labelnames), "samples": samples}
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: Any) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help_: str, labelnames: tuple[str, ...] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        out = super().snapshot()
+        out["buckets"] = list(self.buckets)
+        return out
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        # Snapshot-file bookkeeping (see write_snapshot).
+        self._written: Optional[dict[str, Any]] = None
+        self._folded: dict[str, Any] = {}
+
+    def _add(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help_, labelnames))
+
+    def gauge(self, name: str, help_: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, help_, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            help_: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help_, labelnames, buckets))
+
+    def snapshot(self) -> dict[str, Any]:
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+
+REGISTRY = Registry()
+
+AGENT_LATENCY = REGISTRY.histogram(
+    "dc_agent_duration_seconds", "Agent execution time, by agent and final status.", ("agent", "status"))
+AGENT_RUNS = REGISTRY.counter(
+    "dc_agent_runs_total", "Agent executions finished, by agent and final status.", ("agent", "status"))
+AGENTS_IN_FLIGHT = REGISTRY.gauge(
+    "dc_agents_in_flight", "Agents currently executing in this process.", ("agent",))
+LLM_LATENCY = REGISTRY.histogram(
+    "dc_llm_request_seconds", "LLM call time until the full reply, by model.", ("model",))
+LLM_TTFT = REGISTRY.histogram(
+    "dc_llm_ttft_seconds", "Time to the first streamed token, by model.", ("model",))
+LLM_TOKENS = REGISTRY.counter(
+    "dc_llm_tokens_total", "Tokens reported by the provider, by model and kind (prompt/completion).",
+    ("model", "kind"))
+LLM_ERRORS = REGISTRY.counter(
+    "dc_llm_errors_total", "LLM calls that raised (cancellations excluded), by model.", ("model",))
+LLM_CONNECTIONS = REGISTRY.counter(
+    "dc_llm_connections_total", "LLM calls by whether they reused a pooled connection.", ("reused",))
+LLM_RETRIES = REGISTRY.counter(
+    "dc_llm_json_retries_total", "JSON replies repaired locally or by a fix-JSON call.", ("kind",))
+CACHE_HITS = REGISTRY.counter(
+    "dc_cache_hits_total", "Work avoided by reuse, by cache (resume, ...).", ("cache",))
+RUNS_COALESCED = REGISTRY.counter(
+    "dc_runs_coalesced_total", "Run starts answered with an in-flight run (single-flight), by mode.", ("mode",))
+SYNTH_SKIPPED = REGISTRY.counter(
+    "dc_synth_skipped_total", "Report-agent inputs the synth policy started without, by agent.", ("agent",))
+DIGEST_TOKENS_SAVED = REGISTRY.counter(
+    "dc_context_digest_saved_tokens_total",
+    "Prompt tokens saved by agents reading the context digest instead of the raw context, by agent.",
+    ("agent",))
+DUPLICATE_JOBS_SKIPPED = REGISTRY.counter(
+    "dc_duplicate_jobs_skipped_total",
+    "Agent jobs that did not execute because the agent was leased or claimed elsewhere, by agent and reason.",
+    ("agent", "reason"))
+AGENTS_REAPED = REGISTRY.counter(
+    "dc_agents_reaped_total", "RUNNING agents requeued after their worker's lease expired, by agent.", ("agent",))
+DB_COMMIT = REGISTRY.histogram(
+    "dc_db_commit_seconds", "SQLite commit time, by writer.", ("writer",), buckets=FAST_BUCKETS)
+
+
+# ----- exposition -----
+
+def render(snapshot: dict[str, Any], extra: Optional[dict[str, Any]] = None) -> str:
+    """Prometheus text format for a (possibly merged) snapshot."""
+    lines = []
+    for name, m in sorted({**snapshot, **(extra or {})}.items()):
+        lines.append(f"# HELP {name} {m['help']}")
+        lines.append(f"# TYPE {name} {m['type']}")
+        for label_values, value in sorted(m["samples"], key=lambda s: s[0]):
+            labels = list(zip(m["labels"], label_values))
+            if m["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_num(value)}")
+                continue
+            # observe() counts a value in every bucket it fits, so counts are already cumulative.
+            for bound, count in zip(m["buckets"], value["buckets"]):
+                lines.append(f"{name}_bucket{_labels(labels + [('le', _num(bound))])} {count}")
+            lines.append(f"{name}_bucket{_labels(labels + [('le', '+Inf')])} {value['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_num(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# ----- multiprocess -----
+
+def process_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@contextmanager
+def _locked(directory: Path) -> Iterator[None]:
+    """Exclusive lock on a snapshot directory, held by writers and by compaction."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / _LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(orjson.dumps(data))
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        logger.warning("Skipping unreadable metrics snapshot %s", path)
+        return None
+
+
+def write_snapshot(directory: Path, registry: Registry = REGISTRY) -> Path:
+    """
+    Atomically write this process's snapshot to `<directory>/<host>-<pid>.json`.
+    If compaction folded the previous one into DEAD_SNAPSHOT meanwhile (the
+    process stalled past STALE_AFTER_S), only what it counted since is written.
+    """
+    path = directory / f"{process_id()}.json"
+    with _locked(directory):
+        current = registry.snapshot()
+        if registry._written is not None and not path.exists():
+            registry._folded = registry._written
+        _write_json(path, {"written_at": time.time(), "metrics": _subtract(current, registry._folded)})
+        registry._written = current
+    return path
+
+
+def compact_snapshots(directory: Path, now: Optional[float] = None) -> int:
+    """
+    Fold the counters and histograms of snapshots not refreshed for STALE_AFTER_S
+    into DEAD_SNAPSHOT and delete them. Returns the number of files compacted.
+    """
+    now = time.time() if now is None else now
+    with _locked(directory):
+        stale = []
+        for path in directory.glob("*.json"):
+            if path.name == DEAD_SNAPSHOT:
+                continue
+            data = _read_json(path)
+            if data is not None and now - data.get("written_at", 0) > STALE_AFTER_S:
+                stale.append((path, data))
+        if not stale:
+            return 0
+
+        _fold_dead(directory, [data["metrics"] for _, data in stale], now)
+        for path, _ in stale:
+            path.unlink(missing_ok=True)
+    return len(stale)
+
+
+def fold_snapshot(directory: Path, registry: Registry = REGISTRY) -> None:
+    """
+    Add this process's counters and histograms straight to DEAD_SNAPSHOT, for a
+    process about to exit: it leaves no snapshot file of its own.
+    """
+    with _locked(directory):
+        current = registry.snapshot()
+        _fold_dead(directory, [_subtract(current, registry._folded)], time.time())
+        registry._folded = current
+
+
+def _fold_dead(directory: Path, snapshots: list[dict[str, Any]], now: float) -> None:
+    # Callers hold the directory lock.
+    path = directory / DEAD_SNAPSHOT
+    dead = (_read_json(path) if path.exists() else None) or {"metrics": {}}
+    for metrics in snapshots:
+        _merge_into(dead["metrics"], metrics, gauges=False)
+    _write_json(path, {"written_at": now, "metrics": dead["metrics"]})
+
+
+def merge_snapshots(directory: Path, now: Optional[float] = None) -> dict[str, Any]:
+    """
+    Merge every process snapshot in `directory`, DEAD_SNAPSHOT included. Counters
+    and histograms of all processes are summed; gauges only from live processes.
+    """
+    now = time.time() if now is None else now
+    merged: dict[str, Any] = {}
+    for path in sorted(directory.glob("*.json")):
+        data = _read_json(path)
+        if data is None:
+            continue
+        _merge_into(merged, data["metrics"], gauges=now - data.get("written_at", 0) <= STALE_AFTER_S)
+    return merged
+
+
+def _merge_into(merged: dict[str, Any], metrics: dict[str, Any], gauges: bool) -> None:
+    for name, m in metrics.items():
+        if m["type"] == "gauge" and not gauges:
+            continue
+        target = merged.setdefault(name, {**m, "samples": []})
+        _merge_samples(target, m)
+
+
+def _subtract(snapshot: dict[str, Any], base: dict[str, Any]) -> dict[str, Any]:
+    """Counters and histograms of `snapshot` minus those of an earlier `base`; gauges as they are."""
+    out = {}
+    for name, m in snapshot.items():
+        before = {tuple(k): v for k, v in base.get(name, {}).get("samples", [])}
+        if m["type"] == "gauge" or not before:
+            out[name] = m
+            continue
+        samples = []
+        for labels, value in m["samples"]:
+            prev = before.get(tuple(labels))
+            if prev is None:
+                samples.append([labels, value])
+            elif m["type"] == "histogram":
+                samples.append([labels, {
+                    "buckets": [a - b for a, b in zip(value["buckets"], prev["buckets"])],
+                    "sum": value["sum"] - prev["sum"],
+                    "count": value["count"] - prev["count"],
+                }])
+            else:
+                samples.append([labels, value - prev])
+        out[name] = {**m, "samples": samples}
+    return out
+
+
+def _merge_samples(target: dict[str, Any], source: dict[str, Any]) -> None:
+    index = {tuple(k): i for i, (k, _) in enumerate(target["samples"])}
+    for labels, value in source["samples"]:
+        i = index.get(tuple(labels))
+        if i is None:
+            index[tuple(labels)] = len(target["samples"])
+            target["samples"].append([labels, Histogram._copy(value) if target["type"] == "histogram" else value])
+            continue
+        current = target["samples"][i][1]
+        if target["type"] == "histogram":
+            current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+            current["sum"] += value["sum"]
+            current["count"] += value["count"]
+        else:
+            target["samples"][i][1] = current + value
+
+
+def gauge_family(name: str, help_: str, labelnames: tuple[str, ...], values: dict[tuple[str, ...], float]) -> dict[str, Any]:
+    """A one-off gauge in snapshot form, for values computed at scrape time."""
+    return {"type": "gauge", "help": help_, "labels": list(labelnames),
+            "samples": [[list(k), v] for k, v in values.items()]}
+
+
+# ----- HTTP endpoint -----
+
+def start_http_server(port: int, collect: Callable[[], str], host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve `collect()` on http://host:port/metrics from a daemon thread."""
+    # lazy import: the CLI imports this module through the services
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            try:
+                body = collect().encode()
+            except Exception:
+                logger.exception("Metrics collection failed")
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def flush_snapshot() -> None:
+    """
+    Fold this process's metrics into DECISION_COPILOT_METRICS_DIR (if set), for
+    short-lived processes such as CLI commands that never start the exporter loop.
+    All of them share DEAD_SNAPSHOT, so CLI calls do not pile up files.
+    """
+    directory = os.environ.get("DECISION_COPILOT_METRICS_DIR")
+    if not directory:
+        return
+    try:
+        fold_snapshot(Path(directory))
+    except OSError:
+        logger.warning("Could not write metrics snapshot to %s", directory, exc_info=True)
+
+
+def start_exporter() -> None:
+    """
+    Start this process's exporters from env: the HTTP endpoint on
+    DECISION_COPILOT_METRICS_PORT and the snapshot writer for DECISION_COPILOT_METRICS_DIR.
+    Both are optional; with neither set this is a no-op.
+    """
+    port = int(os.environ.get("DECISION_COPILOT_METRICS_PORT", "0") or 0)
+    if port:
+        try:
+            start_http_server(port, lambda: render(REGISTRY.snapshot()))
+        except OSError as e:
+            # e.g. a second worker on a shared env file; its snapshots still count.
+            logger.warning("Metrics port %d unavailable (%s); not serving this process's metrics", port, e)
+        else:
+            logger.info("Serving metrics on http://127.0.0.1:%d/metrics", port)
+
+    directory = os.environ.get("DECISION_COPILOT_METRICS_DIR")
+    if directory:
+        def loop() -> None:
+            next_compact = 0.0
+            while True:
+                try:
+                    write_snapshot(Path(directory))
+                    if time.monotonic() >= next_compact:
+                        compact_snapshots(Path(directory))
+                        next_compact = time.monotonic() + STALE_AFTER_S
+                except OSError:
+                    logger.warning("Could not write metrics snapshot to %s", directory, exc_info=True)
+                time.sleep(SNAPSHOT_INTERVAL_S)
+
+        threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
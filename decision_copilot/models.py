@@ -1,31 +1,92 @@
 # coding: utf-8
 import enum
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Optional
 
 from sqlalchemy import (
+    Boolean,
     DateTime,
     Enum as SAEnum,
+    Float,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    event,
     func,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship
 from sqlalchemy.types import JSON
 
+from decision_copilot.blob_store import EncodedBlob, decode_json, encode_json
+
+
+def utcnow() -> datetime:
+    # Naive UTC, matching SQLite CURRENT_TIMESTAMP values.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class Base(DeclarativeBase):
     """SQLAlchemy declarative base."""
 
 
+class BlobJSON:
+    """
+    JSON value stored out-of-row in `blobs`, addressed by content hash.
+
+    Reading loads the blob lazily through `blob_attr` (a relationship) and caches the
+    decoded value per hash. Writing only sets the hash column; the blob row itself is
+    inserted (deduplicated) by the before_flush hook below.
+    """
+
+    def __init__(self, hash_attr: str, blob_attr: str):
+        self.hash_attr = hash_attr
+        self.blob_attr = blob_attr
+        self.cache_key = ""
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.cache_key = f"_{name}_cache"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        h = getattr(obj, self.hash_attr)
+        if h is None:
+            return None
+
+        cached = obj.__dict__.get(self.cache_key)
+        if cached is not None and cached[0] == h:
+            return cached[1]
+
+        blob = getattr(obj, self.blob_attr)
+        value = decode_json(blob.codec, blob.data) if blob is not None else None
+        obj.__dict__[self.cache_key] = (h, value)
+        return value
+
+    def __set__(self, obj, value) -> None:
+        if value is None:
+            setattr(obj, self.hash_attr, None)
+            obj.__dict__.pop(self.cache_key, None)
+            return
+
+        blob = encode_json(value)
+        setattr(obj, self.hash_attr, blob.hash)
+        obj.__dict__[self.cache_key] = (blob.hash, value)
+        obj.__dict__.setdefault("_pending_blobs", {})[blob.hash] = blob
+
+
 class DecisionStatus(str, enum.Enum):
+    INGESTING = "ingesting"  # context file still being chunked and reduced (orchestrator/ingest.py)
     NEW = "new"
     RUNNING = "running"
     DONE = "done"
     FAILED = "failed"
+    CANCELED = "canceled"
 
 
 class RunStatus(str, enum.Enum):
@@ -42,6 +103,7 @@ class AgentStatus(str, enum.Enum):
     DONE = "done"
     FAILED = "failed"
     SKIPPED = "skipped"
+    CANCELED = "canceled"
 
 
 class Decision(Base):
@@ -60,9 +122,27 @@ class Decision(Base):
         index=True,
     )
 
-    final_report: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    final_report_hash: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("blobs.hash"),
+        nullable=True,
+        index=True,
+    )
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # Rendered report of the latest run ({"markdown", "record"}), stored when the run
+    # completes and cleared when a new one starts. Its blob hash is the report's ETag
+    # (see services/artifacts.py).
+    report_artifact_hash: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("blobs.hash"),
+        nullable=True,
+        index=True,
+    )
+
+    # Denormalized status of the latest run, maintained by the orchestrator and worker
+    # in the same transaction as each state change (see orchestrator/summary.py).
+    latest_run_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    run_summary: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -87,6 +167,14 @@ class Decision(Base):
         passive_deletes=True,
     )
 
+    final_report_blob: Mapped[Optional["Blob"]] = relationship(
+        lazy="select", viewonly=True, foreign_keys=[final_report_hash])
+    final_report = BlobJSON("final_report_hash", "final_report_blob")
+
+    report_artifact_blob: Mapped[Optional["Blob"]] = relationship(
+        lazy="select", viewonly=True, foreign_keys=[report_artifact_hash])
+    report_artifact = BlobJSON("report_artifact_hash", "report_artifact_blob")
+
 
 class DecisionRun(Base):
     __tablename__ = "decision_runs"
@@ -117,6 +205,26 @@ class DecisionRun(Base):
     # Optional but useful: store the orchestrator plan or at least required agents.
     required_agents: Mapped[Optional[list[str]]] = mapped_column(JSON, nullable=True)
 
+    # Started under the single-flight policy: at most one such run per decision and
+    # mode may be QUEUED or RUNNING (ix_decision_runs_single_flight).
+    single_flight: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default="0",
+    )
+
+    # Synth policy (orchestrator/synth_policy.py): the report agent may start once
+    # `synth_quorum` of its inputs are DONE and/or `synth_deadline_s` after fan-out.
+    # The inputs it started without are recorded in `skipped_agents`.
+    synth_quorum: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    synth_deadline_s: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    skipped_agents: Mapped[Optional[list[str]]] = mapped_column(JSON, nullable=True)
+
+    # Set when the run's agents read a digest of the decision context instead of the
+    # raw text: the `context_digests` key (see orchestrator/context_digest.py).
+    context_digest_key: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
@@ -170,9 +278,25 @@ class AgentRun(Base):
     model: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     latency_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
+    # Naive UTC. Queue wait = started_at - enqueued_at, execution = finished_at - started_at.
+    # NULL on rows that predate them and on outputs reused by a resumed run.
+    enqueued_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # See agents/registry.py. Set when the agent finishes; NULL for rows that predate it.
+    agent_version: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    # For outputs carried over by a resumed run: the AgentRun that produced them.
+    # Not a foreign key, since gc may expire the source run.
+    reused_from_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
-    output: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    output_hash: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("blobs.hash"),
+        nullable=True,
+        index=True,
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -189,7 +313,176 @@ class AgentRun(Base):
     decision: Mapped["Decision"] = relationship(back_populates="agent_runs")
     decision_run: Mapped["DecisionRun"] = relationship(back_populates="agent_runs")
 
+    output_blob: Mapped[Optional["Blob"]] = relationship(lazy="select", viewonly=True)
+    output = BlobJSON("output_hash", "output_blob")
+
+
+class Blob(Base):
+    """Compressed, content-addressed JSON payloads (agent outputs, final reports)."""
+
+    __tablename__ = "blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    codec: Mapped[str] = mapped_column(String(16), nullable=False)
+    raw_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class ContextIngest(Base):
+    """Map-reduce ingestion of a large context file into a bounded `Decision.context`."""
+
+    __tablename__ = "context_ingests"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    decision_id: Mapped[int] = mapped_column(
+        ForeignKey("decisions.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+
+    source: Mapped[str] = mapped_column(Text, nullable=False)
+    source_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    chunk_chars: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_context_chars: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Reduce level in progress: 0 maps the file's chunks, each further level merges
+    # groups of the previous level's summaries.
+    level: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    status: Mapped[RunStatus] = mapped_column(
+        SAEnum(RunStatus, name="run_status"),
+        nullable=False,
+        default=RunStatus.RUNNING,
+        server_default=RunStatus.RUNNING.value,
+    )
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class ContextChunk(Base):
+    """One map or reduce step of a context ingestion: input text in, summary out."""
+
+    __tablename__ = "context_chunks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    ingest_id: Mapped[int] = mapped_column(
+        ForeignKey("context_ingests.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    level: Mapped[int] = mapped_column(Integer, nullable=False)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    status: Mapped[AgentStatus] = mapped_column(
+        SAEnum(AgentStatus, name="agent_status"),
+        nullable=False,
+        default=AgentStatus.QUEUED,
+        server_default=AgentStatus.QUEUED.value,
+    )
+
+    # {"text": ...}; released once the ingestion is done so `gc` can reclaim the blobs.
+    input_hash: Mapped[Optional[str]] = mapped_column(ForeignKey("blobs.hash"), nullable=True)
+    summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    input_blob: Mapped[Optional["Blob"]] = relationship(lazy="select", viewonly=True)
+    input = BlobJSON("input_hash", "input_blob")
+
+
+class ContextDigest(Base):
+    """
+    Condensed decision contexts, keyed by a hash of the decision question and the
+    raw context (orchestrator/context_digest.py).
+    """
+
+    __tablename__ = "context_digests"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    digest: Mapped[str] = mapped_column(Text, nullable=False)
+    model: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    context_chars: Mapped[int] = mapped_column(Integer, nullable=False)
+    digest_chars: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Token usage of the digest call: prompt (about the raw context) and completion (the digest).
+    context_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    digest_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+def insert_blobs(connection: Connection, blobs: list[EncodedBlob]) -> None:
+    """Insert blobs, skipping hashes that already exist (content dedup)."""
+    if not blobs:
+        return
+    stmt = sqlite_insert(Blob).on_conflict_do_nothing(index_elements=["hash"])
+    connection.execute(stmt, [b.as_row() for b in blobs])
+
+
+@event.listens_for(Session, "before_flush")
+def _flush_pending_blobs(session, flush_context, instances) -> None:
+    pending: dict[str, EncodedBlob] = {}
+    for obj in (*session.new, *session.dirty):
+        pending.update(obj.__dict__.get("_pending_blobs") or {})
+    insert_blobs(session.connection(), list(pending.values()))
+
+
+@event.listens_for(Session, "after_flush")
+def _clear_pending_blobs(session, flush_context) -> None:
+    # Cleared only once the flush succeeded, so a failed flush retries the inserts.
+    for obj in (*session.new, *session.dirty):
+        obj.__dict__.pop("_pending_blobs", None)
+
 
 # Practical indexes for common access patterns.
 Index("ix_agent_runs_run_agent", AgentRun.decision_run_id, AgentRun.agent_name)
 Index("ix_agent_runs_run_status", AgentRun.decision_run_id, AgentRun.status)
+# Change scans for incremental export.
+Index("ix_decisions_updated_at", Decision.updated_at)
+Index("ix_decision_runs_updated_at", DecisionRun.updated_at)
+Index("ix_agent_runs_updated_at", AgentRun.updated_at)
+# Level completion checks of context ingestion.
+Index("ix_context_chunks_ingest_level", ContextChunk.ingest_id, ContextChunk.level, ContextChunk.status)
+# Time-window scans for perf-report.
+Index("ix_agent_runs_finished_at", AgentRun.finished_at)
+# Single-flight: one in-flight coalescing run per decision and mode, enforced by SQLite.
+Index(
+    "ix_decision_runs_single_flight",
+    DecisionRun.decision_id,
+    DecisionRun.mode,
+    unique=True,
+    sqlite_where=DecisionRun.single_flight & DecisionRun.status.in_((RunStatus.QUEUED, RunStatus.RUNNING)),
+)
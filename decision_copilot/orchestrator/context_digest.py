@@ -0,0 +1,106 @@
+# coding: utf-8
+import hashlib
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from decision_copilot.agents.registry import AUXILIARY_SPECS, DIGEST_AGENT
+from decision_copilot.models import ContextDigest
+
+DIGEST_MODES_ENV = "DECISION_COPILOT_DIGEST_MODES"
+DIGEST_MIN_CHARS_ENV = "DECISION_COPILOT_DIGEST_MIN_CHARS"
+DEFAULT_MIN_CHARS = 4000
+
+# Rough size of a token, for digests whose call reported no usage.
+_CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class DigestPolicy:
+    """
+    Which runs condense the decision context once and give every agent the digest
+    instead of the raw text.
+
+    - modes: run modes that use a digest ("*" for all); empty (the default) disables it.
+    - min_chars: contexts shorter than this are sent as they are.
+    """
+    modes: frozenset[str] = frozenset()
+    min_chars: int = DEFAULT_MIN_CHARS
+
+    def __post_init__(self) -> None:
+        if self.min_chars < 0:
+            raise ValueError(f"Digest min_chars must not be negative, got: {self.min_chars}")
+
+    @classmethod
+    def from_env(cls) -> "DigestPolicy":
+        modes = frozenset(m.strip() for m in os.environ.get(DIGEST_MODES_ENV, "").split(",") if m.strip())
+        return cls(modes=modes, min_chars=int(os.environ.get(DIGEST_MIN_CHARS_ENV, DEFAULT_MIN_CHARS)))
+
+    def applies(self, mode: str, context: Optional[str]) -> bool:
+        if not context or len(context) < self.min_chars:
+            return False
+        return "*" in self.modes or mode in self.modes
+
+
+def digest_key(question: str, context: str) -> str:
+    """
+    Cache key of a context's digest. The digest keeps what matters for the
+    decision question, so it is shared only by decisions with the same question
+    and context. Bumping the digest agent's version invalidates older digests.
+    """
+    version = AUXILIARY_SPECS[DIGEST_AGENT].version
+    # NUL cannot occur in either text, so no two (question, context) pairs collide.
+    return hashlib.sha256(f"{version}\n{question}\0{context}".encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Digest:
+    text: str
+    model: Optional[str]
+    context_chars: int
+    context_tokens: Optional[int] = None  # prompt tokens of the digest call
+    digest_tokens: Optional[int] = None  # completion tokens of the digest call
+
+    @property
+    def saved_tokens(self) -> int:
+        """Prompt tokens saved by each agent call that reads the digest instead of the context."""
+        if self.context_tokens is not None and self.digest_tokens is not None:
+            return max(self.context_tokens - self.digest_tokens, 0)
+        return max(self.context_chars - len(self.text), 0) // _CHARS_PER_TOKEN
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Digest":
+        return cls(**data)
+
+
+def load_digest(session: Session, key: str) -> Optional[Digest]:
+    row = session.get(ContextDigest, key)
+    if row is None:
+        return None
+    return Digest(
+        text=row.digest,
+        model=row.model,
+        context_chars=row.context_chars,
+        context_tokens=row.context_tokens,
+        digest_tokens=row.digest_tokens,
+    )
+
+
+def store_digest(session: Session, key: str, digest: Digest) -> None:
+    """Insert a digest unless one is stored already (concurrent agents may both compute it)."""
+    stmt = sqlite_insert(ContextDigest).values(
+        key=key,
+        digest=digest.text,
+        model=digest.model,
+        context_chars=digest.context_chars,
+        digest_chars=len(digest.text),
+        context_tokens=digest.context_tokens,
+        digest_tokens=digest.digest_tokens,
+    ).on_conflict_do_nothing(index_elements=["key"])
+    session.execute(stmt)
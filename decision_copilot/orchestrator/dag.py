@@ -0,0 +1,101 @@
+# coding: utf-8
+from typing import Iterable, Mapping, Optional
+
+from decision_copilot.agents.registry import AGENT_SPECS, AgentSpec
+from decision_copilot.models import AgentStatus
+
+
+class AgentGraph:
+    """
+    Dependency graph of agent specs (see agents/registry.py).
+
+    Pure: callers pass the run's agent statuses (agent name -> status, one entry
+    per AgentRun row), the planner's selection (`None` until the planner is done)
+    and the agents the run proceeds without (see orchestrator/synth_policy.py).
+    """
+
+    def __init__(self, specs: Mapping[str, AgentSpec]):
+        self.specs = dict(specs)
+        for spec in self.specs.values():
+            unknown = [d for d in spec.inputs if d not in self.specs]
+            if unknown:
+                raise ValueError(f"Agent {spec.name} has unknown inputs: {unknown}")
+
+        self.dependents: dict[str, list[str]] = {name: [] for name in self.specs}
+        for spec in self.specs.values():
+            for dep in spec.inputs:
+                self.dependents[dep].append(spec.name)
+        self.order = self._topological_order()
+
+        # Longest remaining path (own cost included) from each node to a sink.
+        self.priority: dict[str, float] = {}
+        for name in reversed(self.order):
+            downstream = [self.priority[d] for d in self.dependents[name]]
+            self.priority[name] = self.specs[name].cost + max(downstream, default=0.0)
+
+    def active(self, selected: Optional[Iterable[str]]) -> set[str]:
+        """Agents that take part in the run: all fixed agents plus the selected ones."""
+        chosen = set(selected or ())
+        return {
+            name for name, spec in self.specs.items()
+            if not spec.selectable or name in chosen
+        }
+
+    def ready(
+            self,
+            statuses: Mapping[str, AgentStatus],
+            selected: Optional[Iterable[str]],
+            skipped: Iterable[str] = (),
+    ) -> list[str]:
+        """
+        Active agents not dispatched yet whose inputs are satisfied, longest
+        remaining path first. A skipped input counts as satisfied.
+        """
+        selected = None if selected is None else set(selected)
+        active = self.active(selected)
+        skipped = set(skipped)
+
+        def satisfied(dep: str) -> bool:
+            if dep in active:
+                return statuses.get(dep) == AgentStatus.DONE or dep in skipped
+            # An unselected input is not needed; an undecided one is not known yet.
+            return selected is not None or not self.specs[dep].selectable
+
+        ready = [
+            name for name in self.order
+            if name in active
+            and name not in statuses
+            and all(satisfied(dep) for dep in self.specs[name].inputs)
+        ]
+        ready.sort(key=lambda name: -self.priority[name])
+        return ready
+
+    def is_complete(
+            self,
+            statuses: Mapping[str, AgentStatus],
+            selected: Optional[Iterable[str]],
+            skipped: Iterable[str] = (),
+    ) -> bool:
+        if selected is None and any(spec.selectable for spec in self.specs.values()):
+            return False
+        return all(statuses.get(name) == AgentStatus.DONE for name in self.active(selected) - set(skipped))
+
+    def _topological_order(self) -> list[str]:
+        indegree = {name: len(spec.inputs) for name, spec in self.specs.items()}
+        order = []
+        frontier = [name for name, n in indegree.items() if n == 0]
+        while frontier:
+            name = frontier.pop(0)
+            order.append(name)
+            for d in self.dependents[name]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    frontier.append(d)
+
+        if len(order) != len(self.specs):
+            cyclic = sorted(set(self.specs) - set(order))
+            raise ValueError(f"Agent graph has a cycle through: {cyclic}")
+        return order
+
+
+AGENT_GRAPH = AgentGraph(AGENT_SPECS)
@@ -0,0 +1,247 @@
+# coding: utf-8
+import mmap
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.orm import Session
+
+from decision_copilot.agents.registry import INGEST_AGENT
+from decision_copilot.blob_store import encode_json
+from decision_copilot.models import (
+    AgentStatus,
+    ContextChunk,
+    ContextIngest,
+    Decision,
+    DecisionStatus,
+    RunStatus,
+    insert_blobs,
+)
+from decision_copilot.queue.connection import get_queue, ingest_job_id, stage_for_agent
+
+DEFAULT_CHUNK_CHARS = 12_000
+DEFAULT_MAX_CONTEXT_CHARS = 16_000
+
+# Chunk rows (and their blobs) are inserted in batches while the file is read.
+_INSERT_BATCH = 200
+
+
+class Ingestion:
+    """
+    Map-reduce ingestion of a context file (`create --context-file`) into a bounded
+    `Decision.context`:
+    - map: the file is split into chunks of about `chunk_chars`; one job per chunk
+      (queue/tasks.py:summarize_chunk) takes notes on it, in parallel across workers.
+    - reduce: once every chunk of a level is DONE, its notes become the decision
+      context if they fit in `max_context_chars`. Otherwise they are packed into
+      groups of about `chunk_chars`, and the next level merges each group in its own job.
+
+    The decision stays INGESTING (and cannot run) until then. The worker finishing a
+    level's last chunk advances the ingestion with a conditional UPDATE on its level,
+    so each level is reduced exactly once. A failed chunk fails the ingestion and the
+    decision.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def start(self, decision: Decision, path: Path, chunk_chars: int, max_context_chars: int) -> int:
+        """Chunk the file into a new ingestion for `decision`, commit and enqueue the map jobs."""
+        if chunk_chars < 1 or max_context_chars < 1:
+            raise ValueError("chunk_chars and max_context_chars must be positive")
+
+        ingest = ContextIngest(
+            decision_id=decision.id,
+            source=str(path),
+            source_bytes=path.stat().st_size,
+            chunk_chars=chunk_chars,
+            max_context_chars=max_context_chars,
+        )
+        self.session.add(ingest)
+        self.session.flush()
+
+        chunks = self._insert_chunks(ingest.id, 0, iter_file_chunks(path, chunk_chars))
+        if chunks == 0:
+            raise ValueError(f"Context file has no text: {path}")
+        self.session.commit()
+
+        self._enqueue(ingest.id, 0)
+        return chunks
+
+    def on_chunk_done(self, chunk_id: int, summary: str) -> None:
+        chunk = self.session.get(ContextChunk, chunk_id)
+        if chunk is None:
+            return
+        ingest = self.session.get(ContextIngest, chunk.ingest_id)
+        if ingest is None or ingest.status != RunStatus.RUNNING:
+            return
+
+        chunk.status = AgentStatus.DONE
+        chunk.summary = summary
+        chunk.error_message = None
+        self.session.commit()
+        self._advance(ingest, chunk.level)
+
+    def on_chunk_failed(self, chunk_id: int, error: str) -> None:
+        chunk = self.session.get(ContextChunk, chunk_id)
+        if chunk is None:
+            return
+        ingest = self.session.get(ContextIngest, chunk.ingest_id)
+        if ingest is None or ingest.status != RunStatus.RUNNING:
+            return
+
+        chunk.status = AgentStatus.FAILED
+        chunk.error_message = error
+        ingest.status = RunStatus.FAILED
+        ingest.error_message = f"Chunk {chunk.seq} of level {chunk.level} failed: {error}"
+
+        decision = self.session.get(Decision, ingest.decision_id)
+        if decision is not None:
+            decision.status = DecisionStatus.FAILED
+            decision.error_message = f"Context ingestion failed: {ingest.error_message}"
+        self.session.commit()
+
+    def _advance(self, ingest: ContextIngest, level: int) -> None:
+        # Only the statement that sees the level's last chunk DONE moves the level on.
+        pending = exists().where(
+            ContextChunk.ingest_id == ingest.id,
+            ContextChunk.level == level,
+            ContextChunk.status != AgentStatus.DONE,
+        )
+        claimed = self.session.execute(
+            update(ContextIngest)
+            .where(
+                ContextIngest.id == ingest.id,
+                ContextIngest.level == level,
+                ContextIngest.status == RunStatus.RUNNING,
+                ~pending,
+            )
+            .values(level=level + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        if not claimed:
+            self.session.commit()
+            return
+
+        notes = list(self.session.execute(
+            select(ContextChunk.summary)
+            .where(ContextChunk.ingest_id == ingest.id, ContextChunk.level == level)
+            .order_by(ContextChunk.seq)
+        ).scalars())
+
+        if len(notes) == 1 or sum(len(n) for n in notes) <= ingest.max_context_chars:
+            self._finish(ingest, notes)
+            self.session.commit()
+            return
+
+        groups = pack_groups(notes, ingest.chunk_chars)
+        self._insert_chunks(ingest.id, level + 1, ("\n\n".join(g) for g in groups))
+        self.session.commit()
+        self._enqueue(ingest.id, level + 1)
+
+    def _finish(self, ingest: ContextIngest, notes: list[str]) -> None:
+        ingest.status = RunStatus.DONE
+        decision = self.session.get(Decision, ingest.decision_id)
+        if decision is not None:
+            decision.context = "\n\n".join(notes)[:ingest.max_context_chars]
+            decision.status = DecisionStatus.NEW
+        # The notes are kept; the chunk texts are left to `gc`.
+        self.session.execute(
+            update(ContextChunk)
+            .where(ContextChunk.ingest_id == ingest.id)
+            .values(input_hash=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _insert_chunks(self, ingest_id: int, level: int, texts: Iterable[str]) -> int:
+        n = 0
+        blobs, rows = [], []
+        for text in texts:
+            blob = encode_json({"text": text})
+            blobs.append(blob)
+            rows.append({"ingest_id": ingest_id, "level": level, "seq": n, "input_hash": blob.hash})
+            n += 1
+            if len(rows) >= _INSERT_BATCH:
+                self._flush_chunks(blobs, rows)
+                blobs, rows = [], []
+        self._flush_chunks(blobs, rows)
+        return n
+
+    def _flush_chunks(self, blobs: list, rows: list[dict]) -> None:
+        if not rows:
+            return
+        insert_blobs(self.session.connection(), blobs)
+        self.session.execute(insert(ContextChunk), rows)
+
+    def _enqueue(self, ingest_id: int, level: int) -> None:
+        from rq import Queue
+
+        # lazy import: tasks imports this module
+        from decision_copilot.queue.tasks import summarize_chunk
+
+        chunk_ids = self.session.execute(
+            select(ContextChunk.id)
+            .where(ContextChunk.ingest_id == ingest_id, ContextChunk.level == level)
+            .order_by(ContextChunk.seq)
+        ).scalars()
+        # One pipeline for the whole level: a large file has thousands of chunks.
+        get_queue(stage_for_agent(INGEST_AGENT)).enqueue_many([
+            Queue.prepare_data(summarize_chunk, (chunk_id,), job_id=ingest_job_id(chunk_id))
+            for chunk_id in chunk_ids
+        ])
+
+
+def iter_file_chunks(path: Path, chunk_bytes: int) -> Iterator[str]:
+    """
+    Split a UTF-8 text file into chunks of at most `chunk_bytes` bytes, cut at a
+    paragraph, line or word break where there is one in the chunk's second half.
+    The file is memory-mapped, so only the current chunk is ever decoded.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = min(start + chunk_bytes, size)
+                if end < size:
+                    end = _break_before(mm, start, end)
+                text = mm[start:end].decode("utf-8", errors="replace").strip()
+                if text:
+                    yield text
+                start = end
+
+
+def _break_before(mm: mmap.mmap, start: int, end: int) -> int:
+    floor = start + (end - start) // 2
+    for sep in (b"\n\n", b"\n", b" "):
+        i = mm.rfind(sep, floor, end)
+        if i != -1:
+            return i + len(sep)
+    # No break: cut, but not inside a multi-byte UTF-8 character.
+    while end > start + 1 and mm[end] & 0xC0 == 0x80:
+        end -= 1
+    return end
+
+
+def pack_groups(texts: list[str], limit: int) -> list[list[str]]:
+    """
+    Consecutive groups of about `limit` characters, at least two texts each, so
+    every reduce level has fewer texts than the one before.
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for text in texts:
+        if len(current) >= 2 and size + len(text) > limit:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if len(current) == 1 and groups:
+        groups[-1].extend(current)
+    elif current:
+        groups.append(current)
+    return groups
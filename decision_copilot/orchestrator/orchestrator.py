@@ -1,7 +1,12 @@
 # coding: utf-8
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
 
+from sqlalchemy import exists, func, insert, literal, select
+from sqlalchemy.orm import Session, selectinload
+
+from decision_copilot import metrics
+from decision_copilot.agents.registry import AGENT_SPECS, REPORT_AGENT, SELECTABLE_AGENTS, SELECTOR_AGENT
 from decision_copilot.models import (
     AgentRun,
     AgentStatus,
@@ -9,23 +14,56 @@ from decision_copilot.models import (
     DecisionRun,
     DecisionStatus,
     RunStatus,
+    utcnow,
+)
+from decision_copilot.orchestrator.context_digest import load_digest
+from decision_copilot.orchestrator.dag import AGENT_GRAPH, AgentGraph
+from decision_copilot.orchestrator.summary import refresh_run_summary
+from decision_copilot.orchestrator.synth_policy import SynthPolicy
+from decision_copilot.queue.cancellation import signal_cancel, signal_cancel_agents
+from decision_copilot.queue.connection import (
+    PERSISTENCE_MODE,
+    agent_job_id,
+    deadline_job_id,
+    get_queue,
+    stage_for_agent,
 )
-from decision_copilot.queue.connection import get_queue
+from decision_copilot.services.artifacts import store_report_artifact
 
 
 class Orchestrator:
     """
-    DB-driven orchestration:
-    - Planner runs first and produces required_agents.
-    - Required agents run in parallel.
-    - Synth runs last after all required agents are DONE.
-    - Fail-fast: any required agent FAILED -> run FAILED -> decision FAILED.
+    DB-driven orchestration over the agent DAG (agents/registry.py):
+    - Every agent is dispatched as soon as its inputs are DONE; ready agents are
+      enqueued longest-remaining-path first.
+    - The planner's required_agents select which selectable agents take part.
+    - The run's synth policy may start the report agent before all of its inputs
+      are DONE; the stragglers are skipped (canceled and recorded on the run).
+    - The run is DONE once every participating agent is DONE or skipped; the report
+      agent's output becomes the decision's final report.
+    - Fail-fast: any participating agent FAILED -> run FAILED -> decision FAILED,
+      and the run's unfinished agents are canceled.
+    - A run in a terminal state ignores further agent callbacks.
+
+    With `defer_commit=True` (the persister's group transactions) state changes are
+    only flushed, and Redis side effects (enqueues, cancel signals) are held until
+    the caller commits and calls `publish()`.
     """
 
-    ALLOWED_REQUIRED_AGENTS = ("facts", "pro", "con", "risk")
+    ALLOWED_REQUIRED_AGENTS = SELECTABLE_AGENTS
+    TERMINAL_RUN_STATUSES = (RunStatus.DONE, RunStatus.FAILED, RunStatus.CANCELED)
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, graph: AgentGraph = AGENT_GRAPH, *, defer_commit: bool = False):
         self.session = session
+        self.graph = graph
+        self.defer_commit = defer_commit
+        self._deferred: list[Callable[[], Any]] = []
+
+    def publish(self) -> None:
+        """Run the Redis side effects held back by `defer_commit`, after the caller committed."""
+        deferred, self._deferred = self._deferred, []
+        for fn in deferred:
+            fn()
 
     def start(self, decision_run_id: int) -> None:
         run = self.session.get(DecisionRun, decision_run_id)
@@ -39,72 +77,249 @@ class Orchestrator:
         # Mark run/decision active early (observable immediately)
         run.status = RunStatus.RUNNING
         decision.status = DecisionStatus.RUNNING
-        self.session.commit()
+        self._commit(run.id)
 
-        self._enqueue_if_needed(decision_run_id, "planner")
+        # A resumed run may already carry DONE outputs; advancing dispatches the rest.
+        self._advance(run)
 
     def on_agent_done(self, decision_run_id: int, agent_name: str) -> None:
         """
         Called by the worker after it marks AgentRun DONE.
         """
         run = self.session.get(DecisionRun, decision_run_id)
-        if run is None:
+        if run is None or run.status in self.TERMINAL_RUN_STATUSES:
             return
 
-        if agent_name == "planner":
-            self._fanout_required_agents(run)
-            return
+        self._advance(run)
 
-        # If any required agent failed, fail-fast.
-        if self._any_required_failed(run):
-            self._fail_run(run, reason="One or more required agents failed.")
+    def on_agent_failed(self, decision_run_id: int, agent_name: str) -> None:
+        """
+        Called by the worker when an agent fails: fail-fast if the agent takes part in the run.
+        """
+        run = self.session.get(DecisionRun, decision_run_id)
+        if run is None or run.status in self.TERMINAL_RUN_STATUSES:
             return
 
-        # Only schedule synth after all required agents are done.
-        if self._all_required_done(run):
-            self._enqueue_if_needed(decision_run_id, "synth")
+        if agent_name in self._required(run):
+            self._fail_run(run, reason=f"Required agent failed: {agent_name}")
 
-    def on_agent_failed(self, decision_run_id: int, agent_name: str) -> None:
+    def on_deadline(self, decision_run_id: int) -> None:
         """
-        Optional hook: call this from the worker when an agent fails.
-        For MVP, we fail-fast if it's a required agent.
+        Called when the run's synth deadline passes (queue/tasks.py:check_synth_deadline).
         """
         run = self.session.get(DecisionRun, decision_run_id)
-        if run is None:
+        if run is None or run.status in self.TERMINAL_RUN_STATUSES:
             return
 
-        if agent_name in (run.required_agents or []):
-            self._fail_run(run, reason=f"Required agent failed: {agent_name}")
+        self._advance(run)
 
-    def on_synth_done(self, decision_run_id: int) -> None:
+    def requeue(self, decision_run_id: int, agent_names: list[str]) -> None:
+        """
+        Enqueue jobs again for agents reset to QUEUED after their worker died
+        (see orchestrator/reaper.py).
+        """
         run = self.session.get(DecisionRun, decision_run_id)
-        if run is None:
+        if run is None or run.status in self.TERMINAL_RUN_STATUSES:
             return
+        self._enqueue_jobs(run, agent_names)
+
+    def cancel(self, decision_run_id: int, reason: str = "Canceled by user.") -> bool:
+        """
+        Cancel a queued or running run. Returns False if it had already finished.
+        """
+        run = self.session.get(DecisionRun, decision_run_id)
+        if run is None:
+            raise ValueError(f"DecisionRun not found: {decision_run_id}")
+        if run.status in self.TERMINAL_RUN_STATUSES:
+            return False
 
         decision = self.session.get(Decision, run.decision_id)
-        if decision is None:
+        if self._is_latest(decision, run):
+            decision.status = DecisionStatus.CANCELED
+            decision.error_message = reason
+
+        run.status = RunStatus.CANCELED
+        run.error_message = reason
+        self._stop_unfinished_agents(run, reason)
+        return True
+
+    def _advance(self, run: DecisionRun) -> None:
+        statuses = self._agent_statuses(run.id)
+
+        # A concurrent sibling may have failed without triggering fail-fast yet.
+        if any(statuses.get(name) == AgentStatus.FAILED for name in self._required(run)):
+            self._fail_run(run, reason="One or more required agents failed.")
             return
 
-        synth = self._get_agent_run(decision_run_id, "synth")
-        if synth and synth.status == AgentStatus.DONE:
-            decision.final_report = synth.output
-            decision.status = DecisionStatus.DONE
-            run.status = RunStatus.DONE
-            self.session.commit()
+        if run.required_agents is None and statuses.get(SELECTOR_AGENT) == AgentStatus.DONE:
+            selector = self._get_agent_run(run.id, SELECTOR_AGENT)
+            run.required_agents = self._normalize_required_agents(selector.output)
+            self._commit(run.id)
+
+        skipped = run.skipped_agents or ()
+        if self.graph.is_complete(statuses, run.required_agents, skipped):
+            self._complete_run(run)
+            return
 
-    def _fanout_required_agents(self, run: DecisionRun) -> None:
-        planner = self._get_agent_run(run.id, "planner")
+        if not skipped and REPORT_AGENT not in statuses:
+            skipped = self._apply_synth_policy(run, statuses)
+
+        self._dispatch(run, self.graph.ready(statuses, run.required_agents, skipped))
+
+    def _required(self, run: DecisionRun) -> set[str]:
+        """Participating agents the run still needs (skipped ones no longer count)."""
+        return self.graph.active(run.required_agents) - set(run.skipped_agents or ())
+
+    def _apply_synth_policy(self, run: DecisionRun, statuses: dict[str, AgentStatus]) -> list[str]:
+        """Skip the report agent's pending inputs if the run's synth policy lets it start now."""
+        policy = SynthPolicy.for_run(run)
+        if policy.waits_for_all or run.required_agents is None:
+            return []
+
+        active = self.graph.active(run.required_agents)
+        inputs = [name for name in self.graph.specs[REPORT_AGENT].inputs if name in active]
+        pending = [name for name in inputs if statuses.get(name) != AgentStatus.DONE]
+        if not pending:
+            return []
+
+        fanout_at = self._fanout_at(run.id, inputs) if policy.deadline_s is not None else None
+        if not policy.allows_start(len(inputs) - len(pending), fanout_at, utcnow()):
+            return []
+
+        self._skip_agents(run, pending)
+        return pending
+
+    def _fanout_at(self, decision_run_id: int, agent_names: list[str]) -> Optional[datetime]:
+        return self.session.execute(
+            select(func.min(AgentRun.enqueued_at)).where(
+                AgentRun.decision_run_id == decision_run_id,
+                AgentRun.agent_name.in_(agent_names),
+            )
+        ).scalar_one()
+
+    def _skip_agents(self, run: DecisionRun, agent_names: list[str]) -> None:
+        """
+        Record the agents the run goes on without, mark the queued ones CANCELED and
+        raise their own cancel flags (running ones abort; the run itself goes on).
+        """
+        reason = "Skipped by synth policy."
+        run.skipped_agents = sorted(agent_names)
+        stmt = select(AgentRun).where(
+            AgentRun.decision_run_id == run.id,
+            AgentRun.agent_name.in_(agent_names),
+            AgentRun.status.in_([AgentStatus.QUEUED, AgentStatus.RUNNING]),
+        )
+        unfinished = list(self.session.execute(stmt).scalars().all())
+
+        queued = []
+        for agent_run in unfinished:
+            if agent_run.status == AgentStatus.QUEUED:
+                agent_run.status = AgentStatus.CANCELED
+                agent_run.error_message = reason
+                agent_run.finished_at = utcnow()
+                queued.append(agent_run.agent_name)
+        for name in agent_names:
+            metrics.SYNTH_SKIPPED.inc(agent=name)
+        self._commit(run.id)
+
+        if unfinished:
+            run_id = run.id
+            names = [a.agent_name for a in unfinished]
+            self._after_commit(lambda: signal_cancel_agents(run_id, names, queued))
+
+    def _dispatch(self, run: DecisionRun, agent_names: list[str]) -> None:
+        if not agent_names:
+            return
 
-        required = self._normalize_required_agents(planner.output if planner else None)
-        run.required_agents = required
-        self.session.commit()
+        # Insert-if-absent in one statement: two workers advancing the run at the same
+        # time (siblings finishing together) must not both dispatch the same agent.
+        now = utcnow()
+        dispatched = []
+        for name in agent_names:
+            absent = ~exists().where(AgentRun.decision_run_id == run.id, AgentRun.agent_name == name)
+            rows = select(
+                literal(run.decision_id),
+                literal(run.id),
+                literal(name),
+                literal(AgentStatus.QUEUED, AgentRun.status.type),
+                literal(now, AgentRun.enqueued_at.type),
+            ).where(absent)
+            stmt = insert(AgentRun).from_select(
+                ["decision_id", "decision_run_id", "agent_name", "status", "enqueued_at"], rows)
+            if self.session.execute(stmt).rowcount == 1:
+                dispatched.append(name)
+        self._commit(run.id)
+        if not dispatched:
+            return
 
-        from decision_copilot.queue.tasks import run_agent  # lazy import to avoid circular import
+        # Fan-out of the report agent's inputs starts the synth deadline clock.
+        deadline_s = run.synth_deadline_s
+        if deadline_s is not None and not set(dispatched) & set(self.graph.specs[REPORT_AGENT].inputs):
+            deadline_s = None
+        self._enqueue_jobs(run, dispatched, deadline_s)
+
+    def _enqueue_jobs(self, run: DecisionRun, agent_names: list[str], deadline_s: Optional[float] = None) -> None:
+        # lazy import to avoid circular import
+        from decision_copilot.queue.tasks import check_synth_deadline, run_agent, run_agent_detached
+
+        jobs = []
+        for name in agent_names:
+            if PERSISTENCE_MODE == "stream":
+                # The worker gets everything it needs in the job and never opens SQLite.
+                jobs.append((name, run_agent_detached, (self._detached_job(run, name),)))
+            else:
+                jobs.append((name, run_agent, (run.id, name)))
+
+        run_id = run.id  # the instance is expired once the deferred commit happens
+
+        def enqueue() -> None:
+            queues = {}  # one connection per stage queue for the whole batch
+            for name, fn, args in jobs:
+                stage = stage_for_agent(name)
+                if stage not in queues:
+                    queues[stage] = get_queue(stage)
+                queues[stage].enqueue(fn, *args, job_id=agent_job_id(run_id, name))
+            if deadline_s is not None:
+                # Needs a worker started with the RQ scheduler (scripts/worker.py).
+                get_queue(stage_for_agent(REPORT_AGENT)).enqueue_in(
+                    timedelta(seconds=deadline_s), check_synth_deadline, run_id, job_id=deadline_job_id(run_id)
+                )
+
+        self._after_commit(enqueue)
+
+    def _detached_job(self, run: DecisionRun, agent_name: str) -> dict[str, Any]:
+        decision = self.session.get(Decision, run.decision_id)
+        key = run.context_digest_key
+        digest = load_digest(self.session, key) if key else None
+        return {
+            "decision_id": run.decision_id,
+            "decision_run_id": run.id,
+            "agent_name": agent_name,
+            "mode": run.mode,
+            "question": decision.question,
+            "context": decision.context,
+            # Without a cached digest the agent computes it (see queue/tasks.py).
+            "context_digest_key": key,
+            "context_digest": digest.to_dict() if digest is not None else None,
+            "inputs": load_agent_inputs(self.session, run.id, AGENT_SPECS[agent_name].inputs),
+        }
+
+    def _complete_run(self, run: DecisionRun) -> None:
+        decision = self.session.get(Decision, run.decision_id)
+        if decision is None:
+            return
 
-        q = get_queue()
-        for name in required:
-            self._ensure_agent_run(run.id, name)
-            q.enqueue(run_agent, run.id, name)
+        report = self._get_agent_run(run.id, REPORT_AGENT)
+        final_report = report.output if report else None
+        if final_report is not None and run.skipped_agents:
+            # The report says which inputs it was written without.
+            final_report = {**final_report, "missing_inputs": list(run.skipped_agents)}
+        decision.final_report = final_report
+        decision.status = DecisionStatus.DONE
+        run.status = RunStatus.DONE
+        # Render once here, so report/export readers get the stored artifact.
+        store_report_artifact(self.session, decision)
+        self._commit(run.id)
 
     def _normalize_required_agents(self, planner_output) -> list[str]:
         # planner_output should be dict with key "required_agents"
@@ -131,64 +346,9 @@ class Orchestrator:
 
         return normalized
 
-    def _all_required_done(self, run: DecisionRun) -> bool:
-        required = run.required_agents or []
-        if not required:
-            return False
-
-        stmt = select(AgentRun.agent_name, AgentRun.status).where(
-            AgentRun.decision_run_id == run.id,
-            AgentRun.agent_name.in_(required),
-        )
-        rows = list(self.session.execute(stmt).all())
-        status_by_name = {name: status for name, status in rows}
-
-        return all(status_by_name.get(name) == AgentStatus.DONE for name in required)
-
-    def _any_required_failed(self, run: DecisionRun) -> bool:
-        required = run.required_agents or []
-        if not required:
-            return False
-
-        stmt = select(AgentRun).where(
-            AgentRun.decision_run_id == run.id,
-            AgentRun.agent_name.in_(required),
-            AgentRun.status == AgentStatus.FAILED,
-        )
-        return self.session.execute(stmt).scalars().first() is not None
-
-    def _enqueue_if_needed(self, decision_run_id: int, agent_name: str) -> None:
-        """
-        Enqueue only if:
-        - AgentRun exists (create if missing)
-        - status is QUEUED (not RUNNING/DONE/FAILED)
-        """
-        agent_run = self._ensure_agent_run(decision_run_id, agent_name)
-        if agent_run.status != AgentStatus.QUEUED:
-            return
-
-        from decision_copilot.queue.tasks import run_agent  # lazy import to avoid circular import
-
-        get_queue().enqueue(run_agent, decision_run_id, agent_name)
-
-    def _ensure_agent_run(self, decision_run_id: int, agent_name: str) -> AgentRun:
-        existing = self._get_agent_run(decision_run_id, agent_name)
-        if existing:
-            return existing
-
-        run = self.session.get(DecisionRun, decision_run_id)
-        if run is None:
-            raise ValueError(f"DecisionRun not found: {decision_run_id}")
-
-        agent_run = AgentRun(
-            decision_id=run.decision_id,
-            decision_run_id=run.id,
-            agent_name=agent_name,
-            status=AgentStatus.QUEUED,
-        )
-        self.session.add(agent_run)
-        self.session.commit()
-        return agent_run
+    def _agent_statuses(self, decision_run_id: int) -> dict[str, AgentStatus]:
+        stmt = select(AgentRun.agent_name, AgentRun.status).where(AgentRun.decision_run_id == decision_run_id)
+        return {name: status for name, status in self.session.execute(stmt).all()}
 
     def _get_agent_run(self, decision_run_id: int, agent_name: str):
         stmt = (
@@ -200,10 +360,75 @@ class Orchestrator:
 
     def _fail_run(self, run: DecisionRun, reason: str) -> None:
         decision = self.session.get(Decision, run.decision_id)
-        if decision:
+        if self._is_latest(decision, run):
             decision.status = DecisionStatus.FAILED
             decision.error_message = reason
 
         run.status = RunStatus.FAILED
         run.error_message = reason
-        self.session.commit()
+        self._stop_unfinished_agents(run, f"Canceled: {reason}")
+
+    @staticmethod
+    def _is_latest(decision: Optional[Decision], run: DecisionRun) -> bool:
+        """Only the decision's latest run sets its status; an older run ending must not."""
+        # latest_run_id is unset only on decisions whose runs predate the column.
+        return decision is not None and decision.latest_run_id in (None, run.id)
+
+    def _stop_unfinished_agents(self, run: DecisionRun, reason: str) -> None:
+        """
+        Commit the run's terminal state, mark its queued agents CANCELED, remove their
+        RQ jobs and raise the Redis cancel flag so running agents abort their LLM calls
+        (the worker then records them as CANCELED).
+        """
+        stmt = select(AgentRun).where(
+            AgentRun.decision_run_id == run.id,
+            AgentRun.status.in_([AgentStatus.QUEUED, AgentStatus.RUNNING]),
+        )
+        unfinished = list(self.session.execute(stmt).scalars().all())
+
+        queued = []
+        for agent_run in unfinished:
+            if agent_run.status == AgentStatus.QUEUED:
+                agent_run.status = AgentStatus.CANCELED
+                agent_run.error_message = reason
+                agent_run.finished_at = utcnow()
+                queued.append(agent_run.agent_name)
+        self._commit(run.id)
+
+        if unfinished:
+            run_id = run.id
+            self._after_commit(lambda: signal_cancel(run_id, queued))
+
+    def _commit(self, decision_run_id: int) -> None:
+        # Keep Decision.run_summary in the same transaction as the state change.
+        refresh_run_summary(self.session, decision_run_id)
+        if not self.defer_commit:
+            with metrics.DB_COMMIT.time(writer="orchestrator"):
+                self.session.commit()
+
+    def _after_commit(self, fn: Callable[[], Any]) -> None:
+        if self.defer_commit:
+            self._deferred.append(fn)
+        else:
+            fn()
+
+
+def load_agent_inputs(session: Session, decision_run_id: int, input_names: Iterable[str]) -> dict[str, Any]:
+    """
+    Load the DONE outputs of an agent's declared inputs, keyed by agent name.
+    Inputs that did not run (not selected by the planner) are absent.
+    """
+    input_names = list(input_names)
+    if not input_names:
+        return {}
+
+    stmt = (
+        select(AgentRun)
+        .where(
+            AgentRun.decision_run_id == decision_run_id,
+            AgentRun.status == AgentStatus.DONE,
+            AgentRun.agent_name.in_(input_names),
+        )
+        .options(selectinload(AgentRun.output_blob))
+    )
+    return {r.agent_name: r.output or {} for r in session.execute(stmt).scalars()}
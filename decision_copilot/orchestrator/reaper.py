@@ -0,0 +1,85 @@
+# coding: utf-8
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from decision_copilot import metrics
+from decision_copilot.models import AgentRun, AgentStatus, DecisionRun, RunStatus, utcnow
+from decision_copilot.orchestrator.orchestrator import Orchestrator
+from decision_copilot.orchestrator.summary import refresh_run_summary
+from decision_copilot.queue.leases import LEASE_TTL_S, live_leases
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+REAP_INTERVAL_S = 15.0
+
+
+class LeaseReaper:
+    """
+    Requeues agents whose worker died mid-execution: RUNNING agent runs of RUNNING
+    runs that started more than `ttl_s` ago and have no lease (queue/leases.py)
+    any more. Each is reset to QUEUED with a conditional UPDATE, so a row that
+    finished meanwhile is left alone, then enqueued again.
+
+    The new execution re-checks the lease and the row, so a slow worker that only
+    lost its lease cannot record its result twice.
+    """
+
+    def __init__(self, session: Session, redis: "Redis", *, ttl_s: int = LEASE_TTL_S):
+        self.session = session
+        self.redis = redis
+        self.ttl_s = ttl_s
+
+    def reap(self, now: Optional[datetime] = None) -> list[tuple[int, str]]:
+        """Requeue stale agents; returns the (run id, agent name) pairs requeued."""
+        now = now or utcnow()
+        # Leases are set before the RUNNING transition, so a younger row may still be starting.
+        cutoff = now - timedelta(seconds=self.ttl_s)
+        candidates = self.session.execute(
+            select(AgentRun.id, AgentRun.decision_run_id, AgentRun.agent_name)
+            .join(DecisionRun, DecisionRun.id == AgentRun.decision_run_id)
+            .where(
+                AgentRun.status == AgentStatus.RUNNING,
+                AgentRun.started_at < cutoff,
+                DecisionRun.status == RunStatus.RUNNING,
+            )
+        ).all()
+        if not candidates:
+            return []
+
+        leased = live_leases(self.redis, [(run_id, name) for _, run_id, name in candidates])
+        requeued: dict[int, list[str]] = defaultdict(list)
+        for agent_run_id, run_id, name in candidates:
+            if (run_id, name) in leased:
+                continue
+            reset = self.session.execute(
+                update(AgentRun)
+                .where(AgentRun.id == agent_run_id, AgentRun.status == AgentStatus.RUNNING)
+                .values(status=AgentStatus.QUEUED, model=None, started_at=None, enqueued_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount == 1
+            if reset:
+                requeued[run_id].append(name)
+        if not requeued:
+            return []
+
+        for run_id in requeued:
+            refresh_run_summary(self.session, run_id)
+        self.session.commit()
+
+        orch = Orchestrator(self.session)
+        out = []
+        for run_id, names in requeued.items():
+            logger.warning("Requeuing %s of run %s: lease expired", ", ".join(names), run_id)
+            orch.requeue(run_id, names)
+            for name in names:
+                metrics.AGENTS_REAPED.inc(agent=name)
+                out.append((run_id, name))
+        return out
@@ -0,0 +1,107 @@
+# coding: utf-8
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session
+
+from decision_copilot.agents.registry import AGENT_VERSIONS, REPORT_AGENT
+from decision_copilot.models import AgentRun, AgentStatus, DecisionRun, RunStatus
+from decision_copilot.orchestrator.dag import AGENT_GRAPH
+
+RESUME_SCOPES = ("latest", "any")
+
+# The report is always regenerated, so a resumed run always produces a fresh final report.
+NEVER_REUSED = (REPORT_AGENT,)
+
+
+@dataclass(frozen=True)
+class ResumePolicy:
+    """
+    Which DONE outputs a resumed run may reuse.
+
+    - scope="latest": only outputs of the decision's latest run.
+    - scope="any": for each agent, the newest output from any earlier run.
+
+    Outputs are reused only if they were produced by the agent's current version
+    (see agents/registry.py) and all of the agent's inputs are reused as well;
+    rows without a recorded version are treated as stale.
+    """
+    scope: str = "latest"
+
+    def __post_init__(self) -> None:
+        if self.scope not in RESUME_SCOPES:
+            raise ValueError(f"Unknown resume scope: {self.scope}. Use one of: {', '.join(RESUME_SCOPES)}")
+
+
+@dataclass(frozen=True)
+class ResumePlan:
+    source_run_id: int
+    reusable: dict[str, AgentRun]
+
+
+def plan_resume(session: Session, decision_id: int, policy: ResumePolicy) -> ResumePlan:
+    latest = session.execute(
+        select(DecisionRun)
+        .where(DecisionRun.decision_id == decision_id)
+        .order_by(desc(DecisionRun.id))
+        .limit(1)
+    ).scalars().first()
+    if latest is None:
+        raise ValueError(f"No run to resume for decision: {decision_id}")
+    if latest.status in (RunStatus.QUEUED, RunStatus.RUNNING):
+        raise ValueError(f"Run {latest.id} is still {latest.status.value}; cancel it before resuming.")
+    if latest.status == RunStatus.DONE:
+        raise ValueError(f"Run {latest.id} is already done; nothing to resume.")
+
+    stmt = select(AgentRun).where(
+        AgentRun.decision_id == decision_id,
+        AgentRun.status == AgentStatus.DONE,
+        AgentRun.agent_name.notin_(NEVER_REUSED),
+    )
+    if policy.scope == "latest":
+        stmt = stmt.where(AgentRun.decision_run_id == latest.id)
+
+    candidates: dict[str, AgentRun] = {}
+    for agent_run in session.execute(stmt.order_by(desc(AgentRun.id))).scalars():
+        name = agent_run.agent_name
+        if name in candidates or not _is_current(agent_run):
+            continue
+        candidates[name] = agent_run
+
+    # An agent whose input is re-executed must be re-executed too.
+    reusable: dict[str, AgentRun] = {}
+    for name in AGENT_GRAPH.order:
+        spec = AGENT_GRAPH.specs[name]
+        if name in candidates and all(dep in reusable for dep in spec.inputs):
+            reusable[name] = candidates[name]
+
+    return ResumePlan(source_run_id=latest.id, reusable=reusable)
+
+
+def copy_reused_outputs(session: Session, run: DecisionRun, plan: ResumePlan) -> list[str]:
+    """
+    Add DONE AgentRuns to `run` that point at the reused outputs. Blobs are
+    content-addressed, so this links the existing payload instead of copying it.
+    The caller commits.
+    """
+    for src in sorted(plan.reusable.values(), key=lambda a: a.id):
+        session.add(
+            AgentRun(
+                decision_id=run.decision_id,
+                decision_run_id=run.id,
+                agent_name=src.agent_name,
+                status=AgentStatus.DONE,
+                model=src.model,
+                latency_ms=src.latency_ms,
+                agent_version=src.agent_version,
+                output_hash=src.output_hash,
+                reused_from_id=src.reused_from_id or src.id,
+            )
+        )
+    return sorted(plan.reusable)
+
+
+def _is_current(agent_run: AgentRun) -> bool:
+    current: Optional[str] = AGENT_VERSIONS.get(agent_run.agent_name)
+    return current is not None and agent_run.agent_version == current
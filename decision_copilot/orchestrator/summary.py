@@ -0,0 +1,103 @@
+# coding: utf-8
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from decision_copilot.models import AgentRun, Decision, DecisionRun
+
+
+def refresh_run_summary(session: Session, decision_run_id: int) -> None:
+    """
+    Recompute `Decision.run_summary` from the run and its agent runs.
+
+    Call right before committing a state change so the summary is written in the
+    same transaction. Only narrow columns are read; agent outputs are never loaded.
+    The caller commits.
+    """
+    # Pending status changes must be visible to the projection queries below.
+    session.flush()
+
+    run = session.execute(
+        select(
+            DecisionRun.id,
+            DecisionRun.decision_id,
+            DecisionRun.mode,
+            DecisionRun.status,
+            DecisionRun.skipped_agents,
+            DecisionRun.created_at,
+            DecisionRun.updated_at,
+        ).where(DecisionRun.id == decision_run_id)
+    ).first()
+    if run is None:
+        return
+
+    decision = session.get(Decision, run.decision_id)
+    if decision is None:
+        return
+
+    # A late callback from an older run must not overwrite the latest run's summary.
+    if decision.latest_run_id is not None and decision.latest_run_id > run.id:
+        return
+
+    agent_rows = session.execute(
+        select(
+            AgentRun.id,
+            AgentRun.agent_name,
+            AgentRun.status,
+            AgentRun.latency_ms,
+            AgentRun.model,
+            AgentRun.error_message,
+            AgentRun.reused_from_id,
+            AgentRun.created_at,
+            AgentRun.updated_at,
+        )
+        .where(AgentRun.decision_run_id == run.id)
+        .order_by(AgentRun.created_at.asc(), AgentRun.id.asc())
+    ).all()
+
+    decision.latest_run_id = run.id
+    # Assign a new dict (never mutate in place) so the JSON column is flagged dirty.
+    decision.run_summary = {
+        "latest_run": {
+            "id": run.id,
+            "mode": run.mode,
+            "status": run.status.value,
+            "skipped_agents": run.skipped_agents or [],
+            "created_at": run.created_at.isoformat(),
+            "updated_at": run.updated_at.isoformat(),
+        },
+        "agent_runs": [
+            {
+                "id": ar.id,
+                "agent_name": ar.agent_name,
+                "status": ar.status.value,
+                "latency_ms": ar.latency_ms,
+                "model": ar.model,
+                "error_message": ar.error_message,
+                "reused_from_id": ar.reused_from_id,
+                "created_at": ar.created_at.isoformat(),
+                "updated_at": ar.updated_at.isoformat(),
+            }
+            for ar in agent_rows
+        ],
+    }
+
+
+def backfill_run_summaries(session: Session, *, batch_size: int = 500) -> int:
+    """Populate summaries for decisions that have runs but predate `run_summary`."""
+    n = 0
+    while True:
+        stmt = (
+            select(func.max(DecisionRun.id))
+            .join(Decision, Decision.id == DecisionRun.decision_id)
+            .where(Decision.latest_run_id.is_(None))
+            .group_by(DecisionRun.decision_id)
+            .limit(batch_size)
+        )
+        run_ids = list(session.execute(stmt).scalars())
+        if not run_ids:
+            return n
+
+        for run_id in run_ids:
+            refresh_run_summary(session, run_id)
+        session.commit()
+        n += len(run_ids)
@@ -0,0 +1,48 @@
+# coding: utf-8
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from decision_copilot.models import DecisionRun
+
+
+@dataclass(frozen=True)
+class SynthPolicy:
+    """
+    When the report agent may start before all of its inputs are DONE.
+
+    - quorum: start as soon as this many of its inputs are DONE.
+    - deadline_s: seconds after fan-out (the first input was enqueued); once they
+      have passed, start with the inputs that are DONE (at least one).
+
+    With both, the inputs get until the deadline, then the report agent starts as
+    soon as the quorum is met. With neither (the default) it waits for every input.
+    The inputs it starts without are skipped: canceled and recorded on the run.
+    Failures still fail the run fast, whatever the policy.
+    """
+    quorum: Optional[int] = None
+    deadline_s: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.quorum is not None and self.quorum < 1:
+            raise ValueError(f"Synth quorum must be at least 1, got: {self.quorum}")
+        if self.deadline_s is not None and self.deadline_s <= 0:
+            raise ValueError(f"Synth deadline must be positive, got: {self.deadline_s}")
+
+    @classmethod
+    def for_run(cls, run: DecisionRun) -> "SynthPolicy":
+        return cls(quorum=run.synth_quorum, deadline_s=run.synth_deadline_s)
+
+    @property
+    def waits_for_all(self) -> bool:
+        return self.quorum is None and self.deadline_s is None
+
+    def allows_start(self, done: int, fanout_at: Optional[datetime], now: datetime) -> bool:
+        """Whether the report agent may start with `done` inputs DONE and the rest still pending."""
+        if self.waits_for_all or done == 0:
+            return False
+        quorum_met = self.quorum is None or done >= self.quorum
+        if self.deadline_s is None:
+            return quorum_met
+        expired = fanout_at is not None and (now - fanout_at).total_seconds() >= self.deadline_s
+        return expired and quorum_met
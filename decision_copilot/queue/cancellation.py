@@ -0,0 +1,108 @@
+# coding: utf-8
+import logging
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from decision_copilot.cancellation import CancelToken
+from decision_copilot.queue.connection import agent_job_id, get_redis
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# Flags outlive any run by a wide margin; they only need to be seen by running jobs.
+CANCEL_FLAG_TTL_S = 24 * 3600
+POLL_INTERVAL_S = 0.5
+
+
+def cancel_flag_key(decision_run_id: int, agent_name: Optional[str] = None) -> str:
+    """The run's flag, or with `agent_name` the flag that stops only that agent."""
+    base = f"dc:cancel:{decision_run_id}"
+    return base if agent_name is None else f"{base}:{agent_name}"
+
+
+def signal_cancel(decision_run_id: int, queued_agents: Iterable[str]) -> int:
+    """
+    Set the run's cancellation flag (seen by running jobs within POLL_INTERVAL_S)
+    and remove the given agents' jobs from their queues. Returns the number of
+    jobs removed.
+    """
+    redis = get_redis()
+    redis.set(cancel_flag_key(decision_run_id), 1, ex=CANCEL_FLAG_TTL_S)
+    return _remove_queued_jobs(redis, decision_run_id, queued_agents)
+
+
+def signal_cancel_agents(decision_run_id: int, agent_names: Iterable[str], queued_agents: Iterable[str]) -> int:
+    """
+    Like `signal_cancel`, for some of the run's agents only (the rest of the run
+    goes on). Returns the number of jobs removed.
+    """
+    redis = get_redis()
+    with redis.pipeline(transaction=False) as pipe:
+        for name in agent_names:
+            pipe.set(cancel_flag_key(decision_run_id, name), 1, ex=CANCEL_FLAG_TTL_S)
+        pipe.execute()
+    return _remove_queued_jobs(redis, decision_run_id, queued_agents)
+
+
+def _remove_queued_jobs(redis: "Redis", decision_run_id: int, agent_names: Iterable[str]) -> int:
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job, JobStatus
+
+    removed = 0
+    for name in agent_names:
+        try:
+            job = Job.fetch(agent_job_id(decision_run_id, name), connection=redis)
+        except NoSuchJobError:
+            continue
+        if job.get_status() in (JobStatus.QUEUED, JobStatus.DEFERRED, JobStatus.SCHEDULED):
+            job.cancel()
+            removed += 1
+    return removed
+
+
+def _flag_keys(decision_run_id: int, agent_name: Optional[str]) -> list[str]:
+    keys = [cancel_flag_key(decision_run_id)]
+    if agent_name is not None:
+        keys.append(cancel_flag_key(decision_run_id, agent_name))
+    return keys
+
+
+def is_cancel_requested(decision_run_id: int, agent_name: Optional[str] = None) -> bool:
+    return bool(get_redis().exists(*_flag_keys(decision_run_id, agent_name)))
+
+
+@contextmanager
+def watch_cancellation(
+        decision_run_id: int,
+        agent_name: Optional[str] = None,
+        interval: float = POLL_INTERVAL_S,
+) -> Iterator[CancelToken]:
+    """
+    Yield a CancelToken that is canceled as soon as the run's Redis flag (or the
+    agent's own flag) appears. A daemon thread polls both with one EXISTS; Redis
+    errors are logged and polling continues.
+    """
+    token = CancelToken()
+    stop = threading.Event()
+    keys = _flag_keys(decision_run_id, agent_name)
+
+    def poll() -> None:
+        redis = get_redis()
+        while not stop.wait(interval):
+            try:
+                if redis.exists(*keys):
+                    token.cancel()
+                    return
+            except Exception:
+                logger.warning("Cancellation poll failed for run %s", decision_run_id, exc_info=True)
+
+    thread = threading.Thread(target=poll, name=f"cancel-watch-{decision_run_id}", daemon=True)
+    thread.start()
+    try:
+        yield token
+    finally:
+        stop.set()
+        thread.join(timeout=interval)
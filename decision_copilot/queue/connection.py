@@ -1,16 +1,82 @@
 # coding: utf-8
 import os
+import threading
+from typing import TYPE_CHECKING, Optional
 
-from redis import Redis
-from rq import Queue
+if TYPE_CHECKING:
+    from redis import Redis
+    from rq import Queue
 
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 QUEUE_NAME = os.environ.get("DECISION_COPILOT_QUEUE", "decision-copilot")
 
+# "direct": workers read and write SQLite themselves.
+# "stream": workers only publish agent events to Redis; scripts/persister.py is the
+# single SQLite writer and runs the orchestration callbacks.
+PERSISTENCE_MODES = ("direct", "stream")
+PERSISTENCE_MODE = os.environ.get("DECISION_COPILOT_PERSISTENCE", "direct")
+if PERSISTENCE_MODE not in PERSISTENCE_MODES:
+    raise ValueError(f"DECISION_COPILOT_PERSISTENCE must be one of {PERSISTENCE_MODES}, got: {PERSISTENCE_MODE}")
 
-def get_redis() -> Redis:
-    return Redis.from_url(REDIS_URL)
+# Agent jobs are routed to one queue per pipeline stage ("<QUEUE_NAME>-<stage>"),
+# so workers can drain jobs that finish runs before jobs that start new ones.
+# The bare QUEUE_NAME queue is still served for jobs enqueued before the split.
+STAGES = ("synth", "analysis", "planner")
 
+# redis/rq are imported on first use: read-only CLI commands import the orchestrator
+# (through DecisionService) but never touch the queue.
 
-def get_queue() -> Queue:
-    return Queue(name=QUEUE_NAME, connection=get_redis())
+
+def stage_for_agent(agent_name: str) -> str:
+    from decision_copilot.agents.registry import AGENT_SPECS, AUXILIARY_SPECS
+
+    spec = AGENT_SPECS.get(agent_name) or AUXILIARY_SPECS.get(agent_name)
+    return spec.stage if spec is not None else "analysis"
+
+
+def agent_job_id(decision_run_id: int, agent_name: str) -> str:
+    # Deterministic, so a run's queued jobs can be found (and removed) without bookkeeping.
+    return f"dc-{decision_run_id}-{agent_name}"
+
+
+def deadline_job_id(decision_run_id: int) -> str:
+    return f"dc-{decision_run_id}-synth-deadline"
+
+
+def ingest_job_id(chunk_id: int) -> str:
+    return f"dc-ingest-{chunk_id}"
+
+
+def queue_name_for_stage(stage: str) -> str:
+    if stage not in STAGES:
+        raise ValueError(f"Unknown queue stage: {stage}")
+    return f"{QUEUE_NAME}-{stage}"
+
+
+_redis: Optional["Redis"] = None
+_redis_lock = threading.Lock()
+
+
+def get_redis() -> "Redis":
+    """
+    The process-wide Redis client. Its connection pool is shared by every queue,
+    cancel check and event publish in the process (and is reset after a fork).
+    """
+    global _redis
+    with _redis_lock:
+        if _redis is None:
+            from redis import Redis
+
+            _redis = Redis.from_url(REDIS_URL)
+        return _redis
+
+
+def get_queue(stage: Optional[str] = None) -> "Queue":
+    from rq import Queue
+
+    name = QUEUE_NAME if stage is None else queue_name_for_stage(stage)
+    return Queue(name=name, connection=get_redis())
+
+
+def get_agent_queue(agent_name: str) -> "Queue":
+    return get_queue(stage_for_agent(agent_name))
@@ -0,0 +1,60 @@
+# coding: utf-8
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+import orjson
+
+from decision_copilot.queue.connection import QUEUE_NAME
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+# Agent state transitions published by workers in "stream" persistence mode and
+# applied to SQLite by the single persister process (scripts/persister.py).
+EVENT_STREAM = f"{QUEUE_NAME}:events"
+DEAD_LETTER_STREAM = f"{EVENT_STREAM}:dead"
+PERSISTER_GROUP = "persister"
+# Stable across restarts: entries read but not acknowledged before a crash are
+# pending on this consumer name and replayed by the next persister using it.
+PERSISTER_CONSUMER = os.environ.get("DECISION_COPILOT_PERSISTER_CONSUMER", "persister-1")
+
+# Bounds the stream; acknowledged entries are trimmed approximately.
+EVENT_STREAM_MAXLEN = 100_000
+
+# "deadline" is not an agent transition: a run's synth deadline passed (queue/tasks.py).
+EVENT_TYPES = ("started", "done", "failed", "canceled", "deadline")
+
+
+@dataclass(frozen=True)
+class AgentEvent:
+    type: str
+    decision_run_id: int
+    agent_name: str
+    ts: float
+    latency_ms: Optional[int] = None
+    agent_version: Optional[str] = None
+    model: Optional[str] = None
+    output: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    # {"key", "digest"}: a context digest the agent computed (orchestrator/context_digest.py).
+    context_digest: Optional[dict[str, Any]] = None
+
+    def to_fields(self) -> dict[str, bytes]:
+        return {"e": orjson.dumps(asdict(self))}
+
+    @classmethod
+    def from_fields(cls, fields: dict) -> "AgentEvent":
+        raw = fields.get(b"e", fields.get("e"))
+        data = orjson.loads(raw)
+        if data.get("type") not in EVENT_TYPES:
+            raise ValueError(f"Unknown agent event type: {data.get('type')}")
+        return cls(**data)
+
+
+def publish_event(redis: "Redis", event_type: str, decision_run_id: int, agent_name: str, **kwargs: Any) -> str:
+    event = AgentEvent(type=event_type, decision_run_id=decision_run_id, agent_name=agent_name,
+                       ts=time.time(), **kwargs)
+    entry_id = redis.xadd(EVENT_STREAM, event.to_fields(), maxlen=EVENT_STREAM_MAXLEN, approximate=True)
+    return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
@@ -0,0 +1,113 @@
+# coding: utf-8
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from decision_copilot.queue.connection import get_redis
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# A worker holds a lease on (run, agent) while it executes the agent and renews it
+# every LEASE_TTL_S / 3. A crashed worker's lease expires after LEASE_TTL_S; the
+# reaper (orchestrator/reaper.py) then requeues the agent.
+LEASE_TTL_S = int(os.environ.get("DECISION_COPILOT_LEASE_TTL_S", "30"))
+# A finished agent's lease is kept as a marker, so a redelivered job does not run it again.
+FINISHED_TTL_S = 24 * 3600
+_FINISHED = "finished"
+
+# Compare-and-set on the holder's token: a worker never touches a lease it lost.
+_RENEW = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('expire', KEYS[1], ARGV[2]) end return 0"
+_FINISH = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3]) and 1 end return 0"
+)
+_RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+def lease_key(decision_run_id: int, agent_name: str) -> str:
+    return f"dc:lease:{decision_run_id}:{agent_name}"
+
+
+class AgentLease:
+    """One worker's claim on executing an agent of a run."""
+
+    def __init__(self, redis: "Redis", decision_run_id: int, agent_name: str, ttl_s: int = LEASE_TTL_S):
+        self.redis = redis
+        self.key = lease_key(decision_run_id, agent_name)
+        self.token = uuid.uuid4().hex
+        self.ttl_s = ttl_s
+        self.lost = False
+
+    def acquire(self) -> bool:
+        return bool(self.redis.set(self.key, self.token, nx=True, ex=self.ttl_s))
+
+    def renew(self) -> bool:
+        if not self.redis.eval(_RENEW, 1, self.key, self.token, self.ttl_s):
+            self.lost = True
+        return not self.lost
+
+    def finish(self) -> None:
+        """Keep the lease as a marker that the agent finished (done, failed or canceled)."""
+        self.redis.eval(_FINISH, 1, self.key, self.token, _FINISHED, FINISHED_TTL_S)
+
+    def release(self) -> None:
+        self.redis.eval(_RELEASE, 1, self.key, self.token)
+
+
+@contextmanager
+def hold_lease(
+        decision_run_id: int,
+        agent_name: str,
+        ttl_s: int = LEASE_TTL_S,
+) -> Iterator[Optional[AgentLease]]:
+    """
+    Yield the agent's lease, renewed by a daemon thread until the block exits, or
+    `None` if another worker holds it or the agent already finished. The lease is
+    released on exit unless `finish()` was called. Redis errors while renewing are
+    logged and renewal continues.
+    """
+    lease = AgentLease(get_redis(), decision_run_id, agent_name, ttl_s)
+    if not lease.acquire():
+        yield None
+        return
+
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(ttl_s / 3):
+            try:
+                if not lease.renew():
+                    logger.warning("Lost the lease on %s; the agent may be requeued", lease.key)
+                    return
+            except Exception:
+                logger.warning("Lease renewal failed for %s", lease.key, exc_info=True)
+
+    thread = threading.Thread(target=heartbeat, name=f"lease-{decision_run_id}-{agent_name}", daemon=True)
+    thread.start()
+    try:
+        yield lease
+    finally:
+        stop.set()
+        thread.join(timeout=1.0)
+        try:
+            lease.release()
+        except Exception:
+            logger.warning("Could not release the lease on %s", lease.key, exc_info=True)
+
+
+def live_leases(redis: "Redis", agents: Iterable[tuple[int, str]]) -> set[tuple[int, str]]:
+    """The (run, agent) pairs that have a lease (held or finished), in one round trip."""
+    agents = list(agents)
+    if not agents:
+        return set()
+    with redis.pipeline(transaction=False) as pipe:
+        for run_id, name in agents:
+            pipe.exists(lease_key(run_id, name))
+        found = pipe.execute()
+    return {agent for agent, n in zip(agents, found) if n}
@@ -0,0 +1,60 @@
+# coding: utf-8
+import os
+from typing import Optional, Sequence
+
+from decision_copilot.queue.connection import STAGES
+
+# Default drain order: finish runs (synth) before widening them (analysis)
+# before starting new ones (planner).
+DEFAULT_STAGE_ORDER = STAGES
+DEFAULT_STARVATION_LIMIT = 20
+
+
+def parse_stage_order(value: Optional[str]) -> tuple[str, ...]:
+    """Parse a comma-separated stage order such as "synth,analysis,planner"."""
+    if not value:
+        return DEFAULT_STAGE_ORDER
+
+    order = tuple(s.strip() for s in value.split(",") if s.strip())
+    if sorted(order) != sorted(STAGES):
+        raise ValueError(f"Queue order must list each of {', '.join(STAGES)} exactly once, got: {value}")
+    return order
+
+
+class QueuePriorityPolicy:
+    """
+    Strict stage priority with starvation protection.
+
+    Stages are tried in `order`. Every dequeue counts as one "skip" for each stage
+    that was not served; a stage skipped `starvation_limit` times in a row is
+    tried first until it is served again, so a lower-priority job waits behind at
+    most `starvation_limit` other jobs once it reaches the head of its queue.
+    An empty starved stage costs nothing: the dequeue falls through to the next.
+    """
+
+    def __init__(self, order: Sequence[str] = DEFAULT_STAGE_ORDER,
+                 starvation_limit: int = DEFAULT_STARVATION_LIMIT) -> None:
+        if starvation_limit < 1:
+            raise ValueError("starvation_limit must be >= 1")
+        self.order = tuple(order)
+        self.starvation_limit = starvation_limit
+        self._skipped = {stage: 0 for stage in self.order}
+
+    @classmethod
+    def from_env(cls) -> "QueuePriorityPolicy":
+        return cls(
+            order=parse_stage_order(os.environ.get("DECISION_COPILOT_QUEUE_ORDER")),
+            starvation_limit=int(os.environ.get("DECISION_COPILOT_QUEUE_STARVATION_LIMIT",
+                                                DEFAULT_STARVATION_LIMIT)),
+        )
+
+    def ordered(self) -> list[str]:
+        """Stages in the order the next dequeue should try them."""
+        starved = [s for s in self.order if self._skipped[s] >= self.starvation_limit]
+        starved.sort(key=lambda s: -self._skipped[s])
+        return starved + [s for s in self.order if s not in starved]
+
+    def record(self, served: Optional[str]) -> None:
+        """Account for one dequeue from `served` (None: a job outside the staged queues)."""
+        for stage in self.order:
+            self._skipped[stage] = 0 if stage == served else self._skipped[stage] + 1
@@ -1,27 +1,51 @@
 # coding: utf-8
+import importlib
+import logging
 import time
-from typing import Any
+from dataclasses import replace
+from typing import Any, Optional
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
+from decision_copilot import metrics
 from decision_copilot.agents.base import AgentContext
-from decision_copilot.agents.cons import ConAgent
-from decision_copilot.agents.facts import FactsAgent
-from decision_copilot.agents.planner import PlannerAgent
-from decision_copilot.agents.pros import ProAgent
-from decision_copilot.agents.risks import RiskAgent
-from decision_copilot.agents.synth import SynthAgent
+from decision_copilot.agents.registry import (
+    AGENT_SPECS,
+    AGENT_VERSIONS,
+    AUXILIARY_SPECS,
+    DIGEST_AGENT,
+    INGEST_AGENT,
+    REPORT_AGENT,
+)
+from decision_copilot.cancellation import CancelToken, RunCanceled
 from decision_copilot.config import AppConfig
 from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory
-from decision_copilot.llm.client import DeepSeekClient
+from decision_copilot.llm.client import DeepSeekClient, DeepSeekConfig
+from decision_copilot.llm.routing import GenerationConfig, resolve_generation
 from decision_copilot.models import (
     AgentRun,
     AgentStatus,
+    ContextChunk,
+    ContextIngest,
     Decision,
     DecisionRun,
+    RunStatus,
+    utcnow,
 )
-from decision_copilot.orchestrator.orchestrator import Orchestrator
+from decision_copilot.orchestrator.context_digest import Digest, load_digest, store_digest
+from decision_copilot.orchestrator.ingest import Ingestion
+from decision_copilot.orchestrator.orchestrator import Orchestrator, load_agent_inputs
+from decision_copilot.orchestrator.summary import refresh_run_summary
+from decision_copilot.queue.cancellation import is_cancel_requested, watch_cancellation
+from decision_copilot.queue.connection import PERSISTENCE_MODE, get_redis
+from decision_copilot.queue.events import publish_event
+from decision_copilot.queue.leases import AgentLease, hold_lease
+
+logger = logging.getLogger(__name__)
+
+# Tries per ingestion chunk: one failed chunk fails the whole ingestion.
+CHUNK_ATTEMPTS = 2
 
 
 def _make_session_factory_from_config() -> Any:
@@ -30,28 +54,26 @@ def _make_session_factory_from_config() -> Any:
     return make_session_factory(engine)
 
 
-def _make_llm() -> DeepSeekClient:
+def _make_llm(cancel: Optional[CancelToken] = None, generation: Optional[GenerationConfig] = None) -> DeepSeekClient:
     # Reads DEEPSEEK_BASE_URL / DEEPSEEK_API_KEY / DEEPSEEK_MODEL from env.
-    return DeepSeekClient()
+    return DeepSeekClient(cancel=cancel, generation=generation)
 
 
-def _build_agent(agent_name: str) -> Any:
-    llm = _make_llm()
+def _build_agent(
+        agent_name: str,
+        cancel: Optional[CancelToken] = None,
+        generation: Optional[GenerationConfig] = None,
+) -> Any:
+    spec = AGENT_SPECS.get(agent_name) or AUXILIARY_SPECS.get(agent_name)
+    if spec is None:
+        raise ValueError(f"Unknown agent: {agent_name}")
 
-    if agent_name == "planner":
-        return PlannerAgent(llm)
-    if agent_name == "facts":
-        return FactsAgent(llm)
-    if agent_name == "pro":
-        return ProAgent(llm)
-    if agent_name == "con":
-        return ConAgent(llm)
-    if agent_name == "risk":
-        return RiskAgent(llm)
-    if agent_name == "synth":
-        return SynthAgent(llm)
+    module, _, cls = spec.factory.partition(":")
+    return getattr(importlib.import_module(module), cls)(_make_llm(cancel, generation))
 
-    raise ValueError(f"Unknown agent: {agent_name}")
+
+def _model_for(generation: GenerationConfig) -> Optional[str]:
+    return generation.model or DeepSeekConfig().model
 
 
 def run_agent(decision_run_id: int, agent_name: str) -> None:
@@ -59,13 +81,24 @@ def run_agent(decision_run_id: int, agent_name: str) -> None:
     RQ task: execute one agent for the given decision_run_id, persist status/output,
     then trigger orchestration callbacks.
 
-    This function must be idempotent enough to tolerate retries:
+    This function must be idempotent enough to tolerate retries and duplicate jobs:
+    - It runs under the agent's Redis lease (queue/leases.py); without it, it no-ops.
     - If the AgentRun row is missing, it no-ops.
+    - If the run already finished (e.g. canceled), it marks a queued agent CANCELED and no-ops.
+    - Only the worker whose conditional QUEUED -> RUNNING update succeeds executes the agent.
     - It always writes status transitions into SQLite.
     """
     SessionFactory = _make_session_factory_from_config()
 
-    with SessionFactory() as session:
+    with (
+        hold_lease(decision_run_id, agent_name) as lease,
+        SessionFactory() as session,
+    ):
+        if lease is None:
+            # Another worker is executing this agent, or it already finished.
+            metrics.DUPLICATE_JOBS_SKIPPED.inc(agent=agent_name, reason="lease")
+            return
+
         run = session.get(DecisionRun, decision_run_id)
         if run is None:
             return
@@ -78,75 +111,285 @@ def run_agent(decision_run_id: int, agent_name: str) -> None:
         if agent_run is None:
             return
 
-        # If already done, do not rerun implicitly.
-        if agent_run.status == AgentStatus.DONE:
+        # If already done, do not rerun implicitly; a canceled agent (e.g. skipped by
+        # the synth policy while queued) stays canceled.
+        if agent_run.status in (AgentStatus.DONE, AgentStatus.CANCELED):
             return
 
-        agent_run.status = AgentStatus.RUNNING
-        session.commit()
+        if run.status in Orchestrator.TERMINAL_RUN_STATUSES:
+            if agent_run.status == AgentStatus.QUEUED:
+                agent_run.status = AgentStatus.CANCELED
+                agent_run.error_message = f"Run {run.status.value} before agent started."
+                agent_run.finished_at = utcnow()
+                _commit(session, decision_run_id)
+            return
+
+        generation = resolve_generation(agent_name, run.mode)
+        if not _claim(session, agent_run, _model_for(generation)):
+            metrics.DUPLICATE_JOBS_SKIPPED.inc(agent=agent_name, reason="status")
+            return
+        _commit(session, decision_run_id)
 
         start = time.time()
         try:
-            agent = _build_agent(agent_name)
-
             ctx = AgentContext(
                 decision_id=decision.id,
                 decision_run_id=run.id,
                 question=decision.question,
                 context=decision.context,
             )
+            inputs = load_agent_inputs(session, run.id, AGENT_SPECS[agent_name].inputs)
 
-            inputs: dict[str, Any] = {}
-            if agent_name == "synth":
-                inputs = _load_downstream_outputs(session, decision_run_id)
+            with (
+                watch_cancellation(decision_run_id, agent_name) as cancel,
+                metrics.AGENTS_IN_FLIGHT.track(agent=agent_name),
+            ):
+                key = run.context_digest_key
+                if key:
+                    digest = load_digest(session, key)
+                    cached = digest is not None
+                    if not cached:
+                        digest = _make_digest(ctx, run.mode, cancel)
+                        if digest is not None:
+                            store_digest(session, key, digest)
+                            session.commit()
+                    ctx = _with_digest(ctx, agent_name, digest, cached)
+                output = _execute_agent(ctx, agent_name, inputs, cancel, generation)
 
-            output = agent.run(ctx, inputs)
+            if lease.lost:
+                # The reaper may have requeued the agent; its new execution records the result.
+                logger.warning("Discarding %s output of run %s: lease lost", agent_name, decision_run_id)
+                return
 
             agent_run.output = output
+            agent_run.agent_version = AGENT_VERSIONS.get(agent_name)
             agent_run.latency_ms = int((time.time() - start) * 1000)
             agent_run.status = AgentStatus.DONE
-            session.commit()
+            agent_run.finished_at = utcnow()
+            _record_agent(agent_name, AgentStatus.DONE, start)
+            _commit(session, decision_run_id)
+            lease.finish()
 
-            orch = Orchestrator(session)
-            orch.on_agent_done(decision_run_id, agent_name)
-            if agent_name == "synth":
-                orch.on_synth_done(decision_run_id)
+            Orchestrator(session).on_agent_done(decision_run_id, agent_name)
+
+        except RunCanceled as e:
+            # The orchestrator already moved the run to a terminal state (or skipped this agent).
+            agent_run.status = AgentStatus.CANCELED
+            agent_run.error_message = str(e)
+            agent_run.latency_ms = int((time.time() - start) * 1000)
+            agent_run.finished_at = utcnow()
+            _record_agent(agent_name, AgentStatus.CANCELED, start)
+            _commit(session, decision_run_id)
+            lease.finish()
 
         except Exception as e:
             agent_run.status = AgentStatus.FAILED
             agent_run.error_message = str(e)
             agent_run.latency_ms = int((time.time() - start) * 1000)
-            session.commit()
+            agent_run.finished_at = utcnow()
+            _record_agent(agent_name, AgentStatus.FAILED, start)
+            _commit(session, decision_run_id)
+            lease.finish()
 
             orch = Orchestrator(session)
             orch.on_agent_failed(decision_run_id, agent_name)
 
 
-def _get_agent_run(session: Session, decision_run_id: int, agent_name: str) -> AgentRun | None:
-    stmt = (
-        select(AgentRun)
-        .where(AgentRun.decision_run_id == decision_run_id, AgentRun.agent_name == agent_name)
-        .limit(1)
+def run_agent_detached(job: dict[str, Any]) -> None:
+    """
+    RQ task for "stream" persistence mode: execute one agent from a self-contained
+    job (question, context, cached context digest and input outputs included) and
+    publish its state transitions to the Redis event stream. Never touches SQLite;
+    the persister applies the events (storing a digest computed here) and runs the
+    orchestration callbacks. Runs under the agent's Redis lease, so a duplicate or
+    redelivered job no-ops.
+    """
+    decision_run_id = job["decision_run_id"]
+    agent_name = job["agent_name"]
+    with hold_lease(decision_run_id, agent_name) as lease:
+        if lease is None:
+            metrics.DUPLICATE_JOBS_SKIPPED.inc(agent=agent_name, reason="lease")
+            return
+        _run_detached(job, lease)
+        lease.finish()
+
+
+def _run_detached(job: dict[str, Any], lease: AgentLease) -> None:
+    decision_run_id = job["decision_run_id"]
+    agent_name = job["agent_name"]
+    redis = get_redis()
+
+    if is_cancel_requested(decision_run_id, agent_name):
+        publish_event(redis, "canceled", decision_run_id, agent_name, error="Run canceled before agent started.")
+        return
+
+    generation = resolve_generation(agent_name, job.get("mode"))
+    publish_event(redis, "started", decision_run_id, agent_name, model=_model_for(generation))
+
+    ctx = AgentContext(
+        decision_id=job["decision_id"],
+        decision_run_id=decision_run_id,
+        question=job["question"],
+        context=job["context"],
     )
-    return session.execute(stmt).scalars().first()
+
+    key = job.get("context_digest_key")
+    digest = Digest.from_dict(job["context_digest"]) if job.get("context_digest") else None
+    new_digest = None  # computed here; travels to the persister with whichever event comes next
+
+    start = time.time()
+    try:
+        with (
+            watch_cancellation(decision_run_id, agent_name) as cancel,
+            metrics.AGENTS_IN_FLIGHT.track(agent=agent_name),
+        ):
+            if key:
+                cached = digest is not None
+                if not cached:
+                    digest = new_digest = _make_digest(ctx, job.get("mode"), cancel)
+                ctx = _with_digest(ctx, agent_name, digest, cached)
+            output = _execute_agent(ctx, agent_name, job["inputs"], cancel, generation)
+    except RunCanceled as e:
+        _record_agent(agent_name, AgentStatus.CANCELED, start)
+        publish_event(redis, "canceled", decision_run_id, agent_name,
+                      latency_ms=int((time.time() - start) * 1000), error=str(e),
+                      context_digest=_digest_payload(key, new_digest))
+    except Exception as e:
+        _record_agent(agent_name, AgentStatus.FAILED, start)
+        publish_event(redis, "failed", decision_run_id, agent_name,
+                      latency_ms=int((time.time() - start) * 1000), error=str(e),
+                      context_digest=_digest_payload(key, new_digest))
+    else:
+        if lease.lost:
+            logger.warning("Discarding %s output of run %s: lease lost", agent_name, decision_run_id)
+            return
+        _record_agent(agent_name, AgentStatus.DONE, start)
+        publish_event(redis, "done", decision_run_id, agent_name,
+                      latency_ms=int((time.time() - start) * 1000),
+                      agent_version=AGENT_VERSIONS.get(agent_name), output=output,
+                      context_digest=_digest_payload(key, new_digest))
 
 
-def _load_downstream_outputs(session: Session, decision_run_id: int) -> dict[str, Any]:
+def check_synth_deadline(decision_run_id: int) -> None:
     """
-    Load DONE outputs from facts/pro/con/risk for synth.
-    Returns a dict keyed by agent name.
+    RQ task scheduled for a run's synth deadline (see orchestrator/synth_policy.py):
+    lets the report agent start without its stragglers if the policy allows it now.
+    In "stream" mode the check is handed to the persister, the only SQLite writer.
     """
+    if PERSISTENCE_MODE == "stream":
+        publish_event(get_redis(), "deadline", decision_run_id, REPORT_AGENT)
+        return
+
+    SessionFactory = _make_session_factory_from_config()
+    with SessionFactory() as session:
+        Orchestrator(session).on_deadline(decision_run_id)
+
+
+def summarize_chunk(chunk_id: int) -> None:
+    """
+    RQ task: take notes on one chunk of a context ingestion (orchestrator/ingest.py),
+    then let the ingestion advance. Reads and writes SQLite in both persistence
+    modes, so workers serving ingestion need DECISION_COPILOT_DB.
+    """
+    SessionFactory = _make_session_factory_from_config()
+
+    with SessionFactory() as session:
+        chunk = session.get(ContextChunk, chunk_id)
+        if chunk is None or chunk.status == AgentStatus.DONE:
+            return
+        ingest = session.get(ContextIngest, chunk.ingest_id)
+        if ingest is None or ingest.status != RunStatus.RUNNING:
+            return
+        decision = session.get(Decision, ingest.decision_id)
+        text = chunk.input["text"]
+
+        start = time.time()
+        for attempt in range(1, CHUNK_ATTEMPTS + 1):
+            try:
+                with metrics.AGENTS_IN_FLIGHT.track(agent=INGEST_AGENT):
+                    agent = _build_agent(INGEST_AGENT, generation=resolve_generation(INGEST_AGENT))
+                    summary = agent.run(decision.question, text, chunk.level)
+            except Exception as e:
+                if attempt < CHUNK_ATTEMPTS:
+                    logger.warning("Chunk %d failed (attempt %d); retrying: %s", chunk_id, attempt, e)
+                    continue
+                _record_agent(INGEST_AGENT, AgentStatus.FAILED, start)
+                Ingestion(session).on_chunk_failed(chunk_id, str(e))
+            else:
+                _record_agent(INGEST_AGENT, AgentStatus.DONE, start)
+                Ingestion(session).on_chunk_done(chunk_id, summary)
+                return
+
+
+def _execute_agent(
+        ctx: AgentContext,
+        agent_name: str,
+        inputs: dict[str, Any],
+        cancel: CancelToken,
+        generation: GenerationConfig,
+) -> dict[str, Any]:
+    agent = _build_agent(agent_name, cancel, generation)
+    output = agent.run(ctx, inputs)
+    # A cancel that lands after the last LLM call still discards the output.
+    cancel.raise_if_canceled()
+    return output
+
+
+def _claim(session: Session, agent_run: AgentRun, model: Optional[str]) -> bool:
+    """QUEUED -> RUNNING as one conditional UPDATE: of two workers racing for the row, one wins."""
+    claimed = session.execute(
+        update(AgentRun)
+        .where(AgentRun.id == agent_run.id, AgentRun.status == AgentStatus.QUEUED)
+        .values(status=AgentStatus.RUNNING, model=model, started_at=utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+    if claimed:
+        session.expire(agent_run)
+    else:
+        session.rollback()
+    return claimed
+
+
+def _make_digest(ctx: AgentContext, mode: Optional[str], cancel: CancelToken) -> Optional[Digest]:
+    """Condense the run's context; `None` (the agent reads the raw context) if that fails."""
+    try:
+        return _build_agent(DIGEST_AGENT, cancel, resolve_generation(DIGEST_AGENT, mode)).run(ctx)
+    except RunCanceled:
+        raise
+    except Exception:
+        logger.warning("Context digest failed; using the raw context", exc_info=True)
+        return None
+
+
+def _with_digest(ctx: AgentContext, agent_name: str, digest: Optional[Digest], cached: bool) -> AgentContext:
+    if digest is None:
+        return ctx
+    if cached:
+        metrics.CACHE_HITS.inc(cache="context_digest")
+    metrics.DIGEST_TOKENS_SAVED.inc(digest.saved_tokens, agent=agent_name)
+    return replace(ctx, context=digest.text)
+
+
+def _digest_payload(key: Optional[str], digest: Optional[Digest]) -> Optional[dict[str, Any]]:
+    return {"key": key, "digest": digest.to_dict()} if digest is not None else None
+
+
+def _commit(session: Session, decision_run_id: int) -> None:
+    # Keep Decision.run_summary in the same transaction as the status change.
+    refresh_run_summary(session, decision_run_id)
+    with metrics.DB_COMMIT.time(writer="worker"):
+        session.commit()
+
+
+def _record_agent(agent_name: str, status: AgentStatus, start: float) -> None:
+    metrics.AGENT_LATENCY.observe(time.time() - start, agent=agent_name, status=status.value)
+    metrics.AGENT_RUNS.inc(agent=agent_name, status=status.value)
+
+
+def _get_agent_run(session: Session, decision_run_id: int, agent_name: str) -> AgentRun | None:
     stmt = (
         select(AgentRun)
-        .where(
-            AgentRun.decision_run_id == decision_run_id,
-            AgentRun.status == AgentStatus.DONE,
-            AgentRun.agent_name.in_(["facts", "pro", "con", "risk"]),
-        )
+        .where(AgentRun.decision_run_id == decision_run_id, AgentRun.agent_name == agent_name)
+        .limit(1)
     )
-    rows = list(session.execute(stmt).scalars().all())
-
-    out: dict[str, Any] = {}
-    for r in rows:
-        out[r.agent_name] = r.output or {}
-    return out
+    return session.execute(stmt).scalars().first()
@@ -0,0 +1,32 @@
+# coding: utf-8
+from typing import Optional
+
+from rq import Queue
+from rq.worker import SimpleWorker
+
+from decision_copilot.queue.connection import QUEUE_NAME, queue_name_for_stage
+from decision_copilot.queue.priority import QueuePriorityPolicy
+
+
+class PriorityWorker(SimpleWorker):
+    """
+    `SimpleWorker` that listens on the per-stage queues and re-orders them after
+    every dequeue according to a `QueuePriorityPolicy`. The legacy single queue
+    is always tried last.
+    """
+
+    def __init__(self, *args, policy: Optional[QueuePriorityPolicy] = None, **kwargs) -> None:
+        self.policy = policy or QueuePriorityPolicy.from_env()
+        self._stage_by_queue = {queue_name_for_stage(s): s for s in self.policy.order}
+        kwargs.setdefault("queues", [*self._stage_by_queue, QUEUE_NAME])
+        super().__init__(*args, **kwargs)
+        self._apply_policy()
+
+    def reorder_queues(self, reference_queue: Queue) -> None:
+        self.policy.record(self._stage_by_queue.get(reference_queue.name))
+        self._apply_policy()
+
+    def _apply_policy(self) -> None:
+        by_name = {q.name: q for q in self.queues}
+        staged = [by_name[queue_name_for_stage(s)] for s in self.policy.ordered()]
+        self._ordered_queues = staged + [q for q in self.queues if q.name not in self._stage_by_queue]
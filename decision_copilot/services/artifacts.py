@@ -0,0 +1,39 @@
+# coding: utf-8
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from decision_copilot.models import Decision
+from decision_copilot.services.export_service import ExportFilter, iter_export_batches
+from decision_copilot.services.rendering import render_markdown
+
+# A finished report is read far more often than it changes: it is rendered once,
+# when its run completes, and stored as a blob on the decision:
+#
+#     {"markdown": "<rendered report>", "record": ExportRecord.to_dict()}
+#
+# The blob hash (SHA-256 of the canonical JSON) is the report's ETag. Starting a
+# new run clears the artifact, so it always describes the decision's latest run.
+
+
+def build_report_artifact(session: Session, decision_id: int) -> Optional[dict[str, Any]]:
+    """Render the decision's current state (flushed in `session`) into an artifact."""
+    batches = iter_export_batches(session, ExportFilter(decision_ids=[decision_id]), use_artifacts=False)
+    records = [r for batch in batches for r in batch]
+    if not records:
+        return None
+    record = records[0]
+    return {"markdown": render_markdown(record, record.agents), "record": record.to_dict()}
+
+
+def store_report_artifact(session: Session, decision: Decision) -> None:
+    session.flush()
+    decision.report_artifact = build_report_artifact(session, decision.id)
+
+
+def report_etag(session: Session, decision_id: int) -> Optional[str]:
+    """The ETag of the stored report, without loading it (None while there is none)."""
+    return session.execute(
+        select(Decision.report_artifact_hash).where(Decision.id == decision_id)
+    ).scalar_one_or_none()
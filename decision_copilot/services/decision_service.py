@@ -1,10 +1,13 @@
 # coding: utf-8
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
 
 from sqlalchemy import select, desc
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from decision_copilot import metrics
 from decision_copilot.models import (
     AgentRun,
     Decision,
@@ -12,17 +15,32 @@ from decision_copilot.models import (
     DecisionStatus,
     RunStatus,
 )
+from decision_copilot.orchestrator.context_digest import DigestPolicy, digest_key
 from decision_copilot.orchestrator.orchestrator import Orchestrator
+from decision_copilot.orchestrator.resume import ResumePolicy, copy_reused_outputs, plan_resume
+from decision_copilot.orchestrator.summary import refresh_run_summary
+from decision_copilot.orchestrator.synth_policy import SynthPolicy
+from decision_copilot.services.artifacts import report_etag
 
 
 @dataclass(frozen=True)
 class CreateDecisionResult:
     decision_id: int
+    chunks: int = 0  # context file chunks being ingested; 0 when the context was stored as is
 
 
 @dataclass(frozen=True)
 class StartRunResult:
     decision_run_id: int
+    reused_agents: tuple[str, ...] = ()
+    coalesced: bool = False  # an in-flight run was returned instead of starting a new one
+
+
+@dataclass(frozen=True)
+class CancelRunResult:
+    decision_run_id: int
+    canceled: bool
+    status: str
 
 
 class DecisionService:
@@ -46,20 +64,142 @@ class DecisionService:
         self.session.commit()
         return CreateDecisionResult(decision_id=decision.id)
 
-    def start_run(self, decision_id: int, mode: str = "default") -> StartRunResult:
+    def create_decision_from_file(
+            self,
+            question: str,
+            path: Path,
+            chunk_chars: Optional[int] = None,
+            max_context_chars: Optional[int] = None,
+    ) -> CreateDecisionResult:
+        """
+        Create a decision whose context is a UTF-8 text file. A file that fits in
+        `max_context_chars` becomes the context as is; a larger one is ingested by
+        map-reduce (see orchestrator/ingest.py) and the decision stays INGESTING
+        until its bounded context is ready.
+        """
+        # lazy import: ingestion pulls in the queue, which `create --context` never needs
+        from decision_copilot.orchestrator.ingest import DEFAULT_CHUNK_CHARS, DEFAULT_MAX_CONTEXT_CHARS, Ingestion
+
+        path = Path(path)
+        max_context_chars = max_context_chars or DEFAULT_MAX_CONTEXT_CHARS
+        if path.stat().st_size <= max_context_chars:
+            text = path.read_text(encoding="utf-8", errors="replace").strip()
+            return self.create_decision(question=question, context=text or None)
+
+        decision = Decision(question=question, status=DecisionStatus.INGESTING)
+        self.session.add(decision)
+        self.session.flush()
+        chunks = Ingestion(self.session).start(
+            decision, path, chunk_chars or DEFAULT_CHUNK_CHARS, max_context_chars)
+        return CreateDecisionResult(decision_id=decision.id, chunks=chunks)
+
+    def start_run(
+            self,
+            decision_id: int,
+            mode: str = "default",
+            resume: Optional[ResumePolicy] = None,
+            single_flight: bool = False,
+            synth_policy: Optional[SynthPolicy] = None,
+            context_digest: Optional[bool] = None,
+    ) -> StartRunResult:
+        """
+        Start a new run. With `resume`, current-version DONE outputs of earlier runs
+        are carried over and only failed/missing agents (and synth) are executed.
+
+        With `single_flight`, a QUEUED or RUNNING run of the same decision and mode
+        is returned (`coalesced=True`) instead of starting another one. Concurrent
+        starts are settled by the unique partial index on single-flight runs.
+
+        `synth_policy` lets the report agent start once a quorum of its inputs is
+        DONE and/or a deadline after fan-out has passed (see orchestrator/synth_policy.py).
+
+        `context_digest` makes the agents read a digest of the decision context,
+        condensed once and cached by context hash (see orchestrator/context_digest.py).
+        `None` leaves it to DECISION_COPILOT_DIGEST_MODES / _MIN_CHARS; an empty context
+        is never digested.
+        """
         decision = self._get_decision(decision_id)
+        if decision.status == DecisionStatus.INGESTING:
+            raise ValueError(f"Decision {decision_id} is still ingesting its context file")
+        if single_flight:
+            in_flight = self._find_in_flight(decision.id, mode)
+            if in_flight is not None:
+                return self._coalesced(in_flight, mode)
+
+        plan = plan_resume(self.session, decision.id, resume) if resume is not None else None
 
         run = DecisionRun(
             decision_id=decision.id,
             mode=mode,
             status=RunStatus.QUEUED,
+            single_flight=single_flight,
         )
+        if synth_policy is not None:
+            run.synth_quorum = synth_policy.quorum
+            run.synth_deadline_s = synth_policy.deadline_s
+        if context_digest is None:
+            context_digest = DigestPolicy.from_env().applies(mode, decision.context)
+        if context_digest and decision.context:
+            run.context_digest_key = digest_key(decision.question, decision.context)
         self.session.add(run)
         decision.status = DecisionStatus.RUNNING
+        decision.error_message = None
+        # The stored report describes the previous run; the new run renders its own.
+        decision.report_artifact = None
+        try:
+            self.session.flush()
+        except IntegrityError:
+            # Lost the race against a concurrent single-flight start.
+            self.session.rollback()
+            in_flight = self._find_in_flight(decision_id, mode) if single_flight else None
+            if in_flight is None:
+                raise
+            return self._coalesced(in_flight, mode)
+
+        reused: list[str] = []
+        if plan is not None:
+            reused = copy_reused_outputs(self.session, run, plan)
+
+        refresh_run_summary(self.session, run.id)
         self.session.commit()
 
         Orchestrator(self.session).start(run.id)
-        return StartRunResult(decision_run_id=run.id)
+        if reused:
+            metrics.CACHE_HITS.inc(len(reused), cache="resume")
+        return StartRunResult(decision_run_id=run.id, reused_agents=tuple(reused))
+
+    def _find_in_flight(self, decision_id: int, mode: str) -> Optional[DecisionRun]:
+        stmt = (
+            select(DecisionRun)
+            .where(
+                DecisionRun.decision_id == decision_id,
+                DecisionRun.mode == mode,
+                DecisionRun.status.in_((RunStatus.QUEUED, RunStatus.RUNNING)),
+            )
+            .order_by(desc(DecisionRun.id))
+            .limit(1)
+        )
+        return self.session.execute(stmt).scalars().first()
+
+    @staticmethod
+    def _coalesced(run: DecisionRun, mode: str) -> StartRunResult:
+        metrics.RUNS_COALESCED.inc(mode=mode)
+        return StartRunResult(decision_run_id=run.id, coalesced=True)
+
+    def cancel_run(self, decision_id: int, decision_run_id: Optional[int] = None) -> CancelRunResult:
+        """Cancel the given run of a decision (default: its latest run)."""
+        self._get_decision(decision_id)
+        if decision_run_id is None:
+            run = self.get_latest_run(decision_id)
+            if run is None:
+                raise ValueError(f"No run found for decision: {decision_id}")
+        else:
+            run = self.session.get(DecisionRun, decision_run_id)
+            if run is None or run.decision_id != decision_id:
+                raise ValueError(f"DecisionRun {decision_run_id} not found for decision: {decision_id}")
+
+        canceled = Orchestrator(self.session).cancel(run.id)
+        return CancelRunResult(decision_run_id=run.id, canceled=canceled, status=run.status.value)
 
     def get_decision(self, decision_id: int) -> Decision:
         return self._get_decision(decision_id)
@@ -82,59 +222,53 @@ class DecisionService:
         return list(self.session.execute(stmt).scalars().all())
 
     def get_status_snapshot(self, decision_id: int) -> dict:
-        decision = self._get_decision(decision_id)
-        run = self.get_latest_run(decision_id)
+        """
+        Read the status snapshot from the decision's denormalized run summary:
+        one narrow row, no run/agent-run queries and no output columns.
+        """
+        stmt = select(
+            Decision.id,
+            Decision.status,
+            Decision.question,
+            Decision.created_at,
+            Decision.updated_at,
+            Decision.run_summary,
+        ).where(Decision.id == decision_id)
+        row = self.session.execute(stmt).first()
+        if row is None:
+            raise ValueError(f"Decision not found: {decision_id}")
 
-        snapshot = {
+        summary = row.run_summary or {}
+        return {
             "decision": {
-                "id": decision.id,
-                "status": decision.status.value,
-                "question": decision.question,
-                "created_at": decision.created_at.isoformat(),
-                "updated_at": decision.updated_at.isoformat(),
+                "id": row.id,
+                "status": row.status.value,
+                "question": row.question,
+                "created_at": row.created_at.isoformat(),
+                "updated_at": row.updated_at.isoformat(),
             },
-            "latest_run": None,
-            "agent_runs": [],
-        }
-
-        if run is None:
-            return snapshot
-
-        agent_runs = self.get_agent_runs(run.id)
-
-        snapshot["latest_run"] = {
-            "id": run.id,
-            "mode": run.mode,
-            "status": run.status.value,
-            "created_at": run.created_at.isoformat(),
-            "updated_at": run.updated_at.isoformat(),
+            "latest_run": summary.get("latest_run"),
+            "agent_runs": summary.get("agent_runs", []),
         }
 
-        snapshot["agent_runs"] = [
-            {
-                "id": ar.id,
-                "agent_name": ar.agent_name,
-                "status": ar.status.value,
-                "latency_ms": ar.latency_ms,
-                "model": ar.model,
-                "error_message": ar.error_message,
-                "created_at": ar.created_at.isoformat(),
-                "updated_at": ar.updated_at.isoformat(),
-            }
-            for ar in agent_runs
-        ]
-
-        return snapshot
-
     def get_report(self, decision_id: int) -> dict:
+        """The final report; `etag` is set once the latest run completed and its report was stored."""
         decision = self._get_decision(decision_id)
         return {
             "decision_id": decision.id,
             "status": decision.status.value,
             "final_report": decision.final_report,
             "error_message": decision.error_message,
+            "etag": decision.report_artifact_hash,
         }
 
+    def get_report_etag(self, decision_id: int) -> Optional[str]:
+        """ETag of the stored report, read without loading the decision or any blob."""
+        etag = report_etag(self.session, decision_id)
+        if etag is None:
+            self._get_decision(decision_id)  # unknown ids still raise
+        return etag
+
     def _get_decision(self, decision_id: int) -> Decision:
         decision = self.session.get(Decision, decision_id)
         if decision is None:
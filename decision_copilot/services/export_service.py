@@ -0,0 +1,497 @@
+# coding: utf-8
+import csv
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO
+
+import orjson
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from decision_copilot.blob_store import decode_json
+from decision_copilot.models import AgentRun, Blob, Decision, DecisionRun
+from decision_copilot.services.rendering import render_markdown
+
+EXPORT_FORMATS = ("markdown", "jsonl", "csv")
+
+CSV_COLUMNS = [
+    "id",
+    "status",
+    "question",
+    "context",
+    "latest_run_id",
+    "latest_run_status",
+    "recommendation",
+    "confidence",
+    "rationale",
+    "facts",
+    "pros",
+    "cons",
+    "risks",
+    "updated_at",
+]
+
+
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    decision_ids: Optional[list[int]] = None
+    since: Optional[datetime] = None
+    status: Optional[str] = None
+    # Decision, one of its runs, or one of its agent runs was updated at/after this time.
+    changed_since: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class ExportRecord:
+    """
+    Plain, picklable snapshot of one decision and its latest run.
+
+    Attribute names mirror `Decision` so `render_markdown` accepts either.
+    """
+    id: int
+    question: str
+    context: Optional[str]
+    status: str
+    final_report: Optional[dict[str, Any]]
+    created_at: str
+    updated_at: str
+    latest_run: Optional[dict[str, Any]] = None
+    agents: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # Pre-rendered markdown from the decision's stored report artifact, if any.
+    markdown: Optional[str] = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "question": self.question,
+            "context": self.context,
+            "status": self.status,
+            "final_report": self.final_report,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "latest_run": self.latest_run,
+            "agents": self.agents,
+        }
+
+
+def parse_since(value: str) -> datetime:
+    """Parse an ISO date/datetime; aware values are normalized to naive UTC like the DB."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+# =========================
+# Streaming queries
+# =========================
+
+def iter_export_batches(
+        session: Session,
+        flt: ExportFilter,
+        *,
+        batch_size: int = 500,
+        use_artifacts: bool = True,
+) -> Iterator[list[ExportRecord]]:
+    """
+    Stream decisions matching `flt` in batches of `batch_size`.
+
+    Decisions are read with `yield_per` so only one batch is held in memory.
+    Decisions with a stored report artifact are served from it; for the rest,
+    latest runs and agent outputs are fetched with one set-based query each per batch.
+    """
+    report_blob = aliased(Blob)
+    artifact_blob = aliased(Blob)
+    stmt = (
+        select(
+            Decision.id,
+            Decision.question,
+            Decision.context,
+            Decision.status,
+            report_blob.codec.label("report_codec"),
+            report_blob.data.label("report_data"),
+            Decision.created_at,
+            Decision.updated_at,
+        )
+        .outerjoin(report_blob, report_blob.hash == Decision.final_report_hash)
+        .order_by(Decision.id)
+    )
+    if use_artifacts:
+        stmt = stmt.add_columns(
+            artifact_blob.codec.label("artifact_codec"),
+            artifact_blob.data.label("artifact_data"),
+        ).outerjoin(artifact_blob, artifact_blob.hash == Decision.report_artifact_hash)
+
+    if flt.decision_ids is not None:
+        stmt = stmt.where(Decision.id.in_(flt.decision_ids))
+    if flt.since is not None:
+        stmt = stmt.where(Decision.updated_at >= flt.since)
+    if flt.status:
+        stmt = stmt.where(Decision.status == flt.status)
+    if flt.changed_since is not None:
+        stmt = stmt.where(
+            or_(
+                Decision.updated_at >= flt.changed_since,
+                Decision.id.in_(
+                    select(DecisionRun.decision_id).where(DecisionRun.updated_at >= flt.changed_since)
+                ),
+                Decision.id.in_(
+                    select(AgentRun.decision_id).where(AgentRun.updated_at >= flt.changed_since)
+                ),
+            )
+        )
+
+    result = session.execute(stmt.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield _build_records(session, rows)
+
+
+def _build_records(session: Session, rows) -> list[ExportRecord]:
+    stored = {}
+    for r in rows:
+        if getattr(r, "artifact_data", None) is not None:
+            artifact = decode_json(r.artifact_codec, r.artifact_data)
+            stored[r.id] = ExportRecord(**artifact["record"], markdown=artifact["markdown"])
+    if stored:
+        built = iter(_query_records(session, [r for r in rows if r.id not in stored]))
+        return [stored[r.id] if r.id in stored else next(built) for r in rows]
+    return _query_records(session, rows)
+
+
+def _query_records(session: Session, rows) -> list[ExportRecord]:
+    ids = [r.id for r in rows]
+    if not ids:
+        return []
+
+    # Run ids are autoincrement, so max(id) is the latest run (same order as created_at).
+    latest = (
+        select(DecisionRun.decision_id, func.max(DecisionRun.id).label("run_id"))
+        .where(DecisionRun.decision_id.in_(ids))
+        .group_by(DecisionRun.decision_id)
+        .subquery()
+    )
+    run_rows = session.execute(
+        select(DecisionRun.id, DecisionRun.decision_id, DecisionRun.mode, DecisionRun.status)
+        .join(latest, DecisionRun.id == latest.c.run_id)
+    ).all()
+    runs_by_decision = {r.decision_id: r for r in run_rows}
+
+    agents_by_run: dict[int, dict[str, dict[str, Any]]] = {r.id: {} for r in run_rows}
+    if agents_by_run:
+        agent_rows = session.execute(
+            select(AgentRun.decision_run_id, AgentRun.agent_name, Blob.codec, Blob.data)
+            .outerjoin(Blob, Blob.hash == AgentRun.output_hash)
+            .where(AgentRun.decision_run_id.in_(list(agents_by_run)))
+        ).all()
+        for a in agent_rows:
+            output = decode_json(a.codec, a.data) if a.data is not None else None
+            agents_by_run[a.decision_run_id][a.agent_name] = output or {}
+
+    records = []
+    for r in rows:
+        run = runs_by_decision.get(r.id)
+        records.append(
+            ExportRecord(
+                id=r.id,
+                question=r.question,
+                context=r.context,
+                status=r.status.value,
+                final_report=decode_json(r.report_codec, r.report_data) if r.report_data is not None else None,
+                created_at=r.created_at.isoformat(),
+                updated_at=r.updated_at.isoformat(),
+                latest_run=(
+                    {"id": run.id, "mode": run.mode, "status": run.status.value}
+                    if run else None
+                ),
+                agents=agents_by_run.get(run.id, {}) if run else {},
+            )
+        )
+    return records
+
+
+# =========================
+# Rendering (process-pool safe)
+# =========================
+
+def render_record(fmt: str, record: ExportRecord) -> Any:
+    """Render one record; module-level so it can run in a worker process."""
+    if fmt == "markdown":
+        if record.markdown is not None:
+            return record.markdown
+        return render_markdown(record, record.agents)
+    if fmt == "jsonl":
+        return orjson.dumps(record.to_dict()).decode("utf-8")
+    if fmt == "csv":
+        return _csv_row(record)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def _csv_row(record: ExportRecord) -> list[Any]:
+    report = record.final_report if isinstance(record.final_report, dict) else {}
+    run = record.latest_run or {}
+    return [
+        record.id,
+        record.status,
+        record.question,
+        record.context or "",
+        run.get("id", ""),
+        run.get("status", ""),
+        report.get("recommendation", ""),
+        report.get("confidence", ""),
+        report.get("rationale", ""),
+        _join_items(record.agents.get("facts")),
+        _join_items(record.agents.get("pro")),
+        _join_items(record.agents.get("con")),
+        _join_items(record.agents.get("risk")),
+        record.updated_at,
+    ]
+
+
+def _join_items(data: dict | None) -> str:
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        return "\n".join(str(it) for it in data["items"])
+    return ""
+
+
+def render_batches(
+        batches: Iterator[list[ExportRecord]],
+        fmt: str,
+        *,
+        workers: int = 0,
+) -> Iterator[tuple[ExportRecord, Any]]:
+    """
+    Render batches in a process pool (or inline when workers <= 1).
+
+    Only one batch is in flight at a time, which bounds memory regardless of table size.
+    """
+    fn = partial(render_record, fmt)
+
+    if workers <= 1:
+        for batch in batches:
+            for record in batch:
+                yield record, fn(record)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in batches:
+            # Stored markdown needs no rendering; only ship the rest to the pool.
+            pending = [r for r in batch if not (fmt == "markdown" and r.markdown is not None)]
+            chunksize = max(1, len(pending) // (workers * 4))
+            rendered = pool.map(fn, pending, chunksize=chunksize) if pending else iter(())
+            for record in batch:
+                yield record, (record.markdown if fmt == "markdown" and record.markdown is not None
+                               else next(rendered))
+
+
+# =========================
+# Writers
+# =========================
+
+def markdown_filename(decision_id: int) -> str:
+    return f"decision-{decision_id}.md"
+
+
+def write_jsonl(out: TextIO, rendered: Iterator[tuple[ExportRecord, str]]) -> int:
+    n = 0
+    for _, line in rendered:
+        out.write(line)
+        out.write("\n")
+        n += 1
+    return n
+
+
+def write_csv(out: TextIO, rendered: Iterator[tuple[ExportRecord, list[Any]]]) -> int:
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    n = 0
+    for _, row in rendered:
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def write_markdown_dir(directory: Path, rendered: Iterator[tuple[ExportRecord, str]]) -> int:
+    directory.mkdir(parents=True, exist_ok=True)
+    n = 0
+    for record, markdown in rendered:
+        _write_file(directory / markdown_filename(record.id), markdown)
+        n += 1
+    return n
+
+
+def jsonl_tombstone(decision_id: int) -> str:
+    return orjson.dumps({"id": decision_id, "deleted": True}).decode("utf-8")
+
+
+def csv_tombstone(decision_id: int) -> list[Any]:
+    row: list[Any] = [""] * len(CSV_COLUMNS)
+    row[0] = decision_id
+    row[1] = "deleted"
+    return row
+
+
+def _write_file(path: Path, content: str) -> None:
+    # Write-then-rename so readers never observe a half-written report.
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+# =========================
+# Incremental export
+# =========================
+
+@dataclass
+class ExportManifest:
+    """
+    State of the last export: the watermark plus, per decision id,
+    `[updated_at, latest_run_id, content_hash]` of what was written.
+    """
+    format: str
+    watermark: Optional[str] = None
+    entries: dict[str, list[Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, fmt: str) -> "ExportManifest":
+        if not path.exists():
+            return cls(format=fmt)
+
+        data = orjson.loads(path.read_bytes())
+        # A manifest for another format (or version) cannot describe this output: start over.
+        if data.get("version") != MANIFEST_VERSION or data.get("format") != fmt:
+            return cls(format=fmt)
+
+        return cls(format=fmt, watermark=data.get("watermark"), entries=data.get("entries") or {})
+
+    def save(self, path: Path) -> None:
+        payload = orjson.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "format": self.format,
+                "watermark": self.watermark,
+                "entries": self.entries,
+            }
+        )
+        _atomic_write_bytes(path, payload)
+
+
+@dataclass(frozen=True)
+class IncrementalExportResult:
+    written: int
+    deleted: int
+    unchanged: int
+
+
+def default_manifest_path(fmt: str, output: Path) -> Path:
+    if fmt == "markdown":
+        return output / ".manifest.json"
+    return output.with_name(f"{output.name}.manifest.json")
+
+
+def content_hash(record: ExportRecord) -> str:
+    # updated_at is tracked separately; touching a row without changing content is not a change.
+    data = record.to_dict()
+    data.pop("updated_at", None)
+    return hashlib.blake2b(orjson.dumps(data, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def export_incremental(
+        session: Session,
+        fmt: str,
+        output: Path,
+        *,
+        manifest_path: Optional[Path] = None,
+        batch_size: int = 500,
+        workers: int = 0,
+) -> IncrementalExportResult:
+    """
+    Write only decisions whose content changed since the manifest's watermark.
+
+    - markdown: changed files are rewritten, removed decisions' files are deleted.
+    - jsonl/csv: `output` receives a delta of changed records plus tombstones.
+
+    The manifest is swapped atomically only after the output is complete, so a crash
+    re-exports the same delta on the next run instead of losing it.
+    """
+    manifest_path = manifest_path or default_manifest_path(fmt, output)
+    manifest = ExportManifest.load(manifest_path, fmt)
+
+    # Taken before scanning (DB clock): rows updated during this export are picked up next time.
+    started_at = session.execute(select(func.now())).scalar_one()
+
+    flt = ExportFilter()
+    if manifest.watermark:
+        # SQLite stores CURRENT_TIMESTAMP with second resolution; overlap by one second
+        # and let the content hash drop rows that were already exported.
+        flt = ExportFilter(changed_since=datetime.fromisoformat(manifest.watermark) - timedelta(seconds=1))
+
+    existing = set(session.execute(select(Decision.id)).scalars())
+    removed = sorted(int(k) for k in manifest.entries if int(k) not in existing)
+    del existing
+
+    updates: dict[str, list[Any]] = {}
+    unchanged = 0
+
+    def changed_batches() -> Iterator[list[ExportRecord]]:
+        nonlocal unchanged
+        for batch in iter_export_batches(session, flt, batch_size=batch_size):
+            changed = []
+            for record in batch:
+                h = content_hash(record)
+                entry = manifest.entries.get(str(record.id))
+                if entry and entry[2] == h:
+                    unchanged += 1
+                    continue
+                run_id = record.latest_run["id"] if record.latest_run else None
+                updates[str(record.id)] = [record.updated_at, run_id, h]
+                changed.append(record)
+            if changed:
+                yield changed
+
+    rendered = render_batches(changed_batches(), fmt, workers=workers)
+
+    if fmt == "markdown":
+        written = write_markdown_dir(output, rendered)
+        for decision_id in removed:
+            (output / markdown_filename(decision_id)).unlink(missing_ok=True)
+    else:
+        tmp = output.with_name(f".{output.name}.tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            if fmt == "jsonl":
+                written = write_jsonl(f, rendered)
+                for decision_id in removed:
+                    f.write(jsonl_tombstone(decision_id))
+                    f.write("\n")
+            else:
+                written = write_csv(f, rendered)
+                w = csv.writer(f)
+                for decision_id in removed:
+                    w.writerow(csv_tombstone(decision_id))
+        os.replace(tmp, output)
+
+    manifest.entries.update(updates)
+    for decision_id in removed:
+        manifest.entries.pop(str(decision_id), None)
+    manifest.watermark = started_at.isoformat()
+    manifest.save(manifest_path)
+
+    return IncrementalExportResult(written=written, deleted=len(removed), unchanged=unchanged)
+
+
+def _atomic_write_bytes(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
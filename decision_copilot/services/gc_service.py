@@ -0,0 +1,299 @@
+# coding: utf-8
+import gzip
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+from sqlalchemy import and_, exists, func, or_, select, delete
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from decision_copilot.blob_store import decode_json
+from decision_copilot.models import AgentRun, Blob, ContextChunk, Decision, DecisionRun, RunStatus
+
+# Every column that references blobs.hash; a blob is garbage once none of them do.
+BLOB_REFERENCES = (
+    AgentRun.output_hash,
+    Decision.final_report_hash,
+    Decision.report_artifact_hash,
+    ContextChunk.input_hash,
+)
+
+_INCREMENTAL_VACUUM_PAGES = 2000
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Which finished runs to expire. The latest run of a decision and in-flight
+    (queued/running) runs are never expired.
+    """
+    keep_last: int = 3
+    older_than_days: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class GCReport:
+    dry_run: bool
+    runs: int
+    agent_runs: int
+    blobs: int
+    blob_bytes: int
+    row_bytes: int
+    free_bytes: int
+    archive_path: Optional[str] = None
+    size_before: int = 0
+    size_after: int = 0
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        return self.blob_bytes + self.row_bytes + self.free_bytes
+
+
+def expired_runs_query(policy: RetentionPolicy, now: Optional[datetime] = None):
+    """Ids of runs expired by `policy`, ranked per decision with a window function."""
+    rn = func.row_number().over(
+        partition_by=DecisionRun.decision_id,
+        order_by=DecisionRun.id.desc(),
+    ).label("rn")
+    ranked = select(DecisionRun.id, DecisionRun.status, DecisionRun.created_at, rn).subquery()
+
+    cond = ranked.c.rn > max(policy.keep_last, 1)
+    if policy.older_than_days is not None:
+        cutoff = (now or _utcnow()) - timedelta(days=policy.older_than_days)
+        cond = or_(cond, and_(ranked.c.rn > 1, ranked.c.created_at < cutoff))
+
+    return (
+        select(ranked.c.id)
+        .where(cond, ranked.c.status.notin_([RunStatus.QUEUED, RunStatus.RUNNING]))
+        .order_by(ranked.c.id)
+    )
+
+
+def plan_gc(engine: Engine, policy: RetentionPolicy) -> GCReport:
+    """Dry run: what `run_gc` would delete and roughly how many bytes it would free."""
+    expired = expired_runs_query(policy).subquery()
+
+    with engine.connect() as conn:
+        runs = conn.execute(select(func.count()).select_from(expired)).scalar_one()
+        agent_runs = conn.execute(
+            select(func.count()).where(AgentRun.decision_run_id.in_(select(expired.c.id)))
+        ).scalar_one()
+
+        # Blobs referenced by expired agent runs and by nothing that survives, plus current orphans.
+        survivors = or_(
+            exists().where(
+                AgentRun.output_hash == Blob.hash,
+                AgentRun.decision_run_id.notin_(select(expired.c.id)),
+            ),
+            *[exists().where(col == Blob.hash) for col in BLOB_REFERENCES if col is not AgentRun.output_hash],
+        )
+        blobs, blob_bytes = conn.execute(
+            select(func.count(), func.coalesce(func.sum(func.length(Blob.data)), 0)).where(~survivors)
+        ).one()
+
+        row_bytes = (
+            runs * _avg_row_bytes(conn, DecisionRun.__tablename__)
+            + agent_runs * _avg_row_bytes(conn, AgentRun.__tablename__)
+        )
+        free_bytes = _freelist_bytes(conn)
+
+    return GCReport(
+        dry_run=True,
+        runs=runs,
+        agent_runs=agent_runs,
+        blobs=blobs,
+        blob_bytes=int(blob_bytes),
+        row_bytes=int(row_bytes),
+        free_bytes=free_bytes,
+    )
+
+
+def run_gc(
+        engine: Engine,
+        sqlite_path: Path,
+        policy: RetentionPolicy,
+        *,
+        archive_dir: Optional[Path] = None,
+        batch_size: int = 200,
+        vacuum: bool = False,
+) -> GCReport:
+    """
+    Expire runs per `policy` in bounded batches (one short write transaction each),
+    optionally archiving them to gzip-compressed JSONL first, then drop orphaned
+    blobs and compact the file.
+    """
+    plan = plan_gc(engine, policy)
+    size_before = _file_size(sqlite_path)
+
+    archive_path = None
+    archive = None
+    if archive_dir is not None and plan.runs:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = archive_dir / f"runs-{_utcnow():%Y%m%dT%H%M%S}.jsonl.gz"
+        archive = gzip.open(archive_path, "wb")
+
+    runs = agent_runs = 0
+    try:
+        while True:
+            with engine.begin() as conn:
+                run_ids = list(conn.execute(expired_runs_query(policy).limit(batch_size)).scalars())
+                if not run_ids:
+                    break
+
+                if archive is not None:
+                    _archive_runs(conn, archive, run_ids)
+                    archive.flush()
+
+                agent_runs += conn.execute(
+                    delete(AgentRun).where(AgentRun.decision_run_id.in_(run_ids))
+                ).rowcount
+                runs += conn.execute(delete(DecisionRun).where(DecisionRun.id.in_(run_ids))).rowcount
+    finally:
+        if archive is not None:
+            archive.close()
+
+    blobs, blob_bytes = _delete_orphan_blobs(engine, batch_size)
+    _compact(engine, vacuum=vacuum)
+
+    return GCReport(
+        dry_run=False,
+        runs=runs,
+        agent_runs=agent_runs,
+        blobs=blobs,
+        blob_bytes=blob_bytes,
+        row_bytes=plan.row_bytes,
+        free_bytes=plan.free_bytes,
+        archive_path=str(archive_path) if archive_path else None,
+        size_before=size_before,
+        size_after=_file_size(sqlite_path),
+    )
+
+
+def _archive_runs(conn: Connection, archive, run_ids: list[int]) -> None:
+    runs = conn.execute(
+        select(
+            DecisionRun.id,
+            DecisionRun.decision_id,
+            DecisionRun.mode,
+            DecisionRun.status,
+            DecisionRun.required_agents,
+            DecisionRun.error_message,
+            DecisionRun.created_at,
+            DecisionRun.updated_at,
+        ).where(DecisionRun.id.in_(run_ids))
+    ).all()
+
+    agents_by_run: dict[int, list[dict[str, Any]]] = {r.id: [] for r in runs}
+    agent_rows = conn.execute(
+        select(
+            AgentRun.id,
+            AgentRun.decision_run_id,
+            AgentRun.agent_name,
+            AgentRun.status,
+            AgentRun.model,
+            AgentRun.latency_ms,
+            AgentRun.error_message,
+            AgentRun.created_at,
+            AgentRun.updated_at,
+            Blob.codec,
+            Blob.data,
+        )
+        .outerjoin(Blob, Blob.hash == AgentRun.output_hash)
+        .where(AgentRun.decision_run_id.in_(run_ids))
+        .order_by(AgentRun.id)
+    ).all()
+    for a in agent_rows:
+        agents_by_run[a.decision_run_id].append(
+            {
+                "id": a.id,
+                "agent_name": a.agent_name,
+                "status": a.status.value,
+                "model": a.model,
+                "latency_ms": a.latency_ms,
+                "error_message": a.error_message,
+                "output": decode_json(a.codec, a.data) if a.data is not None else None,
+                "created_at": a.created_at.isoformat(),
+                "updated_at": a.updated_at.isoformat(),
+            }
+        )
+
+    for r in runs:
+        line = {
+            "id": r.id,
+            "decision_id": r.decision_id,
+            "mode": r.mode,
+            "status": r.status.value,
+            "required_agents": r.required_agents,
+            "error_message": r.error_message,
+            "created_at": r.created_at.isoformat(),
+            "updated_at": r.updated_at.isoformat(),
+            "agent_runs": agents_by_run[r.id],
+        }
+        archive.write(orjson.dumps(line) + b"\n")
+
+
+def _delete_orphan_blobs(engine: Engine, batch_size: int) -> tuple[int, int]:
+    orphan = ~or_(*[exists().where(col == Blob.hash) for col in BLOB_REFERENCES])
+
+    n = nbytes = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(Blob.hash, func.length(Blob.data)).where(orphan).limit(batch_size)
+            ).all()
+            if not rows:
+                return n, nbytes
+            conn.execute(delete(Blob).where(Blob.hash.in_([h for h, _ in rows])))
+            n += len(rows)
+            nbytes += sum(size for _, size in rows)
+
+
+def _compact(engine: Engine, *, vacuum: bool) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if vacuum:
+            # A full VACUUM also switches the file to incremental mode for future runs.
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+        elif conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            # Release free pages in small steps so each step holds the write lock briefly.
+            free = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            while free:
+                conn.exec_driver_sql(f"PRAGMA incremental_vacuum({_INCREMENTAL_VACUUM_PAGES})")
+                remaining = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                if remaining >= free:
+                    break
+                free = remaining
+
+        conn.exec_driver_sql("PRAGMA optimize")
+
+
+def _avg_row_bytes(conn: Connection, table: str) -> float:
+    # dbstat is optional in SQLite builds; fall back to a rough per-row estimate.
+    try:
+        used = conn.exec_driver_sql(
+            "SELECT sum(pgsize - unused) FROM dbstat WHERE name = ?", (table,)
+        ).scalar()
+    except OperationalError:
+        return 120.0
+
+    rows = conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+    return (used or 0) / rows if rows else 0.0
+
+
+def _freelist_bytes(conn: Connection) -> int:
+    pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+    return int(pages * page_size)
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, matching SQLite CURRENT_TIMESTAMP values.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _file_size(path: Path) -> int:
+    path = path.expanduser()
+    return path.stat().st_size if path.exists() else 0
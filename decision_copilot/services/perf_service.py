@@ -0,0 +1,288 @@
+# coding: utf-8
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.engine import Connection
+
+from decision_copilot.agents.registry import REPORT_AGENT
+from decision_copilot.models import AgentRun, AgentStatus, ContextDigest, DecisionRun, RunStatus
+from decision_copilot.orchestrator.dag import AGENT_GRAPH, AgentGraph
+
+# Everything is computed in SQLite (window functions, one pass per section) so the
+# report stays fast on millions of agent runs; only aggregated rows reach Python.
+# Rows without enqueued/started/finished timestamps (older rows, reused outputs)
+# are left out.
+
+GROUP_KEYS = ("agent", "mode", "window")
+WINDOW_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+PERCENTILES = (0.5, 0.9, 0.99)
+
+_MS_PER_DAY = 86_400_000.0
+
+
+@dataclass(frozen=True)
+class PerfQuery:
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    group_by: tuple[str, ...] = ("agent",)
+    window: str = "day"
+
+    def __post_init__(self):
+        unknown = [k for k in self.group_by if k not in GROUP_KEYS]
+        if unknown or not self.group_by:
+            raise ValueError(f"group_by must be a non-empty subset of {GROUP_KEYS}, got {self.group_by}")
+        if self.window not in WINDOW_FORMATS:
+            raise ValueError(f"window must be one of {tuple(WINDOW_FORMATS)}, got {self.window}")
+
+
+@dataclass(frozen=True)
+class LatencyRow:
+    group: dict[str, Any]
+    count: int
+    wait_ms: dict[float, float]  # percentile -> value
+    exec_ms: dict[float, float]
+
+
+@dataclass(frozen=True)
+class CriticalPathRow:
+    agent: str
+    runs_on_path: int
+    share_of_runs: float  # fraction of completed runs where this agent was on the critical path
+    share_of_time: float  # fraction of all critical-path time spent in this agent (wait + execution)
+    avg_wait_ms: float
+    avg_exec_ms: float
+
+
+@dataclass(frozen=True)
+class ThroughputRow:
+    window: str
+    agent_runs: int
+    failed: int
+    runs_completed: int
+
+
+@dataclass(frozen=True)
+class DigestRow:
+    mode: str
+    runs: int
+    agent_runs: int  # executions that read the digest instead of the raw context
+    tokens_saved: int
+
+
+@dataclass(frozen=True)
+class PerfReport:
+    query: PerfQuery
+    latency: list[LatencyRow] = field(default_factory=list)
+    critical_path: list[CriticalPathRow] = field(default_factory=list)
+    critical_path_runs: int = 0
+    throughput: list[ThroughputRow] = field(default_factory=list)
+    context_digest: list[DigestRow] = field(default_factory=list)
+
+
+def perf_report(conn: Connection, query: PerfQuery, graph: AgentGraph = AGENT_GRAPH) -> PerfReport:
+    latency = latency_percentiles(conn, query)
+    critical, runs = critical_path_attribution(conn, query, graph)
+    return PerfReport(
+        query=query,
+        latency=latency,
+        critical_path=critical,
+        critical_path_runs=runs,
+        throughput=throughput(conn, query),
+        context_digest=digest_savings(conn, query),
+    )
+
+
+def _wait_ms():
+    return (func.julianday(AgentRun.started_at) - func.julianday(AgentRun.enqueued_at)) * _MS_PER_DAY
+
+
+def _exec_ms():
+    return (func.julianday(AgentRun.finished_at) - func.julianday(AgentRun.started_at)) * _MS_PER_DAY
+
+
+def _in_range(query: PerfQuery) -> list:
+    cond = [AgentRun.finished_at.is_not(None)]
+    if query.since is not None:
+        cond.append(AgentRun.finished_at >= query.since)
+    if query.until is not None:
+        cond.append(AgentRun.finished_at < query.until)
+    return cond
+
+
+def _timed(query: PerfQuery) -> list:
+    """Executed (not reused) agent runs with full timestamps, finished inside the time range."""
+    return [AgentRun.enqueued_at.is_not(None), AgentRun.started_at.is_not(None), *_in_range(query)]
+
+
+def latency_percentiles(conn: Connection, query: PerfQuery) -> list[LatencyRow]:
+    """
+    p50/p90/p99 of queue wait and execution time of DONE agent runs per group.
+    A percentile is the smallest value whose cume_dist() within the group reaches it.
+    """
+    keys = {
+        "agent": AgentRun.agent_name,
+        "mode": DecisionRun.mode,
+        "window": func.strftime(WINDOW_FORMATS[query.window], AgentRun.finished_at),
+    }
+    base = (
+        select(
+            *[keys[k].label(k) for k in query.group_by],
+            _wait_ms().label("wait_ms"),
+            _exec_ms().label("exec_ms"),
+        )
+        .join(DecisionRun, DecisionRun.id == AgentRun.decision_run_id)
+        .where(*_timed(query), AgentRun.status == AgentStatus.DONE)
+        .subquery()
+    )
+    group_cols = [base.c[k] for k in query.group_by]
+    ranked = select(
+        *group_cols,
+        base.c.wait_ms,
+        base.c.exec_ms,
+        func.cume_dist().over(partition_by=group_cols, order_by=base.c.wait_ms).label("wait_cd"),
+        func.cume_dist().over(partition_by=group_cols, order_by=base.c.exec_ms).label("exec_cd"),
+    ).subquery()
+
+    rgroup = [ranked.c[k] for k in query.group_by]
+    pcols = []
+    for p in PERCENTILES:
+        pcols.append(func.min(case((ranked.c.wait_cd >= p, ranked.c.wait_ms))))
+        pcols.append(func.min(case((ranked.c.exec_cd >= p, ranked.c.exec_ms))))
+    stmt = select(*rgroup, func.count(), *pcols).group_by(*rgroup).order_by(*rgroup)
+
+    out = []
+    n = len(query.group_by)
+    for row in conn.execute(stmt):
+        values = row[n + 1:]
+        out.append(
+            LatencyRow(
+                group=dict(zip(query.group_by, row[:n])),
+                count=row[n],
+                wait_ms={p: values[2 * i] for i, p in enumerate(PERCENTILES)},
+                exec_ms={p: values[2 * i + 1] for i, p in enumerate(PERCENTILES)},
+            )
+        )
+    return out
+
+
+def agent_layers(graph: AgentGraph) -> dict[str, int]:
+    """Dependency depth of each agent (0 for agents without inputs)."""
+    depth: dict[str, int] = {}
+    for name in graph.order:
+        inputs = graph.specs[name].inputs
+        depth[name] = 1 + max(depth[d] for d in inputs) if inputs else 0
+    return depth
+
+
+def critical_path_attribution(
+        conn: Connection,
+        query: PerfQuery,
+        graph: AgentGraph = AGENT_GRAPH,
+) -> tuple[list[CriticalPathRow], int]:
+    """
+    Which agents the completed runs waited on. Per run and dependency layer, the
+    agent that finished last gated the next layer (exact for the layered built-in
+    graph), so it is on the run's critical path. Returns the rows and the number of
+    runs considered.
+    """
+    layer = case(agent_layers(graph), value=AgentRun.agent_name, else_=-1)
+    base = (
+        select(
+            AgentRun.decision_run_id,
+            AgentRun.agent_name,
+            _wait_ms().label("wait_ms"),
+            _exec_ms().label("exec_ms"),
+            func.row_number().over(
+                partition_by=(AgentRun.decision_run_id, layer),
+                order_by=AgentRun.finished_at.desc(),
+            ).label("rn"),
+        )
+        .join(DecisionRun, DecisionRun.id == AgentRun.decision_run_id)
+        .where(*_timed(query), AgentRun.status == AgentStatus.DONE, DecisionRun.status == RunStatus.DONE)
+        .subquery()
+    )
+    # Referenced twice, so SQLite materializes the CTE and scans agent_runs once.
+    on_path = select(base).where(base.c.rn == 1).cte("on_path")
+    runs_total = select(func.count(func.distinct(on_path.c.decision_run_id))).scalar_subquery()
+    rows = conn.execute(
+        select(
+            on_path.c.agent_name,
+            func.count(),
+            func.avg(on_path.c.wait_ms),
+            func.avg(on_path.c.exec_ms),
+            func.sum(on_path.c.wait_ms + on_path.c.exec_ms),
+            runs_total,
+        )
+        .group_by(on_path.c.agent_name)
+    ).all()
+
+    runs = rows[0][5] if rows else 0
+    total = sum(r[4] or 0.0 for r in rows) or 1.0
+    out = [
+        CriticalPathRow(
+            agent=name,
+            runs_on_path=count,
+            share_of_runs=count / runs if runs else 0.0,
+            share_of_time=(time_ms or 0.0) / total,
+            avg_wait_ms=avg_wait or 0.0,
+            avg_exec_ms=avg_exec or 0.0,
+        )
+        for name, count, avg_wait, avg_exec, time_ms, _ in rows
+    ]
+    out.sort(key=lambda r: -r.share_of_time)
+    return out, runs
+
+
+def throughput(conn: Connection, query: PerfQuery) -> list[ThroughputRow]:
+    """Agent runs finished, failed, and runs completed (report agent DONE) per time window."""
+    bucket = func.strftime(WINDOW_FORMATS[query.window], AgentRun.finished_at).label("window")
+
+    stmt = (
+        select(
+            bucket,
+            func.count(),
+            func.sum(case((AgentRun.status == AgentStatus.FAILED, 1), else_=0)),
+            func.sum(case(((AgentRun.agent_name == REPORT_AGENT) & (AgentRun.status == AgentStatus.DONE), 1),
+                          else_=0)),
+        )
+        .where(*_in_range(query))
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    return [ThroughputRow(window=w, agent_runs=n, failed=f, runs_completed=c) for w, n, f, c in conn.execute(stmt)]
+
+
+def digest_savings(conn: Connection, query: PerfQuery) -> list[DigestRow]:
+    """
+    Prompt tokens saved by runs whose agents read a context digest, per mode: each
+    executed agent saves the digest call's prompt tokens minus its completion tokens
+    (about 4 characters per token when the call reported no usage).
+    """
+    per_call = func.coalesce(
+        ContextDigest.context_tokens - ContextDigest.digest_tokens,
+        (ContextDigest.context_chars - ContextDigest.digest_chars) / 4,
+    )
+    stmt = (
+        select(
+            DecisionRun.mode,
+            func.count(func.distinct(AgentRun.decision_run_id)),
+            func.count(),
+            func.sum(func.max(per_call, 0)),
+        )
+        .join(DecisionRun, DecisionRun.id == AgentRun.decision_run_id)
+        .join(ContextDigest, ContextDigest.key == DecisionRun.context_digest_key)
+        .where(*_timed(query))
+        .group_by(DecisionRun.mode)
+        .order_by(DecisionRun.mode)
+    )
+    return [
+        DigestRow(mode=mode, runs=runs, agent_runs=n, tokens_saved=int(saved or 0))
+        for mode, runs, n, saved in conn.execute(stmt)
+    ]
@@ -0,0 +1,270 @@
+# coding: utf-8
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from decision_copilot import metrics
+from decision_copilot.models import AgentRun, AgentStatus
+from decision_copilot.orchestrator.context_digest import Digest, store_digest
+from decision_copilot.orchestrator.orchestrator import Orchestrator
+from decision_copilot.orchestrator.reaper import REAP_INTERVAL_S, LeaseReaper
+from decision_copilot.orchestrator.summary import refresh_run_summary
+from decision_copilot.queue.events import (
+    DEAD_LETTER_STREAM,
+    EVENT_STREAM,
+    PERSISTER_CONSUMER,
+    PERSISTER_GROUP,
+    AgentEvent,
+)
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+_FINISHED = (AgentStatus.DONE, AgentStatus.FAILED, AgentStatus.CANCELED)
+
+# Entries pending this long on another consumer (e.g. a persister that ran under
+# another name) are claimed; checked at startup and every CLAIM_INTERVAL_S.
+CLAIM_IDLE_MS = 60_000
+CLAIM_INTERVAL_S = 30.0
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    events: int
+    applied: int
+    dead_lettered: int = 0
+    retried: int = 0  # left unacknowledged after a transient database error
+
+
+class EventPersister:
+    """
+    Single SQLite writer for "stream" persistence mode.
+
+    Reads agent events from the Redis stream through a consumer group, applies a
+    whole batch (status transitions, outputs and the orchestration callbacks they
+    trigger) in one transaction, then enqueues follow-up jobs and acknowledges the
+    entries. Events are idempotent: an event for an agent that already finished is
+    ignored, so redelivery after a crash is safe. An event that fails with a
+    transient database error (SQLite locked by another writer, such as `start_run`)
+    stays unacknowledged and is replayed; other failures go to the dead-letter stream.
+
+    Being the only SQLite writer, it also runs the lease reaper every
+    `reap_interval_s` (orchestrator/reaper.py); 0 disables it.
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker[Session],
+            redis: "Redis",
+            *,
+            consumer: str = PERSISTER_CONSUMER,
+            batch_size: int = 200,
+            block_ms: int = 1000,
+            reap_interval_s: float = REAP_INTERVAL_S,
+    ):
+        self.session_factory = session_factory
+        self.redis = redis
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.reap_interval_s = reap_interval_s
+
+    def ensure_group(self) -> None:
+        from redis.exceptions import ResponseError
+
+        try:
+            self.redis.xgroup_create(EVENT_STREAM, PERSISTER_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        self.ensure_group()
+
+        # Entries delivered to this consumer before a crash come first ("0"), then new ones (">").
+        cursor = "0"
+        next_claim = 0.0
+        next_reap = time.monotonic() + self.reap_interval_s
+        while stop is None or not stop.is_set():
+            if time.monotonic() >= next_claim:
+                if self.claim_stranded():
+                    cursor = "0"
+                next_claim = time.monotonic() + CLAIM_INTERVAL_S
+            if self.reap_interval_s > 0 and time.monotonic() >= next_reap:
+                self.reap()
+                next_reap = time.monotonic() + self.reap_interval_s
+
+            resp = self.redis.xreadgroup(
+                PERSISTER_GROUP,
+                self.consumer,
+                {EVENT_STREAM: cursor},
+                count=self.batch_size,
+                block=None if cursor == "0" else self.block_ms,
+            )
+            entries = resp[0][1] if resp else []
+            if not entries:
+                cursor = ">"
+                continue
+
+            res = self.process(entries)
+            logger.info(
+                "Applied %d/%d events (%d dead-lettered, %d to retry)",
+                res.applied, res.events, res.dead_lettered, res.retried,
+            )
+            if res.retried:
+                # Replay the pending entries after a pause, while the other writer finishes.
+                cursor = "0"
+                time.sleep(self.block_ms / 1000)
+
+    def claim_stranded(self) -> int:
+        """
+        Take over entries another consumer read but never acknowledged, so they are
+        replayed with this consumer's own pending entries. Returns how many were claimed.
+        """
+        claimed = 0
+        start = "0-0"
+        while True:
+            start, entries, *_ = self.redis.xautoclaim(
+                EVENT_STREAM, PERSISTER_GROUP, self.consumer, CLAIM_IDLE_MS, start_id=start, count=self.batch_size,
+            )
+            claimed += len(entries)
+            if start in (b"0-0", "0-0"):
+                break
+        if claimed:
+            logger.warning("Claimed %d stranded events from other consumers", claimed)
+        return claimed
+
+    def reap(self) -> list[tuple[int, str]]:
+        """Requeue agents whose worker died; errors are logged, the next round retries."""
+        try:
+            with self.session_factory() as session:
+                return LeaseReaper(session, self.redis).reap()
+        except Exception:
+            logger.exception("Lease reaper failed")
+            return []
+
+    def process(self, entries: list[tuple]) -> BatchResult:
+        """Apply one batch as a group transaction; fall back to one-by-one if it fails."""
+        ids = [entry_id for entry_id, _ in entries]
+        retry: list = []
+        try:
+            applied, orch = self._apply(entries)
+            result, orchestrators = BatchResult(events=len(entries), applied=applied), [orch]
+        except Exception:
+            logger.exception("Batch of %d events failed; retrying one by one", len(entries))
+            applied, dead, orchestrators, retry = self._apply_individually(entries)
+            result = BatchResult(events=len(entries), applied=applied, dead_lettered=dead, retried=len(retry))
+
+        # Only after the commit: follow-up jobs must see their AgentRun rows. A failure
+        # here propagates before the ack, so the entries are redelivered (as no-ops).
+        for orch in orchestrators:
+            orch.publish()
+        ack = [entry_id for entry_id in ids if entry_id not in retry]
+        if ack:
+            self.redis.xack(EVENT_STREAM, PERSISTER_GROUP, *ack)
+        return result
+
+    def _apply_individually(self, entries: list[tuple]) -> tuple[int, int, list[Orchestrator], list]:
+        applied = dead = 0
+        orchestrators, retry = [], []
+        for entry_id, fields in entries:
+            try:
+                count, orch = self._apply([(entry_id, fields)])
+            except OperationalError as e:
+                if not _is_transient(e):
+                    dead += self._dead_letter(entry_id, fields, e)
+                    continue
+                logger.warning("Event %s hit a transient database error; will retry: %s", entry_id, e.orig)
+                retry.append(entry_id)
+            except Exception as e:
+                dead += self._dead_letter(entry_id, fields, e)
+            else:
+                applied += count
+                orchestrators.append(orch)
+        return applied, dead, orchestrators, retry
+
+    def _dead_letter(self, entry_id, fields: dict, error: Exception) -> int:
+        logger.exception("Dead-lettering event %s", entry_id)
+        self.redis.xadd(DEAD_LETTER_STREAM, {**fields, "id": entry_id, "error": str(error)[:1000]})
+        return 1
+
+    def _apply(self, entries: list[tuple]) -> tuple[int, Orchestrator]:
+        with self.session_factory() as session:
+            orch = Orchestrator(session, defer_commit=True)
+            touched: set[int] = set()
+            applied = 0
+            for _, fields in entries:
+                event = AgentEvent.from_fields(fields)
+                if self._apply_event(session, orch, event):
+                    applied += 1
+                    touched.add(event.decision_run_id)
+
+            for run_id in sorted(touched):
+                refresh_run_summary(session, run_id)
+            with metrics.DB_COMMIT.time(writer="persister"):
+                session.commit()
+        return applied, orch
+
+    def _apply_event(self, session: Session, orch: Orchestrator, event: AgentEvent) -> bool:
+        if event.type == "deadline":
+            orch.on_deadline(event.decision_run_id)
+            return True
+        if event.context_digest is not None:
+            # Stored before any follow-up job is built, so the fan-out carries the digest.
+            store_digest(session, event.context_digest["key"], Digest.from_dict(event.context_digest["digest"]))
+
+        agent_run = session.execute(
+            select(AgentRun)
+            .where(
+                AgentRun.decision_run_id == event.decision_run_id,
+                AgentRun.agent_name == event.agent_name,
+            )
+            .limit(1)
+        ).scalars().first()
+        if agent_run is None or agent_run.status in _FINISHED:
+            return False
+
+        if event.type == "started":
+            if agent_run.status == AgentStatus.QUEUED:
+                agent_run.status = AgentStatus.RUNNING
+            agent_run.model = event.model
+            agent_run.started_at = _event_time(event)
+            return True
+
+        agent_run.latency_ms = event.latency_ms
+        agent_run.finished_at = _event_time(event)
+        if event.type == "done":
+            agent_run.output = event.output
+            agent_run.agent_version = event.agent_version
+            agent_run.status = AgentStatus.DONE
+            session.flush()
+            orch.on_agent_done(event.decision_run_id, event.agent_name)
+        elif event.type == "failed":
+            agent_run.status = AgentStatus.FAILED
+            agent_run.error_message = event.error
+            session.flush()
+            orch.on_agent_failed(event.decision_run_id, event.agent_name)
+        else:
+            agent_run.status = AgentStatus.CANCELED
+            agent_run.error_message = event.error
+        return True
+
+
+def _event_time(event: AgentEvent) -> datetime:
+    # When the worker observed the transition, not when the batch was applied.
+    return datetime.fromtimestamp(event.ts, timezone.utc).replace(tzinfo=None)
+
+
+def _is_transient(error: OperationalError) -> bool:
+    """SQLite busy/locked: another writer holds the lock; the same event will apply later."""
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
@@ -0,0 +1,99 @@
+# coding: utf-8
+import itertools
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from decision_copilot.blob_store import decode_json
+from decision_copilot.models import AgentRun, AgentStatus, Blob, Decision, DecisionRun, DecisionStatus, RunStatus
+
+# Read models for the inspection commands: plain rows from column projections,
+# never ORM instances, so only the printed columns are loaded and nothing is
+# tracked by the session. `status` reads Decision.run_summary and `export` has its
+# own set-based batches (services/export_service.py); `explain` is served here.
+
+
+@dataclass(frozen=True)
+class ExplainAgent:
+    agent_name: str
+    status: AgentStatus
+    reused_from_id: Optional[int]
+    error_message: Optional[str]
+    output: Optional[dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ExplainView:
+    decision_id: int
+    question: str
+    status: DecisionStatus
+    run_id: Optional[int]
+    run_status: Optional[RunStatus]
+    # Streamed from the open result: consume before the session closes.
+    agents: Iterator[ExplainAgent]
+
+
+def explain_view(session: Session, decision_id: int, *, batch_size: int = 20) -> Optional[ExplainView]:
+    """
+    The decision, its latest run and that run's agents, from one joined query.
+
+    Agent rows (with their output blob) are fetched `batch_size` at a time and
+    decoded one by one as `agents` is iterated, so a run with large outputs never
+    holds more than one batch in memory. None if the decision does not exist.
+    """
+    # Run ids are autoincrement, so max(id) is the latest run (same order as created_at).
+    latest_run_id = (
+        select(func.max(DecisionRun.id))
+        .where(DecisionRun.decision_id == decision_id)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Decision.id,
+            Decision.question,
+            Decision.status,
+            DecisionRun.id.label("run_id"),
+            DecisionRun.status.label("run_status"),
+            AgentRun.agent_name,
+            AgentRun.status.label("agent_status"),
+            AgentRun.reused_from_id,
+            AgentRun.error_message,
+            Blob.codec,
+            Blob.data,
+        )
+        .select_from(Decision)
+        .outerjoin(DecisionRun, DecisionRun.id == latest_run_id)
+        .outerjoin(AgentRun, AgentRun.decision_run_id == DecisionRun.id)
+        .outerjoin(Blob, Blob.hash == AgentRun.output_hash)
+        .where(Decision.id == decision_id)
+        .order_by(AgentRun.created_at, AgentRun.id)
+    )
+    rows = session.execute(stmt.execution_options(yield_per=batch_size))
+    first = rows.fetchone()
+    if first is None:
+        rows.close()
+        return None
+
+    def agents() -> Iterator[ExplainAgent]:
+        if first.agent_name is None:  # no run yet, or a run without agent rows
+            rows.close()
+            return
+        for r in itertools.chain((first,), rows):
+            yield ExplainAgent(
+                agent_name=r.agent_name,
+                status=r.agent_status,
+                reused_from_id=r.reused_from_id,
+                error_message=r.error_message,
+                output=decode_json(r.codec, r.data) if r.data is not None else None,
+            )
+
+    return ExplainView(
+        decision_id=first.id,
+        question=first.question,
+        status=first.status,
+        run_id=first.run_id,
+        run_status=first.run_status,
+        agents=agents(),
+    )
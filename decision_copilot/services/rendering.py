@@ -0,0 +1,98 @@
+# coding: utf-8
+from typing import Any
+
+
+# =========================
+# Rendering
+# =========================
+
+def render_markdown(decision: Any, agents: dict[str, dict[str, Any]]) -> str:
+    """
+    Render a decision report as markdown.
+
+    `decision` only needs `question`, `context` and `final_report` attributes,
+    so both ORM `Decision` rows and plain export records can be rendered.
+    """
+    md: list[str] = []
+
+    md.append("# Decision Report\n")
+
+    md.append("## Question\n")
+    md.append(f"{decision.question}\n")
+
+    if decision.context:
+        md.append("## Context\n")
+        md.append(f"{decision.context}\n")
+
+    md.append("## Analysis\n")
+    _render_list_section(md, "Facts", agents.get("facts"))
+    _render_list_section(md, "Pros", agents.get("pro"))
+    _render_list_section(md, "Cons", agents.get("con"))
+    _render_list_section(md, "Risks", agents.get("risk"))
+
+    if decision.final_report:
+        md.append("## Final Recommendation\n")
+        _render_final_report(md, decision.final_report)
+
+    return "\n".join(md)
+
+
+# =========================
+# Helpers
+# =========================
+
+def _render_list_section(md: list[str], title: str, data: dict | None) -> None:
+    if not data:
+        return
+
+    items = []
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        items = data["items"]
+
+    md.append(f"### {title}\n")
+
+    if not items:
+        md.append("_No items provided._\n")
+        return
+
+    for it in items:
+        md.append(f"- {it}")
+    md.append("")
+
+
+def _render_final_report(md: list[str], report: dict[str, Any]) -> None:
+    if not isinstance(report, dict):
+        md.append("_Invalid final report format._\n")
+        return
+
+    if report.get("recommendation"):
+        md.append(f"**Recommendation**: {report['recommendation']}\n")
+
+    if report.get("confidence") is not None:
+        md.append(f"**Confidence**: {report['confidence']}\n")
+
+    if report.get("missing_inputs"):
+        md.append(f"**Missing inputs**: {', '.join(report['missing_inputs'])} (not available when synthesized)\n")
+
+    if report.get("rationale"):
+        md.append("**Rationale**:\n")
+        md.append(f"{report['rationale']}\n")
+
+    _render_bullets(md, "Key Trade-offs", report.get("key_tradeoffs"))
+    _render_bullets(md, "Next Steps", report.get("next_steps"))
+    _render_bullets(md, "Open Questions", report.get("open_questions"))
+
+
+def _render_bullets(md: list[str], title: str, value: Any) -> None:
+    if not value:
+        return
+
+    md.append(f"**{title}**:\n")
+
+    if isinstance(value, list):
+        for v in value:
+            md.append(f"- {v}")
+    else:
+        md.append(f"- {value}")
+
+    md.append("")
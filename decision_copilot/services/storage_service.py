@@ -0,0 +1,119 @@
+# coding: utf-8
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import orjson
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from decision_copilot.blob_store import encode_json
+from decision_copilot.database import init_db
+from decision_copilot.models import insert_blobs
+
+# (table, legacy inline JSON column, blob hash column)
+LEGACY_INLINE_COLUMNS = (
+    ("agent_runs", "output", "output_hash"),
+    ("decisions", "final_report", "final_report_hash"),
+)
+
+
+@dataclass(frozen=True)
+class StorageMigrationResult:
+    rows_migrated: dict[str, int] = field(default_factory=dict)
+    dropped_columns: list[str] = field(default_factory=list)
+    size_before: int = 0
+    size_after: int = 0
+
+
+def legacy_inline_columns(engine: Engine) -> list[tuple[str, str, str]]:
+    """Inline JSON columns still present in this database (pre blob-storage layout)."""
+    insp = inspect(engine)
+    found = []
+    for table, column, hash_column in LEGACY_INLINE_COLUMNS:
+        if not insp.has_table(table):
+            continue
+        if column in {c["name"] for c in insp.get_columns(table)}:
+            found.append((table, column, hash_column))
+    return found
+
+
+def migrate_inline_storage(
+        engine: Engine,
+        sqlite_path: Path,
+        *,
+        batch_size: int = 500,
+        vacuum: bool = True,
+) -> StorageMigrationResult:
+    """
+    Move inline JSON (agent_runs.output, decisions.final_report) into compressed,
+    deduplicated `blobs` rows, then drop the inline columns.
+
+    Each batch is its own transaction, so the migration can be interrupted and resumed.
+    """
+    init_db(engine)
+    size_before = _file_size(sqlite_path)
+
+    rows_migrated: dict[str, int] = {}
+    dropped_columns: list[str] = []
+    for table, column, hash_column in legacy_inline_columns(engine):
+        rows_migrated[table] = _migrate_column(engine, table, column, hash_column, batch_size)
+        if _drop_column(engine, table, column):
+            dropped_columns.append(f"{table}.{column}")
+
+    if vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+
+    return StorageMigrationResult(
+        rows_migrated=rows_migrated,
+        dropped_columns=dropped_columns,
+        size_before=size_before,
+        size_after=_file_size(sqlite_path),
+    )
+
+
+def _migrate_column(engine: Engine, table: str, column: str, hash_column: str, batch_size: int) -> int:
+    select_sql = text(
+        f"SELECT id, {column} FROM {table} "
+        f"WHERE {column} IS NOT NULL AND {hash_column} IS NULL LIMIT :n"
+    )
+    update_sql = text(f"UPDATE {table} SET {hash_column} = :h, {column} = NULL WHERE id = :id")
+
+    n = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select_sql, {"n": batch_size}).all()
+            if not rows:
+                return n
+
+            blobs = {}
+            updates = []
+            for row_id, raw in rows:
+                value = orjson.loads(raw)
+                h = None
+                # JSON null was stored as the text 'null'; it becomes a NULL hash.
+                if value is not None:
+                    blob = encode_json(value)
+                    blobs[blob.hash] = blob
+                    h = blob.hash
+                updates.append({"id": row_id, "h": h})
+
+            insert_blobs(conn, list(blobs.values()))
+            conn.execute(update_sql, updates)
+            n += len(rows)
+
+
+def _drop_column(engine: Engine, table: str, column: str) -> bool:
+    # DROP COLUMN needs SQLite >= 3.35; older versions keep the (now all-NULL) column.
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+        return True
+    except OperationalError:
+        return False
+
+
+def _file_size(path: Path) -> int:
+    path = path.expanduser()
+    return path.stat().st_size if path.exists() else 0
@@ -0,0 +1,52 @@
+# coding: utf-8
+import argparse
+import asyncio
+import logging
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Imported after load_dotenv so the database path and Redis URL see .env values.
+from decision_copilot import metrics  # noqa: E402
+from decision_copilot.api.app import DatabaseExecutor, DecisionApi  # noqa: E402
+from decision_copilot.api.http import HTTPServer  # noqa: E402
+from decision_copilot.config import AppConfig  # noqa: E402
+from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory  # noqa: E402
+
+logger = logging.getLogger("decision_copilot.api")
+
+
+async def serve(host: str, port: int, db_threads: int) -> None:
+    cfg = AppConfig()
+    engine = make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path))
+    db = DatabaseExecutor(make_session_factory(engine), threads=db_threads)
+    api = DecisionApi(db, cfg=cfg)
+    server = await HTTPServer(api.router()).serve(host, port)
+    logger.info("Decision Copilot API on http://%s:%d", host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        db.shutdown()
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decision Copilot HTTP/JSON API daemon")
+    parser.add_argument("--host", default=os.environ.get("DECISION_COPILOT_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("DECISION_COPILOT_API_PORT", "8400")))
+    parser.add_argument("--db-threads", type=int, default=8, help="Threads running database work")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    metrics.start_exporter()
+    try:
+        asyncio.run(serve(args.host, args.port, args.db_threads))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
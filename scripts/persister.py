@@ -0,0 +1,30 @@
+# coding: utf-8
+import logging
+
+from dotenv import load_dotenv
+from redis import Redis
+
+load_dotenv()
+
+# Imported after load_dotenv so the stream names and the database path see .env values.
+from decision_copilot import metrics  # noqa: E402
+from decision_copilot.config import AppConfig  # noqa: E402
+from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory  # noqa: E402
+from decision_copilot.queue.connection import REDIS_URL  # noqa: E402
+from decision_copilot.services.persistence_service import EventPersister  # noqa: E402
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    cfg = AppConfig()
+    session_factory = make_session_factory(make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path)))
+    # The consumer name (DECISION_COPILOT_PERSISTER_CONSUMER) must stay the same across
+    # restarts, so the events a crashed persister had read are replayed.
+    persister = EventPersister(session_factory, Redis.from_url(REDIS_URL))
+    metrics.start_exporter()
+    persister.run()
+
+
+if __name__ == "__main__":
+    main()
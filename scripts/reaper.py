@@ -0,0 +1,43 @@
+# coding: utf-8
+import logging
+import os
+import time
+
+from dotenv import load_dotenv
+from redis import Redis
+
+load_dotenv()
+
+# Imported after load_dotenv so the database path, queue names and lease TTL see .env values.
+from decision_copilot import metrics  # noqa: E402
+from decision_copilot.config import AppConfig  # noqa: E402
+from decision_copilot.database import DatabaseConfig, make_engine, make_session_factory  # noqa: E402
+from decision_copilot.orchestrator.reaper import REAP_INTERVAL_S, LeaseReaper  # noqa: E402
+from decision_copilot.queue.connection import PERSISTENCE_MODE, REDIS_URL  # noqa: E402
+
+logger = logging.getLogger("decision_copilot.reaper")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if PERSISTENCE_MODE == "stream":
+        raise SystemExit("In stream mode the persister (scripts/persister.py) runs the reaper.")
+
+    cfg = AppConfig()
+    session_factory = make_session_factory(make_engine(DatabaseConfig(sqlite_path=cfg.sqlite_path)))
+    interval = float(os.environ.get("DECISION_COPILOT_REAP_INTERVAL_S", REAP_INTERVAL_S))
+    redis = Redis.from_url(REDIS_URL)
+    metrics.start_exporter()
+    while True:
+        try:
+            with session_factory() as session:
+                requeued = LeaseReaper(session, redis).reap()
+            if requeued:
+                logger.info("Requeued %d agent(s)", len(requeued))
+        except Exception:
+            logger.exception("Lease reaper failed")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,35 @@
 # coding: utf-8
+import os
+
 from dotenv import load_dotenv
 from redis import Redis
-from rq.worker import SimpleWorker
-
-from decision_copilot.queue.connection import REDIS_URL, QUEUE_NAME
 
 load_dotenv()
 
+# Imported after load_dotenv so queue names, the priority policy and the LLM settings see .env values.
+from decision_copilot import metrics  # noqa: E402
+from decision_copilot.llm.client import DeepSeekConfig  # noqa: E402
+from decision_copilot.llm.transport import prewarm  # noqa: E402
+from decision_copilot.queue.connection import REDIS_URL  # noqa: E402
+from decision_copilot.queue.worker import PriorityWorker  # noqa: E402
+
 
 def main() -> None:
     redis = Redis.from_url(REDIS_URL)
-    worker = SimpleWorker(queues=[QUEUE_NAME], connection=redis)
-    worker.work()
+    worker = PriorityWorker(connection=redis)
+    worker.log.info("Stage order: %s (starvation limit %d)",
+                    " > ".join(worker.policy.order), worker.policy.starvation_limit)
+
+    # Open the LLM connections now so the first job does not pay DNS, TCP and TLS setup.
+    connections = int(os.environ.get("DECISION_COPILOT_HTTP_PREWARM", "1"))
+    base_url = DeepSeekConfig().base_url
+    if connections > 0 and base_url:
+        timing = prewarm(base_url, connections)
+        worker.log.info("Prewarmed %d connection(s) to %s (handshake %.1f ms)",
+                        timing.new_connections, base_url, timing.handshake_ms)
+    metrics.start_exporter()
+    # The scheduler runs delayed jobs: synth deadline checks (`run --deadline`).
+    worker.work(with_scheduler=True)
 
 
 if __name__ == "__main__":